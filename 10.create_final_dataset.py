@@ -1,157 +1,224 @@
+import hashlib
 import json
 import os
+import shutil
+import tempfile
 from pathlib import Path
 from datetime import datetime
 
-def load_qa_from_json(json_file):
+from jsonl_dataset import iter_records
+from text_normalizer import normalize_text
+
+def iter_qa_from_file(json_file):
     """
-    Load Q&A pairs from extraction JSON file
+    Yield the Q&A pairs of one extraction file (JSON or JSONL); only this
+    file is in memory while its pairs are consumed
     """
+    if Path(json_file).suffix == '.jsonl':
+        yield from iter_records(json_file)
+        return
+
     try:
         with open(json_file, 'r', encoding='utf-8') as f:
             data = json.load(f)
-        
-        qa_pairs = []
-        
-        # Handle different JSON structures
-        if isinstance(data, list):
-            for chunk in data:
-                if isinstance(chunk, dict) and 'qa_pairs' in chunk:
-                    qa_pairs.extend(chunk['qa_pairs'])
-        elif isinstance(data, dict) and 'qa_pairs' in data:
-            qa_pairs.extend(data['qa_pairs'])
-        
-        return qa_pairs
     except Exception as e:
         print(f"⚠️ Error loading {json_file}: {e}")
-        return []
+        return
+
+    # Handle different JSON structures
+    if isinstance(data, list):
+        for chunk in data:
+            if isinstance(chunk, dict) and 'qa_pairs' in chunk:
+                yield from chunk['qa_pairs']
+    elif isinstance(data, dict) and 'qa_pairs' in data:
+        yield from data['qa_pairs']
+
+# Every question is seen once here, so skip normalize_text's cache (it would keep all of them alive)
+normalize_question = normalize_text.__wrapped__
+
+def question_key(question):
+    """8-byte hash of the normalized question: the dedup index keeps only these, not the questions"""
+    return hashlib.blake2b(normalize_question(question).encode('utf-8'), digest_size=8).digest()
+
+def indent_json(value, indent):
+    """value as json.dump(..., indent=2) would write it nested `indent` spaces deep"""
+    return json.dumps(value, indent=2, ensure_ascii=False).replace('\n', '\n' + ' ' * indent)
+
+class JSONArrayWriter:
+    """
+    Writes the items of a JSON array incrementally, formatted exactly like
+    json.dump(indent=2) would nest them `indent` spaces deep. Items are encoded
+    batch_size at a time (one json.dumps call per batch, not per item).
+    """
+
+    def __init__(self, f, indent, batch_size=1000):
+        self.f = f
+        self.indent = indent
+        self.batch_size = batch_size
+        self.batch = []
+        self.count = 0
+
+    def write(self, item):
+        self.batch.append(item)
+        if len(self.batch) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if not self.batch:
+            return
+        # '[\n  item,\n  item\n]' -> the items, shifted to this array's depth
+        items = json.dumps(self.batch, indent=2, ensure_ascii=False)[1:-2]
+        shift = ' ' * (self.indent - 2)
+        self.f.write((',' if self.count else '') + items.replace('\n', '\n' + shift))
+        self.count += len(self.batch)
+        self.batch = []
+
+    def close_array(self):
+        """Closing bracket at the indentation of the array itself"""
+        self.flush()
+        if self.count:
+            self.f.write('\n' + ' ' * (self.indent - 2) + ']')
+        else:
+            self.f.write(']')
 
 def create_final_dataset():
     """
     Create final chatbot dataset from all extraction files
+
+    Single pass: every file is read lazily, each pair is deduplicated against a
+    hash index of normalized questions, counted and written to both outputs
+    right away, so memory does not grow with the corpus (besides 8 bytes per
+    unique question).
     """
     print("🚀 Creating final chatbot dataset...")
-    
+
     # Find all extraction JSON files
     output_dir = Path("output")
     extraction_files = [
         "output/https_tuyensinh.ctu.edu.vn_.json",
         "output/ctu_detailed_majors_extracted.json"
     ]
-    
+
     # Add any other extracted files
-    for file in output_dir.glob("*_extracted.json"):
+    for file in sorted(output_dir.glob("*_extracted.json")) + sorted(output_dir.glob("*_extracted.jsonl")):
         if str(file) not in extraction_files:
             extraction_files.append(str(file))
-    
+
     print(f"📁 Found {len(extraction_files)} extraction files:")
     for file in extraction_files:
         if Path(file).exists():
             print(f"   ✅ {file}")
         else:
             print(f"   ❌ {file} (not found)")
-    
-    # Collect all Q&A pairs
-    all_qa_pairs = []
+
+    final_file = "output/ctu_chatbot_dataset_final.json"
+    training_file = "output/ctu_chatbot_training_data.json"
+
+    # Statistics, all computed while streaming
+    total_pairs = 0
     file_stats = {}
-    
-    for file_path in extraction_files:
-        if not Path(file_path).exists():
-            continue
-            
-        qa_pairs = load_qa_from_json(file_path)
-        file_stats[file_path] = len(qa_pairs)
-        all_qa_pairs.extend(qa_pairs)
-        print(f"📝 {Path(file_path).name}: {len(qa_pairs)} Q&A pairs")
-    
-    # Remove duplicates based on question
-    unique_qa_pairs = []
     seen_questions = set()
-    
-    for qa in all_qa_pairs:
-        question = qa.get('question', '').strip().lower()
-        if question and question not in seen_questions:
-            seen_questions.add(question)
-            unique_qa_pairs.append(qa)
-    
-    print(f"\n📊 Dataset Statistics:")
-    print(f"   📝 Total Q&A pairs: {len(all_qa_pairs)}")
-    print(f"   🔄 Unique Q&A pairs: {len(unique_qa_pairs)}")
-    print(f"   ❌ Duplicates removed: {len(all_qa_pairs) - len(unique_qa_pairs)}")
-    
-    # Categorize Q&A pairs
     categories = {}
     priorities = {1: 0, 2: 0, 3: 0}
-    
-    for qa in unique_qa_pairs:
-        category = qa.get('category', 'unknown')
-        priority = qa.get('priority', 3)
-        
-        if category not in categories:
-            categories[category] = 0
-        categories[category] += 1
-        
-        if priority in priorities:
-            priorities[priority] += 1
-    
+    samples = []
+
+    # Unique pairs go straight to the training file and to a temporary body of
+    # the final file (its metadata, written first, is only known at the end)
+    with tempfile.NamedTemporaryFile('w', encoding='utf-8', dir=output_dir, suffix='.part', delete=False) as body, \
+            open(training_file + '.tmp', 'w', encoding='utf-8') as training:
+        body_path = body.name
+        final_pairs = JSONArrayWriter(body, indent=4)
+        training.write('[')
+        training_pairs = JSONArrayWriter(training, indent=2)
+
+        for file_path in extraction_files:
+            if not Path(file_path).exists():
+                continue
+
+            file_count = 0
+            for qa in iter_qa_from_file(file_path):
+                file_count += 1
+                question = qa.get('question', '').strip()
+                if not question:
+                    continue
+                key = question_key(question)
+                if key in seen_questions:
+                    continue
+                seen_questions.add(key)
+
+                category = qa.get('category', 'unknown')
+                priority = qa.get('priority', 3)
+                categories[category] = categories.get(category, 0) + 1
+                if priority in priorities:
+                    priorities[priority] += 1
+                if len(samples) < 5:
+                    samples.append(qa)
+
+                final_pairs.write(qa)
+                training_pairs.write({
+                    "question": qa.get('question', ''),
+                    "answer": qa.get('answer', ''),
+                    "category": qa.get('category', 'general'),
+                    "priority": qa.get('priority', 3)
+                })
+
+            file_stats[file_path] = file_count
+            total_pairs += file_count
+            print(f"📝 {Path(file_path).name}: {file_count} Q&A pairs")
+
+        final_pairs.close_array()
+        training_pairs.close_array()
+
+    unique_count = final_pairs.count
+    print(f"\n📊 Dataset Statistics:")
+    print(f"   📝 Total Q&A pairs: {total_pairs}")
+    print(f"   🔄 Unique Q&A pairs: {unique_count}")
+    print(f"   ❌ Duplicates removed: {total_pairs - unique_count}")
+
     print(f"\n📂 Categories:")
     for category, count in sorted(categories.items()):
         print(f"   📁 {category}: {count} pairs")
-    
+
     print(f"\n⭐ Priorities:")
     for priority, count in priorities.items():
         print(f"   {priority}⭐: {count} pairs")
-    
-    # Create final dataset
-    final_dataset = {
-        "metadata": {
-            "created_date": datetime.now().isoformat(),
-            "source": "CTU Admission Website Extraction",
-            "total_qa_pairs": len(unique_qa_pairs),
-            "categories": list(categories.keys()),
-            "source_files": file_stats,
-            "description": "Vietnamese Q&A dataset for CTU admission counseling chatbot"
-        },
-        "qa_pairs": unique_qa_pairs,
-        "categories": categories,
-        "priorities": priorities
+
+    metadata = {
+        "created_date": datetime.now().isoformat(),
+        "source": "CTU Admission Website Extraction",
+        "total_qa_pairs": unique_count,
+        "categories": list(categories.keys()),
+        "source_files": file_stats,
+        "description": "Vietnamese Q&A dataset for CTU admission counseling chatbot"
     }
-    
-    # Save final dataset
-    final_file = "output/ctu_chatbot_dataset_final.json"
-    with open(final_file, 'w', encoding='utf-8') as f:
-        json.dump(final_dataset, f, indent=2, ensure_ascii=False)
-    
+
+    # Save final dataset: metadata, then the streamed pairs, then the statistics
+    with open(final_file + '.tmp', 'w', encoding='utf-8') as f:
+        f.write('{\n  "metadata": ' + indent_json(metadata, 2) + ',\n  "qa_pairs": [')
+        with open(body_path, 'r', encoding='utf-8') as streamed:
+            shutil.copyfileobj(streamed, f)
+        f.write(',\n  "categories": ' + indent_json(categories, 2))
+        f.write(',\n  "priorities": ' + indent_json(priorities, 2) + '\n}')
+    os.remove(body_path)
+    os.replace(final_file + '.tmp', final_file)
+
     print(f"\n✅ Final dataset saved: {final_file}")
-    
-    # Create training format (simple Q&A pairs)
-    training_data = []
-    for qa in unique_qa_pairs:
-        training_data.append({
-            "question": qa.get('question', ''),
-            "answer": qa.get('answer', ''),
-            "category": qa.get('category', 'general'),
-            "priority": qa.get('priority', 3)
-        })
-    
-    training_file = "output/ctu_chatbot_training_data.json"
-    with open(training_file, 'w', encoding='utf-8') as f:
-        json.dump(training_data, f, indent=2, ensure_ascii=False)
-    
+
+    os.replace(training_file + '.tmp', training_file)
     print(f"✅ Training data saved: {training_file}")
-    
+
     # Show sample Q&A
     print(f"\n📝 Sample Q&A pairs (first 5):")
-    for i, qa in enumerate(unique_qa_pairs[:5], 1):
+    for i, qa in enumerate(samples, 1):
         print(f"   {i}. Q: {qa.get('question', 'N/A')}")
         print(f"      A: {qa.get('answer', 'N/A')[:80]}...")
         print(f"      Category: {qa.get('category', 'N/A')}, Priority: {qa.get('priority', 'N/A')}")
         print()
-    
+
     print(f"🎉 Dataset creation completed!")
     print(f"💡 You can now use these files to train your chatbot:")
     print(f"   📄 Full dataset: {final_file}")
     print(f"   📄 Training data: {training_file}")
 
 if __name__ == "__main__":
-    create_final_dataset() 
\ No newline at end of file
+    create_final_dataset()
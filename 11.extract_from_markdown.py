@@ -1,16 +1,43 @@
 import asyncio
 import json
 import os
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from openai import OpenAI
 from dotenv import load_dotenv
 
+from llm_client import chat_completion_sync, get_scheduler, report_llm_usage
+from boilerplate_filter import BoilerplateFilter
+from markdown_chunker import chunk_markdown, count_tokens, merge_qa_pairs
+
+# Token budget of one markdown chunk sent to the LLM
+CHUNK_TOKENS = 1500
+
 def extract_qa_from_markdown(markdown_content, filename):
     """
-    Extract Q&A pairs from markdown content using OpenAI API
+    Extract Q&A pairs from the whole markdown content, one OpenAI call per chunk
+    (chunks sent concurrently, up to the shared scheduler's concurrency limit)
+    """
+    chunks = chunk_markdown(markdown_content, CHUNK_TOKENS)
+    with ThreadPoolExecutor(max_workers=get_scheduler().max_concurrency) as pool:
+        results = list(pool.map(lambda chunk: extract_qa_from_chunk(chunk, filename), chunks))
+    return {"qa_pairs": merge_qa_pairs([result.get("qa_pairs", []) for result in results])}
+
+def parse_qa_json(result):
+    """
+    Parse the JSON of an LLM response (raises on invalid JSON)
     """
-    client = OpenAI(api_key=os.getenv('OPENAI_API_KEY'))
+    # Clean JSON response
+    if "```json" in result:
+        result = result.split("```json")[1].split("```")[0]
+    elif "```" in result:
+        result = result.split("```")[1].split("```")[0]
     
+    return json.loads(result.strip())
+
+def extract_qa_from_chunk(markdown_content, filename):
+    """
+    Extract Q&A pairs from one markdown chunk using OpenAI API
+    """
     prompt = f"""
     Bạn là chuyên gia tư vấn tuyển sinh Đại học Cần Thơ (CTU). 
     Hãy phân tích nội dung markdown và tạo ra các cặp hỏi-đáp tiếng Việt tự nhiên.
@@ -36,28 +63,22 @@ def extract_qa_from_markdown(markdown_content, filename):
     }}
     
     Nội dung markdown:
-    {markdown_content[:4000]}
+    {markdown_content}
     """
     
     try:
-        response = client.chat.completions.create(
+        response = chat_completion_sync(
             model="gpt-4o-mini",
             messages=[
                 {"role": "system", "content": "Bạn là chuyên gia tư vấn tuyển sinh CTU. Trả về JSON hợp lệ."},
                 {"role": "user", "content": prompt}
             ],
             temperature=0.0,
-            max_tokens=2000
+            max_tokens=2000,
+            validate=parse_qa_json
         )
         
-        result = response.choices[0].message.content
-        # Clean JSON response
-        if "```json" in result:
-            result = result.split("```json")[1].split("```")[0]
-        elif "```" in result:
-            result = result.split("```")[1].split("```")[0]
-        
-        return json.loads(result.strip())
+        return parse_qa_json(response.content)
         
     except Exception as e:
         print(f"❌ Error extracting from {filename}: {e}")
@@ -80,6 +101,9 @@ def main():
     markdown_files = list(markdown_dir.glob("*.md"))
     print(f"🔍 Found {len(markdown_files)} markdown files to extract")
     
+    # Learn nav/footer blocks repeated across pages so they are not sent to the LLM
+    boilerplate = BoilerplateFilter.from_files(markdown_files)
+    
     all_qa_pairs = []
     total_cost = 0
     
@@ -88,7 +112,7 @@ def main():
         
         try:
             with open(md_file, 'r', encoding='utf-8') as f:
-                content = f.read()
+                content = boilerplate.strip(f.read(), md_file.name)
             
             if len(content.strip()) < 100:
                 print(f"⚠️ Skipping {md_file.name} - too short")
@@ -108,7 +132,7 @@ def main():
                     json.dump(result, f, indent=2, ensure_ascii=False)
                 
                 # Estimate cost (rough)
-                tokens_used = len(content[:4000]) // 4 + 500  # Rough estimate
+                tokens_used = count_tokens(content) + 500 * len(chunk_markdown(content, CHUNK_TOKENS))
                 cost = tokens_used * 0.00000015  # GPT-4o-mini pricing
                 total_cost += cost
                 
@@ -129,6 +153,8 @@ def main():
     
     print(f"\n🎉 Extraction completed!")
     print(f"📊 Total Q&A pairs: {len(all_qa_pairs)}")
+    boilerplate.report()
+    report_llm_usage()
     print(f"💰 Estimated cost: ~${total_cost:.4f}")
     print(f"📁 Results saved in: {output_dir}")
     print(f"📄 Combined file: {combined_file}")
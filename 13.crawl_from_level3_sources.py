@@ -6,6 +6,8 @@ from crawl4ai import AsyncWebCrawler
 from crawl4ai.async_configs import BrowserConfig, CrawlerRunConfig
 from datetime import datetime
 
+from url_canonicalizer import SeenURLIndex
+
 def load_urls_from_level3_json(json_file):
     """
     Load URLs from Level 3 extraction JSON file (from source field in Q&A pairs)
@@ -134,19 +136,19 @@ async def main():
         print(f"📝 {json_file.name}: {len(urls)} URLs from sources")
         all_urls.extend(urls)
     
-    # Remove duplicates based on URL
+    # Remove duplicates based on canonical URL (http/https, trailing slash, fragment, ?lang=...)
     unique_urls = []
-    seen_urls = set()
+    url_index = SeenURLIndex()
     for url_info in all_urls:
-        url = url_info['url']
-        if url not in seen_urls:
-            seen_urls.add(url)
+        if url_index.add(url_info['url']):
+            # The first URL seen is the one fetched, the canonical form is only the dedup key
             unique_urls.append(url_info)
     
     print(f"\n📊 URL Statistics:")
     print(f"   🔗 Total URLs found: {len(all_urls)}")
     print(f"   🔄 Unique URLs: {len(unique_urls)}")
     print(f"   ❌ Duplicates removed: {len(all_urls) - len(unique_urls)}")
+    print(f"   🔗 Only caught by canonicalization: {url_index.canonical_duplicates}")
     
     if not unique_urls:
         print("❌ No URLs found to crawl!")
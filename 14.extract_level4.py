@@ -2,20 +2,49 @@ import asyncio
 import json
 import os
 from pathlib import Path
-from openai import OpenAI
 from dotenv import load_dotenv
 
+from llm_client import get_async_client, chat_completion, report_llm_usage
+from boilerplate_filter import BoilerplateFilter
+from markdown_chunker import chunk_markdown, count_tokens, map_chunks, merge_qa_pairs
+
 # Load environment variables at module level
 load_dotenv(override=True)
 
 # Initialize OpenAI client at module level
-client = OpenAI(api_key=os.getenv('OPENAI_API_KEY'))
+client = get_async_client(os.getenv('OPENAI_API_KEY'))
+
+# Number of files extracted concurrently
+MAX_PARALLEL = int(os.getenv('EXTRACT_PARALLELISM', '8'))
+
+# Token budget of one markdown chunk sent to the LLM
+CHUNK_TOKENS = 1500
+
+async def extract_qa_from_markdown(markdown_content, filename):
+    """
+    Extract Q&A pairs from the whole markdown content, one OpenAI call per chunk
+    """
+    results = await map_chunks(
+        markdown_content, lambda chunk: extract_qa_from_chunk(chunk, filename), CHUNK_TOKENS
+    )
+    return {"qa_pairs": merge_qa_pairs([result.get("qa_pairs", []) for result in results])}
 
-def extract_qa_from_markdown(markdown_content, filename):
+def parse_qa_json(result):
     """
-    Extract Q&A pairs from markdown content using OpenAI API
+    Parse the JSON of an LLM response (raises on invalid JSON)
+    """
+    # Clean JSON response
+    if "```json" in result:
+        result = result.split("```json")[1].split("```")[0]
+    elif "```" in result:
+        result = result.split("```")[1].split("```")[0]
+    
+    return json.loads(result.strip())
+
+async def extract_qa_from_chunk(markdown_content, filename):
+    """
+    Extract Q&A pairs from one markdown chunk using OpenAI API
     """
-    # Use the global client instead of creating a new one
     
     prompt = f"""
     Bạn là chuyên gia tư vấn tuyển sinh Đại học Cần Thơ (CTU). 
@@ -42,34 +71,65 @@ def extract_qa_from_markdown(markdown_content, filename):
     }}
     
     Nội dung markdown:
-    {markdown_content[:4000]}
+    {markdown_content}
     """
     
     try:
-        response = client.chat.completions.create(
+        response = await chat_completion(
             model="gpt-4o-mini",
             messages=[
                 {"role": "system", "content": "Bạn là chuyên gia tư vấn tuyển sinh CTU. Trả về JSON hợp lệ."},
                 {"role": "user", "content": prompt}
             ],
             temperature=0.0,
-            max_tokens=2000
+            max_tokens=2000,
+            validate=parse_qa_json
         )
         
-        result = response.choices[0].message.content
-        # Clean JSON response
-        if "```json" in result:
-            result = result.split("```json")[1].split("```")[0]
-        elif "```" in result:
-            result = result.split("```")[1].split("```")[0]
-        
-        return json.loads(result.strip())
+        return parse_qa_json(response.content)
         
     except Exception as e:
         print(f"❌ Error extracting from {filename}: {e}")
         return {"qa_pairs": []}
 
-def main():
+async def process_markdown_file(md_file, output_dir, semaphore, boilerplate):
+    """
+    Extract one markdown file and save its result as soon as it is done
+    """
+    async with semaphore:
+        try:
+            with open(md_file, 'r', encoding='utf-8') as f:
+                content = boilerplate.strip(f.read(), md_file.name)
+            
+            if len(content.strip()) < 100:
+                print(f"⚠️ Skipping {md_file.name} - too short")
+                return [], 0
+            
+            # Extract Q&A pairs
+            result = await extract_qa_from_markdown(content, md_file.name)
+            qa_pairs = result.get('qa_pairs', [])
+            
+            if not qa_pairs:
+                print(f"❌ No Q&A pairs extracted from {md_file.name}")
+                return [], 0
+            
+            print(f"✅ {md_file.name}: extracted {len(qa_pairs)} Q&A pairs")
+            
+            # Save individual file
+            output_file = output_dir / f"{md_file.stem}_extracted.json"
+            with open(output_file, 'w', encoding='utf-8') as f:
+                json.dump(result, f, indent=2, ensure_ascii=False)
+            
+            # Estimate cost (rough)
+            tokens_used = count_tokens(content) + 500 * len(chunk_markdown(content, CHUNK_TOKENS))
+            cost = tokens_used * 0.00000015  # GPT-4o-mini pricing
+            return qa_pairs, cost
+            
+        except Exception as e:
+            print(f"❌ Error processing {md_file.name}: {e}")
+            return [], 0
+
+async def main():
     """
     Extract Q&A pairs from all markdown files in Level 4
     """
@@ -92,44 +152,22 @@ def main():
     markdown_files = [f for f in markdown_files if "summary" not in f.name.lower()]
     
     print(f"🔍 Found {len(markdown_files)} markdown files to extract from Level 4")
+    print(f"⚡ Extracting up to {MAX_PARALLEL} files in parallel")
+    
+    # Learn nav/footer blocks repeated across pages so they are not sent to the LLM
+    boilerplate = BoilerplateFilter.from_files(markdown_files)
+    
+    semaphore = asyncio.Semaphore(MAX_PARALLEL)
+    results = await asyncio.gather(
+        *(process_markdown_file(md_file, output_dir, semaphore, boilerplate) for md_file in markdown_files)
+    )
     
+    # Combine in file order so the combined output is stable between runs
     all_qa_pairs = []
     total_cost = 0
-    
-    for i, md_file in enumerate(markdown_files, 1):
-        print(f"\n📄 [{i}/{len(markdown_files)}] Processing: {md_file.name}")
-        
-        try:
-            with open(md_file, 'r', encoding='utf-8') as f:
-                content = f.read()
-            
-            if len(content.strip()) < 100:
-                print(f"⚠️ Skipping {md_file.name} - too short")
-                continue
-            
-            # Extract Q&A pairs
-            result = extract_qa_from_markdown(content, md_file.name)
-            qa_pairs = result.get('qa_pairs', [])
-            
-            if qa_pairs:
-                print(f"✅ Extracted {len(qa_pairs)} Q&A pairs")
-                all_qa_pairs.extend(qa_pairs)
-                
-                # Save individual file
-                output_file = output_dir / f"{md_file.stem}_extracted.json"
-                with open(output_file, 'w', encoding='utf-8') as f:
-                    json.dump(result, f, indent=2, ensure_ascii=False)
-                
-                # Estimate cost (rough)
-                tokens_used = len(content[:4000]) // 4 + 500  # Rough estimate
-                cost = tokens_used * 0.00000015  # GPT-4o-mini pricing
-                total_cost += cost
-                
-            else:
-                print(f"❌ No Q&A pairs extracted from {md_file.name}")
-                
-        except Exception as e:
-            print(f"❌ Error processing {md_file.name}: {e}")
+    for qa_pairs, cost in results:
+        all_qa_pairs.extend(qa_pairs)
+        total_cost += cost
     
     # Save combined results
     combined_file = output_dir / "level4_combined_extracted.json"
@@ -144,6 +182,8 @@ def main():
     print(f"\n🎉 Level 4 Extraction completed!")
     print(f"📊 Total Q&A pairs: {len(all_qa_pairs)}")
     print(f"💰 Estimated cost: ~${total_cost:.4f}")
+    boilerplate.report()
+    report_llm_usage()
     print(f"📁 Results saved in: {output_dir}")
     print(f"📄 Combined file: {combined_file}")
     
@@ -158,4 +198,4 @@ def main():
     print(f"💡 Next: Run final dataset creation to combine all levels!")
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    asyncio.run(main()) 
\ No newline at end of file
@@ -2,16 +2,25 @@ import asyncio
 import json
 import os
 from pathlib import Path
-from openai import OpenAI
 from datetime import datetime
 import time
 from dotenv import load_dotenv
 
+from llm_client import get_async_client, chat_completion, report_llm_usage
+from boilerplate_filter import BoilerplateFilter
+from markdown_chunker import map_chunks, merge_qa_pairs
+
 # Load environment variables
 load_dotenv(override=True)
 
 # Initialize OpenAI client
-client = OpenAI(api_key=os.getenv('OPENAI_API_KEY'))
+client = get_async_client(os.getenv('OPENAI_API_KEY'))
+
+# Number of files extracted concurrently
+MAX_PARALLEL = int(os.getenv('EXTRACT_PARALLELISM', '8'))
+
+# Token budget of one markdown chunk sent to the LLM
+CHUNK_TOKENS = 1000
 
 def load_extraction_prompt():
     """Load the extraction prompt from file"""
@@ -44,63 +53,71 @@ Yêu cầu:
 - Category: hoi_nganh_hoc, hoi_phuong_thuc_xet_tuyen, hoi_hoc_phi, hoi_lien_he, hoi_thong_tin_chung
 """
 
-def extract_qa_with_openai(content, source_url, prompt):
-    """Extract Q&A pairs using OpenAI API"""
+async def extract_qa_with_openai(content, source_url, prompt):
+    """Extract Q&A pairs from the whole document, one OpenAI call per chunk"""
+    results = await map_chunks(
+        content, lambda chunk: extract_qa_from_chunk(chunk, source_url, prompt), CHUNK_TOKENS
+    )
+    qa_pairs = merge_qa_pairs([data.get("qa_pairs", []) for data, _ in results])
+    return {"qa_pairs": qa_pairs}, sum(tokens for _, tokens in results)
+
+def parse_json_response(result_text):
+    """Parse the JSON of an LLM response, bare or inside a markdown block (raises if there is none)"""
+    result_text = result_text.strip()
+    
+    # Try to parse directly as JSON first
+    try:
+        return json.loads(result_text)
+    except json.JSONDecodeError:
+        pass
+    
+    # If direct parsing fails, try to extract from markdown
+    if "```json" in result_text:
+        json_start = result_text.find("```json") + 7
+        json_end = result_text.find("```", json_start)
+        json_text = result_text[json_start:json_end].strip()
+    elif "```" in result_text:
+        json_start = result_text.find("```") + 3
+        json_end = result_text.rfind("```")
+        json_text = result_text[json_start:json_end].strip()
+    elif "{" in result_text and "}" in result_text:
+        json_start = result_text.find("{")
+        json_end = result_text.rfind("}") + 1
+        json_text = result_text[json_start:json_end]
+    else:
+        raise json.JSONDecodeError("No JSON found in response", result_text, 0)
+    
+    return json.loads(json_text)
+
+async def extract_qa_from_chunk(content, source_url, prompt):
+    """Extract Q&A pairs from one markdown chunk using OpenAI API"""
     try:
-        # Clean and limit content
+        # Clean content (chunked on markdown structure before the markers are removed)
         clean_content = content.replace("**", "").replace("##", "").replace("###", "")
-        # Take first 2500 chars to avoid token limits
-        limited_content = clean_content[:2500]
         
         # Prepare the full prompt
-        full_prompt = f"{prompt}\n\nNội dung:\n{limited_content}\n\nURL nguồn: {source_url}"
+        full_prompt = f"{prompt}\n\nNội dung:\n{clean_content}\n\nURL nguồn: {source_url}"
         
         # Call OpenAI API
-        response = client.chat.completions.create(
+        response = await chat_completion(
             model="gpt-4o-mini",
             messages=[
                 {"role": "system", "content": "Trả về JSON hợp lệ, không có markdown hay text khác."},
                 {"role": "user", "content": full_prompt}
             ],
             temperature=0.0,
-            max_tokens=2000
+            max_tokens=2000,
+            validate=parse_json_response
         )
         
         # Parse response
-        result_text = response.choices[0].message.content.strip()
+        result_text = response.content.strip()
         
         # DEBUG: Print the raw response
         print(f"🐛 DEBUG - Raw response length: {len(result_text)}")
         print(f"🐛 DEBUG - First 200 chars: '{result_text[:200]}...'")
         
-        # Try to parse directly as JSON first
-        try:
-            extracted_data = json.loads(result_text)
-            print(f"🐛 DEBUG - Direct JSON parsing successful")
-        except json.JSONDecodeError:
-            print(f"🐛 DEBUG - Direct JSON parsing failed, trying markdown extraction")
-            # If direct parsing fails, try to extract from markdown
-            if "```json" in result_text:
-                json_start = result_text.find("```json") + 7
-                json_end = result_text.find("```", json_start)
-                json_text = result_text[json_start:json_end].strip()
-                print(f"🐛 DEBUG - Extracted from ```json: '{json_text[:100]}...'")
-            elif "```" in result_text:
-                json_start = result_text.find("```") + 3
-                json_end = result_text.rfind("```")
-                json_text = result_text[json_start:json_end].strip()
-                print(f"🐛 DEBUG - Extracted from ```: '{json_text[:100]}...'")
-            elif "{" in result_text and "}" in result_text:
-                json_start = result_text.find("{")
-                json_end = result_text.rfind("}") + 1
-                json_text = result_text[json_start:json_end]
-                print(f"🐛 DEBUG - Extracted JSON object: '{json_text[:100]}...'")
-            else:
-                print(f"⚠️ No JSON found in response")
-                return {"qa_pairs": []}, 0
-            
-            extracted_data = json.loads(json_text)
-            print(f"🐛 DEBUG - Markdown JSON parsing successful")
+        extracted_data = parse_json_response(result_text)
         
         # Validate and fix the structure
         if not isinstance(extracted_data, dict):
@@ -146,7 +163,8 @@ def extract_qa_with_openai(content, source_url, prompt):
         print(f"🐛 DEBUG - Final valid Q&A pairs: {len(valid_qa_pairs)}")
         extracted_data["qa_pairs"] = valid_qa_pairs
         
-        return extracted_data, response.usage.total_tokens
+        # Cached responses cost nothing this run
+        return extracted_data, 0 if response.cached else response.total_tokens
         
     except json.JSONDecodeError as e:
         print(f"❌ JSON parsing error: {e}")
@@ -156,7 +174,7 @@ def extract_qa_with_openai(content, source_url, prompt):
         print(f"❌ OpenAI API error: {e}")
         return {"qa_pairs": []}, 0
 
-def process_markdown_file(md_file, prompt, output_dir):
+async def process_markdown_file(md_file, prompt, output_dir, boilerplate):
     """Process a single markdown file and extract Q&A"""
     try:
         print(f"📄 Processing: {md_file.name}")
@@ -173,6 +191,9 @@ def process_markdown_file(md_file, prompt, output_dir):
                 source_url = line.replace("**URL:**", "").strip()
                 break
         
+        # Drop nav/footer blocks shared with other pages
+        content = boilerplate.strip(content, md_file.name)
+        
         # Skip if content is too short
         if len(content) < 500:
             print(f"⚠️ Skipping {md_file.name} - content too short ({len(content)} chars)")
@@ -182,7 +203,7 @@ def process_markdown_file(md_file, prompt, output_dir):
         print(f"🤖 Extracting Q&A from {len(content):,} characters...")
         start_time = time.time()
         
-        extracted_data, tokens_used = extract_qa_with_openai(content, source_url, prompt)
+        extracted_data, tokens_used = await extract_qa_with_openai(content, source_url, prompt)
         
         end_time = time.time()
         
@@ -206,7 +227,7 @@ def process_markdown_file(md_file, prompt, output_dir):
         print(f"❌ Error processing {md_file.name}: {e}")
         return None, 0
 
-def main():
+async def main():
     """Main function to extract Q&A from Level 5 markdown files"""
     print("🚀 Starting Level 5 Q&A extraction from markdown files...")
     
@@ -240,20 +261,31 @@ def main():
     total_tokens = 0
     successful_extractions = 0
     
-    print(f"\n🔄 Processing {len(md_files)} files...")
+    print(f"\n🔄 Processing {len(md_files)} files ({MAX_PARALLEL} in parallel)...")
     
-    for i, md_file in enumerate(md_files, 1):
-        print(f"\n📄 [{i}/{len(md_files)}]")
-        
-        extracted_data, tokens_used = process_markdown_file(md_file, prompt, output_dir)
-        
+    # Learn nav/footer blocks repeated across pages so they are not sent to the LLM
+    boilerplate = BoilerplateFilter.from_files(md_files)
+    
+    # Each file's result is saved by process_markdown_file as soon as it completes
+    semaphore = asyncio.Semaphore(MAX_PARALLEL)
+    completed = 0
+    
+    async def process_with_limit(md_file):
+        nonlocal completed
+        async with semaphore:
+            result = await process_markdown_file(md_file, prompt, output_dir, boilerplate)
+        completed += 1
+        print(f"📄 [{completed}/{len(md_files)}] done: {md_file.name}")
+        return result
+    
+    results = await asyncio.gather(*(process_with_limit(md_file) for md_file in md_files))
+    
+    # Combine in file order so the combined output is stable between runs
+    for extracted_data, tokens_used in results:
         if extracted_data and "qa_pairs" in extracted_data:
             all_qa_pairs.extend(extracted_data["qa_pairs"])
             total_tokens += tokens_used
             successful_extractions += 1
-        
-        # Small delay to be respectful to API
-        time.sleep(0.5)
     
     # Create combined extraction file
     if all_qa_pairs:
@@ -281,6 +313,8 @@ def main():
         print(f"   📝 Total Q&A pairs: {len(all_qa_pairs)}")
         print(f"   🤖 Total tokens used: {total_tokens:,}")
         print(f"   💰 Estimated cost: ${total_tokens * 0.00000015:.4f}")
+        boilerplate.report()
+        report_llm_usage()
         print(f"   💾 Combined file: {combined_file}")
         
         # Show sample Q&A pairs
@@ -306,4 +340,4 @@ def main():
         print("❌ No Q&A pairs extracted from any files!")
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    asyncio.run(main()) 
\ No newline at end of file
@@ -9,6 +9,10 @@ from crawl4ai.async_configs import BrowserConfig, CrawlerRunConfig, CacheMode, L
 from crawl4ai.extraction_strategy import LLMExtractionStrategy
 from dotenv import load_dotenv
 from models.admission_schema import AdmissionDataSchema
+from markdown_chunker import map_chunks, merge_qa_pairs
+
+# Token budget of one markdown chunk sent to the LLM
+CHUNK_TOKENS = 4000
 
 
 def extract_urls_from_markdown(markdown_content):
@@ -109,6 +113,37 @@ def extract_urls_from_markdown(markdown_content):
     return unique_urls
 
 
+def merge_chunk_responses(responses):
+    """
+    Merge the JSON responses of every chunk into one: metadata from the first
+    chunk, Q&A pairs from all chunks (deduplicated and renumbered)
+    """
+    if len(responses) == 1:
+        return responses[0]
+
+    parsed = []
+    for response in responses:
+        content = response.strip()
+        if content.startswith('```json'):
+            content = content[7:]
+        if content.endswith('```'):
+            content = content[:-3]
+        try:
+            parsed.append(json.loads(content.strip()))
+        except json.JSONDecodeError:
+            print("⚠️ Skipping a chunk with invalid JSON")
+
+    if not parsed:
+        return responses[0]
+
+    merged = parsed[0]
+    merged['qa_pairs'] = merge_qa_pairs([data.get('qa_pairs', []) for data in parsed])
+    for i, qa in enumerate(merged['qa_pairs'], 1):
+        qa['id'] = f"qa_{i:03d}"
+    merged['count'] = len(merged['qa_pairs'])
+    return json.dumps(merged, ensure_ascii=False)
+
+
 async def main():
     """
     Extract structured JSON data from existing markdown file using LLM.
@@ -192,10 +227,8 @@ async def main():
     print("🚀 Starting extraction from markdown file...")
     
     try:
-        # Direct OpenAI approach
-        import openai
-        
-        client = openai.AsyncOpenAI(api_key=api_key)
+        # Direct OpenAI approach (shared client + rate-limit scheduler)
+        from llm_client import chat_completion
         
         # First, get summary of URLs for context
         url_summary = []
@@ -205,11 +238,12 @@ async def main():
         
         urls_context = "\n".join(url_summary) if url_summary else "Không có URL ưu tiên cao"
 
-        response = await client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
-                {"role": "system", "content": "Bạn là chuyên gia trích xuất dữ liệu cho chatbot tư vấn tuyển sinh CTU. Tạo các câu hỏi-trả lời CỤ THỂ dựa trên dữ liệu thực tế. LUÔN trả về JSON CHÍNH XÁC."},
-                {"role": "user", "content": f"""
+        async def extract_chunk(markdown_chunk):
+            response = await chat_completion(
+                model="gpt-4o-mini",
+                messages=[
+                    {"role": "system", "content": "Bạn là chuyên gia trích xuất dữ liệu cho chatbot tư vấn tuyển sinh CTU. Tạo các câu hỏi-trả lời CỤ THỂ dựa trên dữ liệu thực tế. LUÔN trả về JSON CHÍNH XÁC."},
+                    {"role": "user", "content": f"""
 {instruction}
 
 THÔNG TIN URL TUYỂN SINH CTU ĐÃ TRÍCH XUẤT:
@@ -247,14 +281,16 @@ YÊU CẦU TẠO CÂUHỎI:
 5. Tạo câu hỏi về thông tin liên hệ và tư vấn
 
 NỘI DUNG WEBSITE TUYỂN SINH CTU:
-{markdown_content[:12000]}
+{markdown_chunk}
 """}
-            ],
-            temperature=0.0,
-            max_tokens=6000
-        )
+                ],
+                temperature=0.0,
+                max_tokens=6000
+            )
+            return response.content
         
-        extracted_content = response.choices[0].message.content
+        chunk_responses = await map_chunks(markdown_content, extract_chunk, CHUNK_TOKENS)
+        extracted_content = merge_chunk_responses(chunk_responses)
         
         print("✅ Extraction successful!")
         
@@ -1,17 +1,21 @@
 import asyncio
 import json
 import os
+import sys
 import time
 from datetime import datetime
 from pathlib import Path
 from typing import List, Dict, Any, Optional, Set
+from collections import Counter, defaultdict
 import re
 from difflib import SequenceMatcher
 
-import openai
 from dotenv import load_dotenv
 from pydantic import BaseModel, Field
-from tenacity import retry, stop_after_attempt, wait_exponential
+
+from llm_client import chat_completion, report_llm_usage
+from near_duplicate_index import NearDuplicateIndex
+from text_normalizer import normalize_text
 
 
 class IntentQuestion(BaseModel):
@@ -441,14 +445,8 @@ CTU_INTENT_CATEGORIES = [
 ]
 
 
-@retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=4, max=10))
 async def generate_intent_questions(intent_category: Dict, num_variations: int = 20) -> List[str]:
-    """Generate question variations for a specific intent using OpenAI with retry logic"""
-    
-    client = openai.AsyncOpenAI(
-        api_key=os.getenv('OPENAI_API_KEY'),
-        timeout=30.0  # Set timeout to 30 seconds
-    )
+    """Generate question variations for a specific intent using OpenAI (429s and backoff are handled by the shared scheduler)"""
     
     # Get sample entity values for the prompt
     sample_values = {
@@ -556,17 +554,19 @@ LƯU Ý:
 """
 
     try:
-        response = await client.chat.completions.create(
+        # Batches reuse the same prompt, so the response cache must stay off here
+        response = await chat_completion(
             model="gpt-3.5-turbo",
             messages=[
                 {"role": "system", "content": "Bạn là chuyên gia tạo dataset câu hỏi. Bạn CHỈ được phép trả về một mảng JSON chứa các câu hỏi HOÀN CHỈNH (đã thay thế entity), không có text nào khác."},
                 {"role": "user", "content": prompt}
             ],
             temperature=0.8,  # Increased from 0.7 to 0.8 for more creativity
-            max_tokens=2000
+            max_tokens=2000,
+            use_cache=False
         )
         
-        content = response.choices[0].message.content.strip()
+        content = response.content.strip()
         
         # Clean và parse JSON
         try:
@@ -609,7 +609,7 @@ LƯU Ý:
             
     except Exception as e:
         print(f"Error generating questions for {intent_category['intent_name']}: {e}")
-        raise  # Re-raise for retry
+        raise
 
 
 async def enrich_with_entity_values(questions: List[str], intent_category: Dict) -> List[Dict]:
@@ -745,10 +745,125 @@ async def enrich_with_entity_values(questions: List[str], intent_category: Dict)
     return enriched_questions
 
 
-async def generate_intent_dataset():
-    """Generate complete intent question dataset for CTU admission chatbot"""
+# Each intent is generated as BATCHES_PER_INTENT calls of QUESTIONS_PER_BATCH questions
+QUESTIONS_PER_BATCH = 100
+BATCHES_PER_INTENT = 10  # 1000 questions per intent
+
+# (intent, batch) jobs running at the same time; the OpenAI scheduler applies RPM/TPM limits on top
+GENERATION_CONCURRENCY = int(os.getenv('GENERATION_CONCURRENCY', '8'))
+
+INTENT_DATASET_DIR = Path("output/intent_dataset")
+# Raw questions of every finished (intent, batch), so a resumed run only pays for missing batches
+CHECKPOINT_DIR = INTENT_DATASET_DIR / "checkpoints"
+
+
+def intermediate_file_path(intent_id: str) -> Path:
+    return INTENT_DATASET_DIR / f"ctu_intent_questions_{intent_id}.json"
+
+
+def batch_checkpoint_path(intent_id: str, batch: int) -> Path:
+    return CHECKPOINT_DIR / f"{intent_id}_batch_{batch:02d}.json"
+
+
+def save_batch_checkpoint(intent_id: str, batch: int, questions: List[str]):
+    CHECKPOINT_DIR.mkdir(exist_ok=True, parents=True)
+    path = batch_checkpoint_path(intent_id, batch)
+    # Write then rename, so an interrupted write never leaves a truncated checkpoint
+    tmp_path = path.with_suffix(".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(questions, f, ensure_ascii=False)
+    tmp_path.replace(path)
+
+
+def load_batch_checkpoint(intent_id: str, batch: int) -> Optional[List[str]]:
+    path = batch_checkpoint_path(intent_id, batch)
+    if not path.exists():
+        return None
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (json.JSONDecodeError, OSError) as e:
+        print(f"⚠️  Ignoring unreadable checkpoint {path}: {e}")
+        return None
+
+
+def load_intermediate_category(intent_id: str) -> Optional[IntentCategory]:
+    """A finished intent written by a previous run, if its file is valid"""
+    path = intermediate_file_path(intent_id)
+    if not path.exists():
+        return None
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return IntentCategory(**json.load(f))
+    except Exception as e:
+        print(f"⚠️  Ignoring unreadable intermediate file {path}: {e}")
+        return None
+
+
+def clear_generation_state():
+    """Forget checkpoints and per-intent files of a previous run (fresh generation)"""
+    removed = 0
+    if CHECKPOINT_DIR.exists():
+        for path in CHECKPOINT_DIR.glob("*.json"):
+            path.unlink()
+            removed += 1
+    for intent_config in CTU_INTENT_CATEGORIES:
+        path = intermediate_file_path(intent_config['intent_id'])
+        if path.exists():
+            path.unlink()
+            removed += 1
+    if removed:
+        print(f"🧹 Removed {removed} checkpoint/intermediate files from the previous run")
+
+
+async def build_intent_category(intent_config: Dict, all_questions: List[str]) -> IntentCategory:
+    """Enrich the generated questions of one intent and save its intermediate file"""
+    print(f"   [{intent_config['intent_id']}] Generated {len(all_questions)} raw questions")
+    
+    # Enrich with entity values
+    enriched_questions = await enrich_with_entity_values(
+        intent_config['seed_patterns'] + all_questions,
+        intent_config
+    )
+    print(f"   [{intent_config['intent_id']}] Enriched to {len(enriched_questions)} questions")
+    
+    # Create IntentCategory object
+    intent_category = IntentCategory(
+        intent_id=intent_config['intent_id'],
+        intent_name=intent_config['intent_name'],
+        description=intent_config['description'],
+        entities_required=intent_config['entities_required'],
+        keywords=intent_config['keywords'],
+        questions=[IntentQuestion(**q) for q in enriched_questions]
+    )
+    
+    # Save intermediate results
+    INTENT_DATASET_DIR.mkdir(exist_ok=True, parents=True)
+    
+    intermediate_file = intermediate_file_path(intent_config['intent_id'])
+    with open(intermediate_file, "w", encoding="utf-8") as f:
+        json.dump(intent_category.model_dump(), f, ensure_ascii=False, indent=2)
+    
+    print(f"   [{intent_config['intent_id']}] Saved intermediate results to: {intermediate_file}")
+    return intent_category
+
+
+async def generate_intent_dataset(concurrency: int = GENERATION_CONCURRENCY, resume: bool = False):
+    """
+    Generate complete intent question dataset for CTU admission chatbot
+
+    Every (intent, batch) pair is a job on a queue processed by `concurrency`
+    workers (concurrency=1 generates one batch at a time, intent by intent).
+    Each finished batch is checkpointed; an intent is enriched and its
+    intermediate file written as soon as its last batch finishes.
+
+    resume=True keeps the intents whose intermediate file exists and the
+    checkpointed batches of the others, and only generates the missing batches.
+    """
     
     print("🚀 Starting CTU Intent Question Generation...")
+    if not resume:
+        clear_generation_state()
     
     dataset = IntentDataset(
         metadata={
@@ -761,67 +876,94 @@ async def generate_intent_dataset():
         intent_categories=[]
     )
     
-    total_questions = 0
+    batch_results: Dict[int, Dict[int, List[str]]] = defaultdict(dict)
+    failed_intents: Set[int] = set()
+    completed: Dict[int, IntentCategory] = {}
     
-    for intent_config in CTU_INTENT_CATEGORIES:
-        print(f"\n📝 Generating questions for: {intent_config['intent_name']}")
+    # Jobs in intent order, so early intents finish (and are saved) first
+    queue: asyncio.Queue = asyncio.Queue()
+    reused_batches = 0
+    for intent_index, intent_config in enumerate(CTU_INTENT_CATEGORIES):
+        intent_id = intent_config['intent_id']
+        if resume:
+            intent_category = load_intermediate_category(intent_id)
+            if intent_category is not None:
+                completed[intent_index] = intent_category
+                continue
         
+        for batch in range(BATCHES_PER_INTENT):
+            questions = load_batch_checkpoint(intent_id, batch) if resume else None
+            # Empty checkpoints (saved by older versions for failed batches) are generated again
+            if questions:
+                batch_results[intent_index][batch] = questions
+                reused_batches += 1
+            else:
+                queue.put_nowait((intent_index, batch))
+    
+    if resume:
+        print(f"♻️  Resuming: {len(completed)} intents done, {reused_batches} batches checkpointed, "
+              f"{queue.qsize()} batches to generate")
+    print(f"⚡ {queue.qsize()} (intent, batch) jobs, {concurrency} at a time")
+    
+    async def finish_intent(intent_index: int):
+        intent_config = CTU_INTENT_CATEGORIES[intent_index]
+        batches = batch_results.pop(intent_index)
+        all_questions = [q for b in range(BATCHES_PER_INTENT) for q in batches[b]]
         try:
-            # Generate variations in smaller batches
-            all_questions = []
-            batch_size = 100  # Increased from 50 to 100
-            num_batches = 10  # Increased from 6 to 10 (1000 questions per intent)
-            
-            for batch in range(num_batches):
-                print(f"   Generating batch {batch + 1}/{num_batches}...")
-                batch_questions = await generate_intent_questions(intent_config, num_variations=batch_size)
-                all_questions.extend(batch_questions)
-                print(f"   Generated {len(batch_questions)} questions in this batch")
-                
-                # Add longer delay between batches to avoid rate limits
-                if batch < num_batches - 1:
-                    await asyncio.sleep(5)  # Increased from 2 to 5 seconds
-            
-            print(f"   Generated {len(all_questions)} raw questions")
-            
-            # Enrich with entity values
-            enriched_questions = await enrich_with_entity_values(
-                intent_config['seed_patterns'] + all_questions,
-                intent_config
-            )
-            print(f"   Enriched to {len(enriched_questions)} questions")
-            
-            # Create IntentCategory object
-            intent_category = IntentCategory(
-                intent_id=intent_config['intent_id'],
-                intent_name=intent_config['intent_name'],
-                description=intent_config['description'],
-                entities_required=intent_config['entities_required'],
-                keywords=intent_config['keywords'],
-                questions=[IntentQuestion(**q) for q in enriched_questions]
-            )
-            
-            dataset.intent_categories.append(intent_category)
-            total_questions += len(enriched_questions)
-            
-            # Save intermediate results
-            output_dir = Path("output/intent_dataset")
-            output_dir.mkdir(exist_ok=True, parents=True)
+            completed[intent_index] = await build_intent_category(intent_config, all_questions)
+        except Exception as e:
+            print(f"Error processing intent {intent_config['intent_name']}: {e}")
+            failed_intents.add(intent_index)
+    
+    # Intents whose batches were all checkpointed but which were never enriched
+    for intent_index in [i for i, batches in batch_results.items() if len(batches) == BATCHES_PER_INTENT]:
+        await finish_intent(intent_index)
+    
+    async def worker():
+        while True:
+            try:
+                intent_index, batch = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            intent_config = CTU_INTENT_CATEGORIES[intent_index]
             
-            intermediate_file = output_dir / f"ctu_intent_questions_{intent_config['intent_id']}.json"
-            with open(intermediate_file, "w", encoding="utf-8") as f:
-                json.dump(intent_category.model_dump(), f, ensure_ascii=False, indent=2)
+            try:
+                batch_questions = await generate_intent_questions(intent_config, num_variations=QUESTIONS_PER_BATCH)
+            except Exception as e:
+                # Other batches of the intent still run and are checkpointed for --resume
+                print(f"Error processing intent {intent_config['intent_name']} (batch {batch + 1}): {e}")
+                failed_intents.add(intent_index)
+                continue
+            if not batch_questions:
+                # Unparseable or empty output: not checkpointed, so --resume generates the batch again
+                print(f"Error processing intent {intent_config['intent_name']} (batch {batch + 1}): no valid questions")
+                failed_intents.add(intent_index)
+                continue
             
-            print(f"   Saved intermediate results to: {intermediate_file}")
+            save_batch_checkpoint(intent_config['intent_id'], batch, batch_questions)
+            batch_results[intent_index][batch] = batch_questions
+            print(f"   [{intent_config['intent_id']}] Batch {batch + 1}/{BATCHES_PER_INTENT}: "
+                  f"{len(batch_questions)} questions")
             
-        except Exception as e:
-            print(f"Error processing intent {intent_config['intent_name']}: {e}")
-            continue
+            if len(batch_results[intent_index]) == BATCHES_PER_INTENT:
+                await finish_intent(intent_index)
+    
+    await asyncio.gather(*(worker() for _ in range(max(1, concurrency))))
+    
+    # Final dataset keeps the CTU_INTENT_CATEGORIES order
+    dataset.intent_categories = [completed[i] for i in sorted(completed)]
+    total_questions = sum(len(category.questions) for category in dataset.intent_categories)
+    
+    incomplete = [CTU_INTENT_CATEGORIES[i]['intent_id'] for i in sorted(failed_intents)]
+    if incomplete:
+        print(f"\n⚠️  {len(incomplete)} intents are INCOMPLETE and missing from the dataset: {', '.join(incomplete)}")
+        print(f"   Re-run with --resume to generate only their missing batches")
     
     dataset.total_questions = total_questions
     
     # Save final dataset
-    output_dir = Path("output/intent_dataset")
+    output_dir = INTENT_DATASET_DIR
+    output_dir.mkdir(exist_ok=True, parents=True)
     output_file = output_dir / "ctu_intent_questions.json"
     
     with open(output_file, "w", encoding="utf-8") as f:
@@ -831,8 +973,9 @@ async def generate_intent_dataset():
     print(f"📊 Statistics:")
     print(f"   - Total intents: {len(dataset.intent_categories)}")
     print(f"   - Total questions: {total_questions}")
-    print(f"   - Average per intent: {total_questions / len(dataset.intent_categories):.1f}")
+    print(f"   - Average per intent: {total_questions / max(1, len(dataset.intent_categories)):.1f}")
     print(f"   - Saved to: {output_file}")
+    report_llm_usage()
     
     # Generate summary report
     summary = {
@@ -840,6 +983,7 @@ async def generate_intent_dataset():
         "statistics": {
             "total_intents": len(dataset.intent_categories),
             "total_questions": total_questions,
+            "incomplete_intents": incomplete,
             "by_intent": {}
         }
     }
@@ -861,8 +1005,28 @@ async def generate_intent_dataset():
     return dataset
 
 
-async def validate_dataset(dataset_file: str):
-    """Validate generated dataset for quality and coverage"""
+LENGTH_BUCKET = 20  # chars per length histogram bucket
+
+
+def length_histogram(lengths: List[int]) -> Dict[str, int]:
+    """Question lengths grouped in LENGTH_BUCKET-char buckets, e.g. {"20-39": 12}"""
+    buckets = Counter(length // LENGTH_BUCKET for length in lengths)
+    return {
+        f"{b * LENGTH_BUCKET}-{(b + 1) * LENGTH_BUCKET - 1}": buckets[b]
+        for b in sorted(buckets)
+    }
+
+
+async def validate_dataset(dataset_file: str) -> Dict[str, Any]:
+    """
+    Validate generated dataset for quality and coverage
+
+    Single pass over all questions with hash lookups only:
+    - exact duplicates (case-insensitive)
+    - near-duplicate clusters: different questions with the same normalize_text() form
+    - cross-intent collisions: the same normalized question under two or more intents
+    - per-intent length histogram
+    """
     
     print("\n🔍 Validating dataset...")
     
@@ -870,24 +1034,58 @@ async def validate_dataset(dataset_file: str):
         dataset = json.load(f)
     
     issues = []
+    seen_lower: Set[str] = set()
+    lengths: List[int] = []
+    intents_by_normalized: Dict[str, Set[str]] = defaultdict(set)
+    intent_stats: Dict[str, Dict[str, Any]] = {}
     
-    # Check for duplicate questions
-    all_questions = []
     for category in dataset["intent_categories"]:
+        intent_id = category.get("intent_id", category.get("intent_name", "unknown"))
+        variants: Dict[str, Set[str]] = defaultdict(set)
+        intent_lengths = []
+        
         for q in category["questions"]:
-            if q["text"].lower() in [x.lower() for x in all_questions]:
-                issues.append(f"Duplicate: {q['text']}")
-            all_questions.append(q["text"])
+            text = q["text"]
+            lowered = text.lower()
+            if lowered in seen_lower:
+                issues.append(f"Duplicate: {text}")
+            seen_lower.add(lowered)
+            
+            normalized = normalize_text(text)
+            variants[normalized].add(lowered)
+            intents_by_normalized[normalized].add(intent_id)
+            intent_lengths.append(len(text))
+        
+        lengths.extend(intent_lengths)
+        clusters = [sorted(texts) for texts in variants.values() if len(texts) > 1]
+        intent_stats[intent_id] = {
+            "questions": len(intent_lengths),
+            "unique_normalized": len(variants),
+            "length_histogram": length_histogram(intent_lengths),
+            "near_duplicate_clusters": clusters
+        }
     
-    # Check question length variety
-    lengths = [len(q) for q in all_questions]
-    avg_length = sum(lengths) / len(lengths)
+    collisions = {
+        normalized: sorted(intents)
+        for normalized, intents in intents_by_normalized.items() if len(intents) > 1
+    }
+    for normalized, intents in collisions.items():
+        issues.append(f"Cross-intent collision {intents}: {normalized}")
     
     print(f"\n📊 Validation Results:")
-    print(f"   - Total questions: {len(all_questions)}")
-    print(f"   - Unique questions: {len(set(q.lower() for q in all_questions))}")
-    print(f"   - Average length: {avg_length:.1f} chars")
-    print(f"   - Min/Max length: {min(lengths)}/{max(lengths)} chars")
+    print(f"   - Total questions: {len(lengths)}")
+    print(f"   - Unique questions: {len(seen_lower)}")
+    if lengths:
+        print(f"   - Average length: {sum(lengths) / len(lengths):.1f} chars")
+        print(f"   - Min/Max length: {min(lengths)}/{max(lengths)} chars")
+    print(f"   - Cross-intent collisions: {len(collisions)}")
+    
+    print(f"\n📋 Per-intent statistics:")
+    for intent_id, stats in intent_stats.items():
+        histogram = ", ".join(f"{bucket}: {count}" for bucket, count in stats["length_histogram"].items())
+        print(f"   - {intent_id}: {stats['questions']} questions, {stats['unique_normalized']} unique, "
+              f"{len(stats['near_duplicate_clusters'])} near-duplicate clusters")
+        print(f"     lengths [{histogram}]")
     
     if issues:
         print(f"\n⚠️  Found {len(issues)} issues:")
@@ -895,22 +1093,16 @@ async def validate_dataset(dataset_file: str):
             print(f"   - {issue}")
     else:
         print("\n✅ No issues found!")
+    
+    return {
+        "total_questions": len(lengths),
+        "unique_questions": len(seen_lower),
+        "issues": issues,
+        "cross_intent_collisions": collisions,
+        "intents": intent_stats
+    }
 
 
-def normalize_text(text: str) -> str:
-    """Normalize text for comparison to avoid duplicates"""
-    # Convert to lowercase
-    text = text.lower()
-    # Remove punctuation
-    text = re.sub(r'[^\w\s]', '', text)
-    # Remove extra spaces
-    text = ' '.join(text.split())
-    # Remove common variations
-    text = text.replace('ctu', 'đại học cần thơ')
-    text = text.replace('đhct', 'đại học cần thơ')
-    text = text.replace('đại học cần thơ', '')
-    return text
-
 def is_similar(text1: str, text2: str, threshold: float = 0.85) -> bool:
     """Check if two texts are similar using sequence matcher"""
     text1 = normalize_text(text1)
@@ -929,12 +1121,12 @@ def merge_datasets(existing_file: str, new_file: str, output_file: str):
     with open(new_file, 'r', encoding='utf-8') as f:
         new = json.load(f)
     
-    # Track unique questions
-    unique_questions: Dict[str, Set[str]] = {}
+    # Track unique questions (LSH index, so each check only looks at likely duplicates)
+    unique_questions: Dict[str, NearDuplicateIndex] = {}
     for intent in existing['intent_categories']:
-        unique_questions[intent['intent_id']] = {
+        unique_questions[intent['intent_id']] = NearDuplicateIndex(
             normalize_text(q['text']) for q in intent['questions']
-        }
+        )
     
     # Merge datasets
     merged = existing.copy()
@@ -955,25 +1147,18 @@ def merge_datasets(existing_file: str, new_file: str, output_file: str):
             for question in new_intent['questions']:
                 normalized = normalize_text(question['text'])
                 
-                # Check for duplicates
-                is_duplicate = False
-                for existing_norm in unique_questions[intent_id]:
-                    if is_similar(normalized, existing_norm):
-                        is_duplicate = True
-                        break
-                
-                if not is_duplicate:
+                # Add unless a near-duplicate (is_similar) is already there
+                if unique_questions[intent_id].add_if_new(normalized):
                     existing_intent['questions'].append(question)
-                    unique_questions[intent_id].add(normalized)
                     total_added += 1
                 else:
                     total_skipped += 1
         else:
             # Add new intent
             merged['intent_categories'].append(new_intent)
-            unique_questions[intent_id] = {
+            unique_questions[intent_id] = NearDuplicateIndex(
                 normalize_text(q['text']) for q in new_intent['questions']
-            }
+            )
             total_added += len(new_intent['questions'])
     
     # Update total questions
@@ -1047,28 +1232,40 @@ async def generate_more_questions(
     
     # Add style variations
     all_variations = []
+    # Normalized form of each variation, computed once, and an LSH index over them
+    # so the is_similar check per candidate only looks at likely duplicates
+    normalized_of: Dict[str, str] = {}
+    variation_index = NearDuplicateIndex()
+    
+    def add_variation(variation: str, normalized: str):
+        all_variations.append(variation)
+        normalized_of[variation] = normalized
+        if normalized not in variation_index.exact:
+            variation_index.add(normalized)
+    
     for question in filled_questions:
         # Keep original
-        all_variations.append(question)
+        add_variation(question, normalize_text(question))
         
         # Add style variations
         for style in style_variations:
             if style in style_patterns:
                 for prefix in style_patterns[style]:
+                    variation = f"{prefix} {question.lower()}"
+                    normalized = normalize_text(variation)
                     # Add prefix if not already similar
-                    if not any(is_similar(f"{prefix} {question.lower()}", v) for v in all_variations):
-                        variation = f"{prefix} {question.lower()}"
-                        all_variations.append(variation)
+                    if variation_index.find_similar(normalized) is None:
+                        add_variation(variation, normalized)
                         
-                        # Add question mark if missing
+                        # Add question mark if missing (same normalized form)
                         if not variation.endswith('?'):
-                            all_variations.append(f"{variation}?")
+                            add_variation(f"{variation}?", normalized)
     
     # Remove duplicates while preserving order
     seen = set()
     unique_variations = []
     for v in all_variations:
-        normalized = normalize_text(v)
+        normalized = normalized_of[v]
         if normalized not in seen:
             seen.add(normalized)
             unique_variations.append(v)
@@ -1111,12 +1308,12 @@ async def enrich_dataset(
                     f"Điều kiện {intent['intent_name'].lower()}?"
                 ])
     
-    # Track unique questions
-    unique_questions: Dict[str, Set[str]] = {}
+    # Track unique questions (LSH index, so each check only looks at likely duplicates)
+    unique_questions: Dict[str, NearDuplicateIndex] = {}
     for intent in dataset['intent_categories']:
-        unique_questions[intent['intent_id']] = {
+        unique_questions[intent['intent_id']] = NearDuplicateIndex(
             normalize_text(q['text']) for q in intent['questions']
-        }
+        )
     
     # Generate more questions for each intent
     total_added = 0
@@ -1133,7 +1330,7 @@ async def enrich_dataset(
                 new_questions = await generate_more_questions(
                     intent,
                     num_variations=min(needed // 2, 20),  # Limit to 20 variations per batch
-                    style_variations=["formal", "informal", "teen", "typo"]
+                    style_variations=list(style_patterns.keys())  # All styles
                 )
                 
                 # Add non-duplicate questions
@@ -1141,21 +1338,14 @@ async def enrich_dataset(
                 for question in new_questions:
                     normalized = normalize_text(question)
                     
-                    # Check for duplicates
-                    is_duplicate = False
-                    for existing_norm in unique_questions[intent['intent_id']]:
-                        if is_similar(normalized, existing_norm):
-                            is_duplicate = True
-                            break
-                    
-                    if not is_duplicate:
+                    # Add unless a near-duplicate (is_similar) is already there
+                    if unique_questions[intent['intent_id']].add_if_new(normalized):
                         intent['questions'].append({
                             "text": question,
                             "entities": intent.get('entities_required', []),
                             "is_template": False,
                             "source": "enriched"
                         })
-                        unique_questions[intent['intent_id']].add(normalized)
                         added += 1
                 
                 total_added += added
@@ -1193,20 +1383,26 @@ async def main():
         print("❌ Please set OPENAI_API_KEY in .env file")
         return
     
-    output_dir = Path("output/intent_dataset")
+    output_dir = INTENT_DATASET_DIR
     output_dir.mkdir(exist_ok=True, parents=True)
     
     # Check if dataset exists
     existing_file = output_dir / "ctu_intent_questions.json"
-    if existing_file.exists():
+    if "--resume" in sys.argv:
+        # Continue an interrupted generation from its checkpoints
+        dataset = await generate_intent_dataset(resume=True)
+        await validate_dataset(str(existing_file))
+    
+    elif existing_file.exists():
         # Ask user what to do
         print("\n📂 Found existing dataset!")
         print("What would you like to do?")
         print("1. Generate new dataset")
         print("2. Enrich existing dataset")
         print("3. Merge with new dataset")
+        print("4. Resume interrupted generation")
         
-        choice = input("\nEnter your choice (1-3): ").strip()
+        choice = input("\nEnter your choice (1-4): ").strip()
         
         if choice == "1":
             # Generate new dataset
@@ -1235,6 +1431,11 @@ async def main():
             )
             await validate_dataset(str(merged_file))
             
+        elif choice == "4":
+            # Only generate the batches missing from the last run
+            dataset = await generate_intent_dataset(resume=True)
+            await validate_dataset(str(existing_file))
+            
         else:
             print("❌ Invalid choice!")
             return
@@ -6,12 +6,17 @@ from typing import Dict, List, Any, Optional
 
 from dotenv import load_dotenv
 
+from qa_retriever import QARetriever
+
+# BM25 score below which the closest extracted question is not considered an answer
+RETRIEVAL_MIN_SCORE = 12.0
+
 
 class IntentKnowledgeMapper:
     """Maps user intents to knowledge base queries and generates responses"""
     
-    def __init__(self, intent_file: str, knowledge_file: str):
-        """Initialize mapper with intent dataset and knowledge base"""
+    def __init__(self, intent_file: str, knowledge_file: str, qa_files: Optional[List[str]] = None):
+        """Initialize mapper with intent dataset, knowledge base and extracted Q&A pairs (data/final by default)"""
         
         # Load intent dataset
         with open(intent_file, 'r', encoding='utf-8') as f:
@@ -26,6 +31,9 @@ class IntentKnowledgeMapper:
         
         # Response templates
         self.response_templates = self._define_response_templates()
+        
+        # BM25 index over the questions of the extracted Q&A pairs
+        self.retriever = QARetriever.from_files(qa_files)
     
     def _define_mapping_rules(self) -> Dict[str, Dict]:
         """Define how each intent maps to knowledge base queries"""
@@ -205,12 +213,23 @@ class IntentKnowledgeMapper:
         
         return response
     
+    def retrieve(self, question: str, k: int = 5, min_score: float = 0.0) -> List[Dict[str, Any]]:
+        """Top k extracted Q&A pairs for the question, each with its BM25 score"""
+        
+        return self.retriever.search(question, k, min_score)
+    
     def process_question(self, question: str, detected_intent: str, extracted_entities: Dict[str, str]) -> str:
         """Process a question and generate response"""
         
         # Query knowledge base
         knowledge = self.query_knowledge(detected_intent, extracted_entities)
         
+        # Without structured knowledge, answer with the closest extracted Q&A pair
+        if not knowledge:
+            matches = self.retrieve(question, k=1, min_score=RETRIEVAL_MIN_SCORE)
+            if matches:
+                return matches[0]["answer"]
+        
         # Generate response
         response = self.generate_response(detected_intent, extracted_entities, knowledge)
         
@@ -325,6 +344,11 @@ def test_mapper():
         print(f"\n{i}. Q: {test['question']}")
         print(f"   A: {response}")
     
+    # Retrieval over the extracted Q&A pairs
+    print(f"\n🔎 Closest extracted Q&A pairs ({len(mapper.retriever)} indexed):")
+    for match in mapper.retrieve(test_cases[0]["question"], k=3):
+        print(f"   [{match['score']:.1f}] {match['question']}")
+    
     # Validate mapping
     print("\n🔍 Validation Report:")
     validation = mapper.validate_mapping()
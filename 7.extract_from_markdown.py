@@ -8,7 +8,7 @@ from crawl4ai.async_configs import BrowserConfig, LLMConfig, CrawlerRunConfig, C
 from crawl4ai.extraction_strategy import LLMExtractionStrategy
 from dotenv import load_dotenv
 from models.admission_schema import AdmissionDataSchema
-from openai import AsyncOpenAI
+from llm_client import chat_completion
 
 
 async def extract_from_markdown(md_file_path, output_dir="output"):
@@ -101,8 +101,6 @@ async def extract_from_markdown(md_file_path, output_dir="output"):
                     data_url = "data:text/html;charset=utf-8," + temp_html.replace(" ", "%20").replace("\n", "%0A")
                     
                     # Direct LLM call approach
-                    client = AsyncOpenAI(api_key=api_key)
-                    
                     prompt = f"""
                     {instruction}
                     
@@ -112,14 +110,14 @@ async def extract_from_markdown(md_file_path, output_dir="output"):
                     Please extract the data according to the schema and return valid JSON.
                     """
                     
-                    response = await client.chat.completions.create(
+                    response = await chat_completion(
                         model="gpt-4o-mini",
                         messages=[{"role": "user", "content": prompt}],
                         temperature=0.0,
                         max_tokens=5000
                     )
                     
-                    extracted_data = response.choices[0].message.content
+                    extracted_data = response.content
             
             if extracted_data:
                 # Parse extracted data
@@ -1,16 +1,22 @@
 import asyncio
 import json
 import os
+import sys
 from pathlib import Path
 from datetime import datetime
-from typing import List, Set, Dict
+from typing import List, Dict, Optional, Tuple
 import time
 
-from crawl4ai import AsyncWebCrawler
+from crawl4ai import AsyncWebCrawler, SemaphoreDispatcher, RateLimiter
 from crawl4ai.async_configs import BrowserConfig, CrawlerRunConfig, CacheMode, LLMConfig
 from crawl4ai.extraction_strategy import LLMExtractionStrategy
 from dotenv import load_dotenv
 
+from crawl_frontier import CrawlFrontier
+from url_canonicalizer import canonicalize_url, SeenURLIndex
+from incremental_crawl import PageStateStore, content_hash, response_validators, is_not_modified
+from intent_classifier import IntentClassifier
+
 class AutoRecursiveCTUCrawler:
     """
     🤖 Fully Automated Recursive CTU Crawler
@@ -25,13 +31,36 @@ class AutoRecursiveCTUCrawler:
     7. You can rest! 😴
     """
     
-    def __init__(self, api_key: str, max_depth: int = 5, max_urls_per_level: int = 10):
+    def __init__(self, api_key: str, max_depth: int = 5, max_urls_per_level: int = 10,
+                 concurrency: int = 1, per_host_delay: Tuple[float, float] = (1.0, 2.0),
+                 frontier_path: str = 'data/auto_recursive/frontier.db', incremental: bool = False):
         self.api_key = api_key
         self.max_depth = max_depth
         self.max_urls_per_level = max_urls_per_level
         
-        # Tracking
-        self.crawled_urls: Set[str] = set()
+        # Concurrent mode: concurrency > 1 crawls each level with a worker pool,
+        # per_host_delay is the random delay range between requests to one host
+        self.concurrency = concurrency
+        self.per_host_delay = per_host_delay
+        
+        # Shared browser, started once per run (see start_crawler)
+        self.browser_config = BrowserConfig(headless=True, verbose=False)
+        self.crawler: Optional[AsyncWebCrawler] = None
+        
+        # On-disk frontier so an interrupted run can be resumed
+        self.frontier = CrawlFrontier(frontier_path)
+        
+        # Incremental mode: conditional requests + content hash, unchanged pages skip LLM extraction
+        self.incremental = incremental
+        self.page_store = PageStateStore()
+        self.incremental_stats = {'not_modified': 0, 'unchanged': 0, 'extracted': 0}
+        
+        # Intent keywords, priority order and fallback from config/enhanced_intents.json
+        self.intent_classifier = IntentClassifier.from_config()
+        
+        # Tracking: canonical URL (dedup key) -> URL as linked and fetched
+        self.crawled_urls: Dict[str, str] = {}
+        self.url_index = SeenURLIndex()
         self.all_qa_pairs: List[Dict] = []
         self.intent_data: Dict[str, List] = {
             # Core admission intents
@@ -85,51 +114,42 @@ class AutoRecursiveCTUCrawler:
             return False
             
         # Skip already crawled
-        if url in self.crawled_urls:
+        if canonicalize_url(url) in self.crawled_urls:
             return False
             
         return True
     
     def detect_intent(self, question: str, answer: str) -> str:
-        """Smart intent detection based on keywords"""
-        text = (question + " " + answer).lower()
-        
-        # Enhanced intent keyword mapping
-        intent_keywords = {
-            # Core admission intents
-            'hoi_nganh_hoc': ['ngành', 'chuyên ngành', 'đào tạo', 'chương trình', 'major', 'faculty', 'khoa', 'bộ môn'],
-            'hoi_phuong_thuc_xet_tuyen': ['xét tuyển', 'phương thức', 'thi', 'admission', 'entrance', 'tuyển sinh'],
-            'hoi_hoc_phi': ['học phí', 'chi phí', 'tuition', 'fee', 'cost', 'tiền học', 'lệ phí'],
-            'hoi_lien_he': ['liên hệ', 'contact', 'phone', 'email', 'address', 'địa chỉ', 'hotline', 'tư vấn'],
-            
-            # Extended admission intents
-            'hoi_diem_chuan': ['điểm chuẩn', 'điểm xét tuyển', 'điểm thi', 'điểm số', 'cut-off', 'benchmark'],
-            'hoi_ho_so_xet_tuyen': ['hồ sơ', 'thủ tục', 'giấy tờ', 'đăng ký', 'nộp hồ sơ', 'documents', 'application'],
-            'hoi_lich_tuyen_sinh': ['lịch', 'thời gian', 'deadline', 'hạn chót', 'schedule', 'calendar', 'ngày'],
-            'hoi_hoc_bong': ['học bổng', 'hỗ trợ', 'scholarship', 'tài chính', 'miễn giảm', 'trợ cấp'],
-            'hoi_co_so_vat_chat': ['cơ sở vật chất', 'ký túc xá', 'dormitory', 'facilities', 'infrastructure', 'ktx'],
-            'hoi_sinh_vien_quoc_te': ['quốc tế', 'international', 'nước ngoài', 'foreign', 'exchange'],
-            'hoi_chuong_trinh_lien_ket': ['liên kết', 'partnership', 'collaboration', 'joint program', 'hợp tác'],
-            'hoi_thuc_tap_viec_lam': ['thực tập', 'việc làm', 'internship', 'job', 'career', 'employment', 'tốt nghiệp'],
-            'hoi_hoat_dong_sinh_vien': ['hoạt động', 'sinh viên', 'clb', 'club', 'activities', 'extracurricular'],
-            'hoi_dao_tao_sau_dai_hoc': ['sau đại học', 'thạc sĩ', 'tiến sĩ', 'master', 'phd', 'graduate', 'postgraduate'],
-            'hoi_thong_tin_chung': ['thông tin', 'general', 'about', 'overview', 'giới thiệu', 'tổng quan']
-        }
-        
-        for intent, keywords in intent_keywords.items():
-            if any(keyword in text for keyword in keywords):
-                return intent
-                
-        return 'hoi_thong_tin_chung'  # Default
+        """Smart intent detection: every intent scored by its keyword occurrences in one pass"""
+        return self.intent_classifier.classify(question + " " + answer)
     
-    async def crawl_and_extract_single_url(self, url: str, level: int) -> Dict:
-        """Crawl single URL and extract to JSON"""
-        print(f"🕷️  Level {level}: Crawling {url}")
-        
-        # Browser config
-        browser_config = BrowserConfig(headless=True, verbose=False)
+    async def start_crawler(self):
+        """Start one browser that is reused for every URL of the run"""
+        if self.crawler is None:
+            started = time.time()
+            self.crawler = AsyncWebCrawler(config=self.browser_config)
+            await self.crawler.start()
+            print(f"🌐 Browser started in {time.time() - started:.2f}s (reused for all levels)")
+    
+    async def close_crawler(self):
+        """Close the shared browser"""
+        if self.crawler is not None:
+            await self.crawler.close()
+            self.crawler = None
+            print("🌐 Browser closed")
+    
+    def build_run_config(self, extract: bool = True) -> CrawlerRunConfig:
+        """Crawler run config with the LLM extraction strategy (extract=False: markdown only)"""
+        if not extract:
+            return CrawlerRunConfig(cache_mode=CacheMode.BYPASS)
         
-        # LLM extraction strategy
+        return CrawlerRunConfig(
+            extraction_strategy=self.build_extraction_strategy(),
+            cache_mode=CacheMode.BYPASS
+        )
+    
+    def build_extraction_strategy(self) -> LLMExtractionStrategy:
+        """LLM extraction strategy: Q&A pairs and admission URLs of a page"""
         instruction = f"""
         Phân tích nội dung tuyển sinh Đại học Cần Thơ và trích xuất:
         
@@ -168,7 +188,7 @@ class AutoRecursiveCTUCrawler:
             "required": ["qa_pairs", "urls"]
         }
         
-        llm_strategy = LLMExtractionStrategy(
+        return LLMExtractionStrategy(
             llm_config=LLMConfig(
                 provider="openai/gpt-4o-mini",
                 api_token=self.api_key
@@ -179,72 +199,252 @@ class AutoRecursiveCTUCrawler:
             chunk_token_threshold=1200,
             overlap_rate=0.1
         )
+    
+    def process_crawl_result(self, url: str, level: int, result) -> Dict:
+        """Save markdown/JSON of a crawl result and return the extracted data"""
+        if not result.success:
+            print(f"❌ Failed to crawl {url}: {result.error_message}")
+            return {"qa_pairs": [], "urls": [], "success": False}
         
-        run_config = CrawlerRunConfig(
-            extraction_strategy=llm_strategy,
-            cache_mode=CacheMode.BYPASS
-        )
+        markdown = result.markdown.raw_markdown if result.markdown else ""
         
-        try:
-            async with AsyncWebCrawler(config=browser_config) as crawler:
-                result = await crawler.arun(url=url, config=run_config)
+        # Save markdown
+        url_filename = url.replace("://", "_").replace("/", "_").replace("?", "_")[:100]
+        md_file = f"output/auto_recursive/markdown/level_{level}_{url_filename}.md"
+        with open(md_file, "w", encoding="utf-8") as f:
+            f.write(markdown)
+        
+        # Process extracted content
+        if result.extracted_content:
+            try:
+                extracted_data = json.loads(result.extracted_content) if isinstance(result.extracted_content, str) else result.extracted_content
                 
-                if not result.success:
-                    print(f"❌ Failed to crawl {url}: {result.error_message}")
-                    return {"qa_pairs": [], "urls": [], "success": False}
+                # Handle case where OpenAI returns a list instead of dict
+                if isinstance(extracted_data, list):
+                    if len(extracted_data) > 0 and isinstance(extracted_data[0], dict):
+                        extracted_data = extracted_data[0]  # Take first item
+                    else:
+                        extracted_data = {"qa_pairs": [], "urls": []}
                 
-                # Save markdown
-                url_filename = url.replace("://", "_").replace("/", "_").replace("?", "_")[:100]
-                md_file = f"output/auto_recursive/markdown/level_{level}_{url_filename}.md"
-                with open(md_file, "w", encoding="utf-8") as f:
-                    f.write(result.markdown.raw_markdown if result.markdown else "")
+                # Ensure required keys exist
+                if not isinstance(extracted_data, dict):
+                    extracted_data = {"qa_pairs": [], "urls": []}
                 
-                # Process extracted content
-                if result.extracted_content:
-                    try:
-                        extracted_data = json.loads(result.extracted_content) if isinstance(result.extracted_content, str) else result.extracted_content
-                        
-                        # Handle case where OpenAI returns a list instead of dict
-                        if isinstance(extracted_data, list):
-                            if len(extracted_data) > 0 and isinstance(extracted_data[0], dict):
-                                extracted_data = extracted_data[0]  # Take first item
-                            else:
-                                extracted_data = {"qa_pairs": [], "urls": []}
-                        
-                        # Ensure required keys exist
-                        if not isinstance(extracted_data, dict):
-                            extracted_data = {"qa_pairs": [], "urls": []}
-                        
-                        qa_pairs = extracted_data.get('qa_pairs', [])
-                        urls = extracted_data.get('urls', [])
-                        
-                        # Save JSON
-                        json_file = f"output/auto_recursive/json/level_{level}_{url_filename}.json"
-                        with open(json_file, "w", encoding="utf-8") as f:
-                            json.dump(extracted_data, f, indent=2, ensure_ascii=False)
-                        
-                        print(f"✅ Extracted {len(qa_pairs)} Q&A pairs and {len(urls)} URLs")
-                        
-                        return {
-                            "qa_pairs": qa_pairs,
-                            "urls": urls,
-                            "success": True,
-                            "source_url": url,
-                            "level": level,
-                            "crawl_time": datetime.now().isoformat()
-                        }
-                        
-                    except Exception as e:
-                        print(f"❌ Error parsing extracted content from {url}: {e}")
-                        return {"qa_pairs": [], "urls": [], "success": False}
-                else:
-                    print(f"⚠️  No extracted content from {url}")
-                    return {"qa_pairs": [], "urls": [], "success": False}
-                    
+                qa_pairs = extracted_data.get('qa_pairs', [])
+                urls = extracted_data.get('urls', [])
+                
+                # Save JSON
+                json_file = f"output/auto_recursive/json/level_{level}_{url_filename}.json"
+                with open(json_file, "w", encoding="utf-8") as f:
+                    json.dump(extracted_data, f, indent=2, ensure_ascii=False)
+                
+                print(f"✅ Extracted {len(qa_pairs)} Q&A pairs and {len(urls)} URLs")
+                
+                return {
+                    "qa_pairs": qa_pairs,
+                    "urls": urls,
+                    "success": True,
+                    "source_url": url,
+                    "level": level,
+                    "content_hash": content_hash(markdown),
+                    **response_validators(result.response_headers),
+                    "crawl_time": datetime.now().isoformat()
+                }
+                
+            except Exception as e:
+                print(f"❌ Error parsing extracted content from {url}: {e}")
+                return {"qa_pairs": [], "urls": [], "success": False}
+        else:
+            print(f"⚠️  No extracted content from {url}")
+            return {"qa_pairs": [], "urls": [], "success": False}
+    
+    def reuse_page_state(self, url: str, level: int, state: Dict) -> Dict:
+        """Result of an unchanged page, taken from the page state store"""
+        return {
+            "qa_pairs": state['result'].get('qa_pairs', []),
+            "urls": state['result'].get('urls', []),
+            "success": True,
+            "source_url": url,
+            "level": level,
+            "content_hash": state['content_hash'],
+            "etag": state['etag'],
+            "last_modified": state['last_modified'],
+            "crawl_time": datetime.now().isoformat()
+        }
+    
+    async def check_not_modified(self, url: str, level: int) -> Optional[Dict]:
+        """Conditional request with the stored ETag/Last-Modified; stored result if the page is unchanged"""
+        state = self.page_store.get(url)
+        if not state or not (state['etag'] or state['last_modified']):
+            return None
+        
+        if not await is_not_modified(url, state['etag'], state['last_modified']):
+            return None
+        
+        print(f"♻️  {url}: 304 Not Modified, reusing previous extraction")
+        self.incremental_stats['not_modified'] += 1
+        return self.reuse_page_state(url, level, state)
+    
+    async def extract_if_changed(self, url: str, level: int, result) -> Dict:
+        """Run LLM extraction on a markdown-only crawl result only if its content hash changed"""
+        if not result.success:
+            return self.process_crawl_result(url, level, result)
+        
+        markdown = result.markdown.raw_markdown if result.markdown else ""
+        new_hash = content_hash(markdown)
+        validators = response_validators(result.response_headers)
+        
+        state = self.page_store.get(url)
+        if state and state['content_hash'] == new_hash:
+            print(f"♻️  {url}: content unchanged, skipping LLM extraction")
+            self.incremental_stats['unchanged'] += 1
+            reused = self.reuse_page_state(url, level, state)
+            reused.update(validators)
+            return reused
+        
+        # Extract from the markdown of this fetch (relative links resolved against the real URL),
+        # the same call AsyncWebCrawler makes after a fetch with an extraction strategy
+        self.incremental_stats['extracted'] += 1
+        extracted = await asyncio.to_thread(self.build_extraction_strategy().run, url, [markdown])
+        result.extracted_content = json.dumps(extracted, default=str, ensure_ascii=False)
+        processed = self.process_crawl_result(url, level, result)
+        processed['content_hash'] = new_hash
+        return processed
+    
+    async def fetch_and_extract(self, crawler: AsyncWebCrawler, url: str, level: int) -> Dict:
+        """Fetch one URL with the given crawler and extract it"""
+        if not self.incremental:
+            result = await crawler.arun(url=url, config=self.build_run_config())
+            return self.process_crawl_result(url, level, result)
+        
+        reused = await self.check_not_modified(url, level)
+        if reused is not None:
+            return reused
+        
+        result = await crawler.arun(url=url, config=self.build_run_config(extract=False))
+        return await self.extract_if_changed(url, level, result)
+    
+    async def crawl_and_extract_single_url(self, url: str, level: int) -> Dict:
+        """Crawl single URL and extract to JSON"""
+        print(f"🕷️  Level {level}: Crawling {url}")
+        
+        try:
+            if self.crawler is not None:
+                return await self.fetch_and_extract(self.crawler, url, level)
+            
+            # Standalone call outside run_recursive_crawl
+            async with AsyncWebCrawler(config=self.browser_config) as crawler:
+                return await self.fetch_and_extract(crawler, url, level)
+            
         except Exception as e:
             print(f"❌ Error crawling {url}: {e}")
             return {"qa_pairs": [], "urls": [], "success": False}
     
+    async def crawl_level_concurrently(self, urls: List[str], level: int) -> Dict[str, Dict]:
+        """Crawl one level's frontier with a bounded worker pool and per-host rate limiting"""
+        print(f"🕷️  Level {level}: Crawling {len(urls)} URLs with {self.concurrency} workers")
+        
+        results = {}
+        self.frontier.mark_in_flight(urls)
+        semaphore = asyncio.Semaphore(self.concurrency)
+        
+        async def bounded(coro):
+            async with semaphore:
+                return await coro
+        
+        if self.incremental:
+            # Conditional requests first; pages answering 304 are not fetched at all
+            reused = await asyncio.gather(*(bounded(self.check_not_modified(url, level)) for url in urls))
+            for url, result in zip(urls, reused):
+                if result is not None:
+                    results[url] = result
+            urls = [url for url in urls if url not in results]
+            if not urls:
+                return results
+        
+        # Same setup as 3.multi_url_crawler.crawl_urls: the semaphore bounds the
+        # workers, the rate limiter spaces out requests to each host
+        dispatcher = SemaphoreDispatcher(
+            semaphore_count=self.concurrency,
+            rate_limiter=RateLimiter(
+                base_delay=self.per_host_delay,
+                max_delay=10.0
+            )
+        )
+        
+        run_config = self.build_run_config(extract=not self.incremental)
+        try:
+            crawl_results = await self.crawler.arun_many(urls, config=run_config, dispatcher=dispatcher)
+        except Exception as e:
+            print(f"❌ Error crawling level {level}: {e}")
+            return results
+        
+        if self.incremental:
+            extracted = await asyncio.gather(
+                *(bounded(self.extract_if_changed(result.url, level, result)) for result in crawl_results),
+                return_exceptions=True
+            )
+            for result, processed in zip(crawl_results, extracted):
+                if isinstance(processed, Exception):
+                    print(f"❌ Error processing {result.url}: {processed}")
+                    processed = {"qa_pairs": [], "urls": [], "success": False}
+                results[result.url] = processed
+            return results
+        
+        for result in crawl_results:
+            try:
+                print(f"🕷️  Level {level}: {result.url} ", end="")
+                results[result.url] = self.process_crawl_result(result.url, level, result)
+            except Exception as e:
+                print(f"❌ Error processing {result.url}: {e}")
+                results[result.url] = {"qa_pairs": [], "urls": [], "success": False}
+        
+        return results
+    
+    def collect_result(self, url: str, level: int, result: Dict) -> int:
+        """Record a crawl result and queue its new URLs for the next level"""
+        if not result['success']:
+            self.frontier.mark_failed(url)
+            return 0
+        
+        # Mark as crawled
+        self.crawled_urls.setdefault(canonicalize_url(url), url)
+        
+        # Organize Q&A by intent
+        qa_pairs = result.get('qa_pairs', [])
+        if qa_pairs:
+            self.organize_qa_by_intent(qa_pairs, url, level)
+        
+        # Collect new URLs for next level (queue first, so a crash in between never loses them)
+        new_urls = self.url_index.filter_new(
+            new_url for new_url in result.get('urls', []) if self.is_valid_ctu_url(new_url)
+        )
+        added = self.frontier.enqueue(new_urls, level + 1)
+        self.frontier.mark_done(url, {'qa_pairs': qa_pairs, 'urls': new_urls}, result.get('content_hash'))
+        
+        # Remember validators + hash for the next incremental run
+        if result.get('content_hash'):
+            self.page_store.save(
+                url, result['content_hash'], {'qa_pairs': qa_pairs, 'urls': result.get('urls', [])},
+                etag=result.get('etag'), last_modified=result.get('last_modified')
+            )
+        return added
+    
+    def restore_from_frontier(self):
+        """Rebuild in-memory state from the frontier of an interrupted run"""
+        recovered = self.frontier.recover_in_flight()
+        self.url_index = SeenURLIndex(self.frontier.known_urls())
+        restored = 0
+        for url, level, result in self.frontier.done_results():
+            self.crawled_urls.setdefault(canonicalize_url(url), url)
+            qa_pairs = result.get('qa_pairs', [])
+            if qa_pairs:
+                self.organize_qa_by_intent(qa_pairs, url, level)
+            restored += 1
+        
+        print(f"♻️  Resuming: {restored} URLs already done, {recovered} interrupted URLs re-queued")
+        print(f"   Frontier: {self.frontier.stats()}")
+    
     def organize_qa_by_intent(self, qa_pairs: List[Dict], source_url: str, level: int):
         """Organize Q&A pairs by intent"""
         for qa in qa_pairs:
@@ -298,7 +498,7 @@ class AutoRecursiveCTUCrawler:
             },
             'intents': {intent: len(pairs) for intent, pairs in self.intent_data.items()},
             'qa_pairs': self.all_qa_pairs,
-            'crawled_urls': list(self.crawled_urls)
+            'crawled_urls': list(self.crawled_urls.values())
         }
         
         final_file = 'data/auto_recursive/ctu_auto_recursive_dataset.json'
@@ -309,64 +509,81 @@ class AutoRecursiveCTUCrawler:
         print(f"📊 Total Q&A pairs: {total_pairs}")
         print(f"🕷️ Total URLs crawled: {len(self.crawled_urls)}")
     
-    async def run_recursive_crawl(self, start_url: str):
-        """🚀 Main recursive crawling workflow"""
+    async def run_recursive_crawl(self, start_url: str, resume: bool = False):
+        """🚀 Main recursive crawling workflow (resume=True continues an interrupted run)"""
         print("🤖 Starting Auto Recursive CTU Crawler...")
         print(f"🎯 Start URL: {start_url}")
         print(f"📏 Max depth: {self.max_depth}")
         print(f"🔢 Max URLs per level: {self.max_urls_per_level}")
+        print(f"⚡ Workers per level: {self.concurrency}")
+        print(f"♻️  Incremental mode: {'on' if self.incremental else 'off'}")
         print("😴 You can rest now! The system will work automatically...\n")
         
-        current_urls = [start_url]
-        level = 1
+        if resume and not self.frontier.is_empty():
+            self.restore_from_frontier()
+        else:
+            self.frontier.reset()
+            self.frontier.enqueue(self.url_index.filter_new([start_url]), 1)
         
-        while level <= self.max_depth and current_urls:
-            print(f"\n🔄 === LEVEL {level} === ({len(current_urls)} URLs to crawl)")
-            
-            next_level_urls = []
+        # One browser for the whole run instead of one per URL
+        await self.start_crawler()
+        last_level = 0
+        try:
+            level = self.frontier.current_level()
             
-            # Process each URL in current level
-            for i, url in enumerate(current_urls[:self.max_urls_per_level], 1):
-                if not self.is_valid_ctu_url(url):
-                    continue
+            while level is not None and level <= self.max_depth:
+                current_urls = self.frontier.take_level(level, self.max_urls_per_level)
+                print(f"\n🔄 === LEVEL {level} === ({len(current_urls)} URLs to crawl)")
                 
-                print(f"[{i}/{min(len(current_urls), self.max_urls_per_level)}] ", end="")
+                level_urls = []
+                for url in current_urls:
+                    if self.is_valid_ctu_url(url):
+                        level_urls.append(url)
+                    else:
+                        self.frontier.mark_failed(url, 'invalid url')
                 
-                # Crawl and extract
-                result = await self.crawl_and_extract_single_url(url, level)
+                next_level_count = 0
+                if self.concurrency > 1 and len(level_urls) > 1:
+                    # Fan the frontier out to the worker pool
+                    results = await self.crawl_level_concurrently(level_urls, level)
+                    for url in level_urls:
+                        result = results.get(url, {"qa_pairs": [], "urls": [], "success": False})
+                        next_level_count += self.collect_result(url, level, result)
+                else:
+                    # Process each URL in current level
+                    for i, url in enumerate(level_urls, 1):
+                        print(f"[{i}/{len(level_urls)}] ", end="")
+                        
+                        # Crawl and extract
+                        self.frontier.mark_in_flight([url])
+                        result = await self.crawl_and_extract_single_url(url, level)
+                        next_level_count += self.collect_result(url, level, result)
+                        
+                        # Be polite - small delay
+                        await asyncio.sleep(1)
                 
-                if result['success']:
-                    # Mark as crawled
-                    self.crawled_urls.add(url)
-                    
-                    # Organize Q&A by intent
-                    qa_pairs = result.get('qa_pairs', [])
-                    if qa_pairs:
-                        self.organize_qa_by_intent(qa_pairs, url, level)
-                    
-                    # Collect new URLs for next level
-                    new_urls = result.get('urls', [])
-                    for new_url in new_urls:
-                        if self.is_valid_ctu_url(new_url):
-                            next_level_urls.append(new_url)
+                # Save progress after each level
+                self.save_intent_data()
                 
-                # Be polite - small delay
-                await asyncio.sleep(1)
-            
-            # Remove duplicates for next level
-            current_urls = list(set(next_level_urls))
-            level += 1
-            
-            # Save progress after each level
-            self.save_intent_data()
-            
-            print(f"\n📈 Level {level-1} completed!")
-            print(f"   Q&A pairs collected: {len(self.all_qa_pairs)}")
-            print(f"   URLs found for next level: {len(current_urls)}")
+                print(f"\n📈 Level {level} completed!")
+                print(f"   Q&A pairs collected: {len(self.all_qa_pairs)}")
+                print(f"   URLs found for next level: {next_level_count}")
+                
+                last_level = level
+                level = self.frontier.current_level()
+        finally:
+            await self.close_crawler()
         
         # Save final results
         print(f"\n🎉 Auto Recursive Crawling COMPLETED!")
-        print(f"🏁 Reached level {level-1} (max: {self.max_depth})")
+        print(f"🏁 Reached level {last_level} (max: {self.max_depth})")
+        print(f"💾 Frontier: {self.frontier.stats()}")
+        self.url_index.report()
+        if self.incremental:
+            stats = self.incremental_stats
+            print(f"♻️  Incremental: {stats['extracted']} LLM extractions, "
+                  f"{stats['not_modified'] + stats['unchanged']} skipped "
+                  f"({stats['not_modified']} not modified, {stats['unchanged']} unchanged content)")
         self.save_final_dataset()
         
         # Summary
@@ -390,15 +607,20 @@ async def main():
     start_url = "https://tuyensinh.ctu.edu.vn/"
     max_depth = 4  # Adjust as needed
     max_urls_per_level = 8  # Adjust as needed
+    concurrency = 4  # Parallel workers per level (1 = sequential)
+    resume = '--resume' in sys.argv  # Continue from data/auto_recursive/frontier.db
+    incremental = '--incremental' in sys.argv  # Only re-extract pages whose content changed
     
     # Create and run crawler
     crawler = AutoRecursiveCTUCrawler(
         api_key=api_key,
         max_depth=max_depth,
-        max_urls_per_level=max_urls_per_level
+        max_urls_per_level=max_urls_per_level,
+        concurrency=concurrency,
+        incremental=incremental
     )
     
-    await crawler.run_recursive_crawl(start_url)
+    await crawler.run_recursive_crawl(start_url, resume=resume)
 
 if __name__ == "__main__":
     asyncio.run(main()) 
\ No newline at end of file
@@ -0,0 +1,158 @@
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Tuple
+
+import numpy as np
+
+from intent_classifier import ENHANCED_INTENTS_CONFIG, IntentClassifier, KeywordAutomaton
+
+# Rows densified at a time for the matrix product (BLOCK_ROWS x keywords float32)
+BLOCK_ROWS = 8192
+
+
+class CorpusKeywordCounts:
+    """
+    📊 Sparse N documents x K keywords count matrix of a fixed corpus
+
+    Stored per keyword as (document indices, counts), i.e. column by column, so
+    a keyword is only counted once: editing a keyword list only scans the
+    corpus for the keywords that were not seen before (one automaton pass).
+    """
+
+    def __init__(self, texts: Iterable[str]):
+        self.texts = [text.lower() for text in texts]
+        self.columns: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+
+    def __len__(self) -> int:
+        return len(self.texts)
+
+    def ensure(self, keywords: Iterable[str]) -> int:
+        """Count the keywords that have no column yet; returns how many were counted"""
+        missing = [keyword for keyword in dict.fromkeys(keywords) if keyword not in self.columns]
+        if not missing:
+            return 0
+        automaton = KeywordAutomaton(missing)
+        rows: List[List[int]] = [[] for _ in missing]
+        counts: List[List[int]] = [[] for _ in missing]
+        for doc, text in enumerate(self.texts):
+            for keyword_id, count in enumerate(automaton.count(text)):
+                if count:
+                    rows[keyword_id].append(doc)
+                    counts[keyword_id].append(count)
+        for keyword_id, keyword in enumerate(automaton.keywords):
+            self.columns[keyword] = (np.array(rows[keyword_id], dtype=np.int64),
+                                     np.array(counts[keyword_id], dtype=np.float32))
+        return len(missing)
+
+    def coo(self, keywords: List[str]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """(document, keyword position, count) of every non-zero entry for these keywords"""
+        self.ensure(keywords)
+        columns = [self.columns[keyword] for keyword in keywords]
+        if not columns:
+            empty = np.zeros(0, dtype=np.int64)
+            return empty, empty, np.zeros(0, dtype=np.float32)
+        docs = np.concatenate([rows for rows, _ in columns])
+        positions = np.concatenate([np.full(len(rows), k, dtype=np.int64) for k, (rows, _) in enumerate(columns)])
+        counts = np.concatenate([values for _, values in columns])
+        return docs, positions, counts
+
+
+def intent_matrices(classifier: IntentClassifier) -> Tuple[List[str], np.ndarray, np.ndarray]:
+    """
+    Intents in tie-break order, K x I keyword weights and K x I keyword
+    multiplicities (how many times an intent lists the keyword)
+    """
+    intents = sorted(classifier.intents, key=classifier.rank.get)
+    column = {intent: i for i, intent in enumerate(intents)}
+    keywords = classifier.automaton.keywords
+    weights = np.zeros((len(keywords), len(intents)), dtype=np.float32)
+    listed = np.zeros((len(keywords), len(intents)), dtype=np.float32)
+    for keyword_id, entries in enumerate(classifier.keyword_intents):
+        for intent, weight in entries:
+            weights[keyword_id, column[intent]] += weight
+            listed[keyword_id, column[intent]] += 1
+    return intents, weights, listed
+
+
+def score_matrix(corpus: CorpusKeywordCounts, classifier: IntentClassifier) -> Tuple[List[str], np.ndarray]:
+    """
+    N x I intent scores, the same as classifier.scores() for every document:
+    counts @ weights (+ distinct_bonus * (counts > 0) @ listed where an intent
+    has at least distinct_min distinct keywords)
+    """
+    intents, weights, listed = intent_matrices(classifier)
+    docs, positions, counts = corpus.coo(classifier.automaton.keywords)
+    keyword_count = len(classifier.automaton.keywords)
+    scores = np.zeros((len(corpus), len(intents)), dtype=np.float32)
+
+    order = np.argsort(docs, kind="stable")
+    docs, positions, counts = docs[order], positions[order], counts[order]
+    bounds = np.searchsorted(docs, np.arange(0, len(corpus) + BLOCK_ROWS, BLOCK_ROWS))
+    for block, start in enumerate(range(0, len(corpus), BLOCK_ROWS)):
+        stop = min(start + BLOCK_ROWS, len(corpus))
+        lo, hi = bounds[block], bounds[block + 1]
+        dense = np.zeros((stop - start, keyword_count), dtype=np.float32)
+        dense[docs[lo:hi] - start, positions[lo:hi]] = counts[lo:hi]
+        scores[start:stop] = dense @ weights
+        if classifier.distinct_bonus:
+            distinct = (dense > 0).astype(np.float32) @ listed
+            scores[start:stop] += np.where(distinct >= classifier.distinct_min,
+                                           distinct * classifier.distinct_bonus, 0)
+    return intents, scores
+
+
+def classify_batch(corpus: CorpusKeywordCounts, classifier: IntentClassifier) -> List[str]:
+    """Labels of every document, the same as classifier.classify() one by one"""
+    intents, scores = score_matrix(corpus, classifier)
+    if not intents:
+        return [classifier.fallback_intent] * len(corpus)
+    # argmax keeps the first maximum, and columns are in tie-break order
+    best = scores.argmax(axis=1)
+    has_match = scores[np.arange(len(corpus)), best] > 0
+    return [intents[i] if matched else classifier.fallback_intent for i, matched in zip(best.tolist(), has_match.tolist())]
+
+
+def main():
+    """
+    Re-label a dataset in batch, then again after adding a keyword:
+    python batch_intent_classifier.py [dataset.json] [config.json]
+    """
+    dataset = Path(sys.argv[1] if len(sys.argv) > 1 else "data/final/ctu_comprehensive_dataset.json")
+    config_path = sys.argv[2] if len(sys.argv) > 2 else ENHANCED_INTENTS_CONFIG
+    with open(dataset, "r", encoding="utf-8") as f:
+        qa_pairs = json.load(f).get("qa_pairs", [])
+    with open(config_path, "r", encoding="utf-8") as f:
+        config = json.load(f)
+
+    start = time.perf_counter()
+    corpus = CorpusKeywordCounts(qa.get("question", "") + " " + qa.get("answer", "") for qa in qa_pairs)
+    classifier = IntentClassifier.from_config(config_path)
+    labels = classify_batch(corpus, classifier)
+    print(f"📊 {len(corpus)} Q&A pairs x {len(classifier.automaton.keywords)} keywords, "
+          f"first labeling (counts every keyword) {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    start = time.perf_counter()
+    labels = classify_batch(corpus, classifier)
+    print(f"⚡ Re-labeling with the same keywords: {(time.perf_counter() - start) * 1000:.2f} ms")
+
+    # Edit a keyword list: only the new keyword is counted
+    first_intent = next(iter(config["intents"]))
+    config["intents"][first_intent]["keywords"].append("sinh viên năm nhất")
+    edited = IntentClassifier({intent: info["keywords"] for intent, info in config["intents"].items()},
+                              priority_order=sorted(classifier.rank, key=classifier.rank.get),
+                              fallback_intent=classifier.fallback_intent)
+    start = time.perf_counter()
+    edited_labels = classify_batch(corpus, edited)
+    print(f"✏️  Re-labeling after adding a keyword to {first_intent}: {(time.perf_counter() - start) * 1000:.2f} ms, "
+          f"{sum(a != b for a, b in zip(labels, edited_labels))} labels changed")
+
+    start = time.perf_counter()
+    one_by_one = [classifier.classify(text) for text in corpus.texts]
+    print(f"🐢 One classify() call per pair: {(time.perf_counter() - start) * 1000:.1f} ms, "
+          f"same labels: {one_by_one == labels}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+import re
+import sys
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set
+
+from markdown_chunker import count_tokens
+
+WHITESPACE_RE = re.compile(r'\s+')
+BLANK_LINES_RE = re.compile(r'\n\s*\n\s*\n+')
+
+
+def normalize_line(line: str) -> str:
+    return WHITESPACE_RE.sub(' ', line).strip().lower()
+
+
+class BoilerplateFilter:
+    """
+    🧹 Strips blocks repeated across many crawled pages (nav menus, footers, link lists)
+
+    Learns shingles of `shingle_size` consecutive non-blank lines from the whole
+    corpus; a shingle found on at least max(min_docs, min_doc_ratio * pages) pages
+    is boilerplate and every line it covers is removed. Runs of lines are used
+    instead of single lines so that short repeated lines inside real content
+    (table headers, "Xem thêm", ...) are kept.
+    """
+
+    def __init__(self, shingle_size: int = 3, min_doc_ratio: float = 0.3, min_docs: int = 3):
+        self.shingle_size = shingle_size
+        self.min_doc_ratio = min_doc_ratio
+        self.min_docs = min_docs
+        self.boilerplate: Set[int] = set()
+        self.documents = 0
+        self.page_stats: Dict[str, Dict[str, int]] = {}
+
+    def shingles(self, lines: List[str]) -> List[int]:
+        """Hash of every window of shingle_size normalized lines"""
+        size = min(self.shingle_size, len(lines))
+        return [hash("\n".join(lines[i:i + size])) for i in range(len(lines) - size + 1)] if size else []
+
+    def fit(self, documents: Iterable[str]) -> 'BoilerplateFilter':
+        """Learn repeated blocks from the corpus (document frequency of each shingle)"""
+        doc_freq = Counter()
+        self.documents = 0
+        for text in documents:
+            lines = [normalize_line(line) for line in text.splitlines() if line.strip()]
+            doc_freq.update(set(self.shingles(lines)))
+            self.documents += 1
+
+        threshold = max(self.min_docs, int(self.min_doc_ratio * self.documents))
+        self.boilerplate = {shingle for shingle, count in doc_freq.items() if count >= threshold}
+        return self
+
+    @classmethod
+    def from_files(cls, paths: Iterable[Path], **kwargs) -> 'BoilerplateFilter':
+        """Learn from markdown files on disk"""
+        def read_all():
+            for path in paths:
+                with open(path, 'r', encoding='utf-8') as f:
+                    yield f.read()
+        return cls(**kwargs).fit(read_all())
+
+    def strip(self, text: str, name: Optional[str] = None) -> str:
+        """Remove learned boilerplate from one page; with a name, tokens saved are recorded for report()"""
+        if not self.boilerplate:
+            return text
+
+        raw_lines = text.splitlines()
+        content_idx = [i for i, line in enumerate(raw_lines) if line.strip()]
+        lines = [normalize_line(raw_lines[i]) for i in content_idx]
+
+        remove = set()
+        for start, shingle in enumerate(self.shingles(lines)):
+            if shingle in self.boilerplate:
+                remove.update(content_idx[start:start + self.shingle_size])
+        if not remove:
+            cleaned = text
+        else:
+            kept = "\n".join(line for i, line in enumerate(raw_lines) if i not in remove)
+            cleaned = BLANK_LINES_RE.sub('\n\n', kept).strip() + "\n"
+
+        if name is not None:
+            before, after = count_tokens(text), count_tokens(cleaned)
+            self.page_stats[name] = {'tokens_before': before, 'tokens_after': after, 'tokens_saved': before - after}
+            if before > after:
+                print(f"   🧹 {name}: stripped {before - after:,} boilerplate tokens ({before:,} → {after:,})")
+        return cleaned
+
+    def report(self):
+        saved = sum(stats['tokens_saved'] for stats in self.page_stats.values())
+        before = sum(stats['tokens_before'] for stats in self.page_stats.values())
+        percent = saved / before * 100 if before else 0
+        print(f"🧹 Boilerplate: {len(self.boilerplate)} repeated blocks learned from {self.documents} pages, "
+              f"{saved:,} of {before:,} tokens stripped ({percent:.0f}%) across {len(self.page_stats)} pages")
+
+
+def main():
+    """Dry run on crawled markdown folders: print tokens saved per page"""
+    directories = sys.argv[1:] or ["output/crawled_ctu_admission_pages", "output/auto_recursive/markdown"]
+    for directory in directories:
+        md_files = sorted(Path(directory).glob("*.md"))
+        if not md_files:
+            print(f"⚠️ No markdown files in {directory}")
+            continue
+
+        print(f"\n📁 {directory} ({len(md_files)} files)")
+        boilerplate = BoilerplateFilter.from_files(md_files)
+        for md_file in md_files:
+            with open(md_file, 'r', encoding='utf-8') as f:
+                boilerplate.strip(f.read(), md_file.name)
+        boilerplate.report()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+import json
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    pa = pc = pq = None
+    PYARROW_AVAILABLE = False
+
+from jsonl_dataset import iter_records
+
+DEFAULT_DATASETS = ["data/final/ctu_comprehensive_dataset.json", "data/final/ctu_extended_dataset.json"]
+COLUMNS = ("question", "answer", "intent", "source_url", "level", "confidence", "created_date")
+# Rows per Parquet row group; rows are sorted by intent, so an intent filter skips whole groups
+ROW_GROUP_SIZE = 10_000
+
+
+def arrow_schema() -> 'pa.Schema':
+    return pa.schema([
+        ("question", pa.string()),
+        ("answer", pa.string()),
+        ("intent", pa.dictionary(pa.int16(), pa.string())),
+        ("source_url", pa.string()),
+        ("level", pa.dictionary(pa.int16(), pa.string())),
+        ("confidence", pa.float32()),
+        ("created_date", pa.string()),
+    ])
+
+
+def require_pyarrow():
+    if not PYARROW_AVAILABLE:
+        raise ImportError("pyarrow is required for the columnar export. Run: pip install pyarrow")
+
+
+def parse_confidence(value: Any) -> Optional[float]:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def to_row(qa: Dict[str, Any], default_date: Optional[str] = None) -> Dict[str, Any]:
+    """One Q&A pair in the columnar schema (the datasets use several field names for the same thing)"""
+    level = qa.get("source_level", qa.get("level"))
+    return {
+        "question": qa.get("question", ""),
+        "answer": qa.get("answer", ""),
+        "intent": qa.get("intent") or qa.get("category") or "unknown",
+        "source_url": qa.get("source_url") or qa.get("source"),
+        "level": str(level) if level is not None else None,
+        "confidence": parse_confidence(qa.get("confidence")),
+        "created_date": qa.get("created_date") or default_date,
+    }
+
+
+def iter_qa_pairs(path: Path) -> Iterator[Dict[str, Any]]:
+    """Q&A pairs of a JSON dataset ({"dataset_info", "qa_pairs"}) or a JSONL file, as rows"""
+    path = Path(path)
+    if path.suffix == ".jsonl":
+        for qa in iter_records(path):
+            yield to_row(qa)
+        return
+
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    default_date = data.get("dataset_info", {}).get("created_date") if isinstance(data, dict) else None
+    qa_pairs = data.get("qa_pairs", []) if isinstance(data, dict) else data
+    for qa in qa_pairs:
+        yield to_row(qa, default_date)
+
+
+def build_table(rows: Iterable[Dict[str, Any]]) -> 'pa.Table':
+    require_pyarrow()
+    rows = sorted(rows, key=lambda row: row["intent"])
+    columns = {name: [row[name] for row in rows] for name in COLUMNS}
+    return pa.Table.from_pydict(columns, schema=arrow_schema())
+
+
+def export_dataset(source: Path, output: Optional[Path] = None) -> Path:
+    """
+    Write a dataset as Parquet (.parquet, zstd) or Arrow IPC (.arrow, memory-mappable).
+    Default output: the source path with a .parquet suffix.
+    """
+    require_pyarrow()
+    source = Path(source)
+    output = Path(output) if output else source.with_suffix(".parquet")
+    table = build_table(iter_qa_pairs(source))
+
+    output.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = output.with_name(output.name + ".tmp")
+    if output.suffix == ".arrow":
+        with pa.OSFile(str(tmp_path), "wb") as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+    else:
+        pq.write_table(table, tmp_path, row_group_size=ROW_GROUP_SIZE, compression="zstd")
+    tmp_path.replace(output)
+    return output
+
+
+def load_columns(path: Path, columns: Sequence[str] = ("question", "intent"),
+                 intents: Optional[Iterable[str]] = None) -> 'pa.Table':
+    """
+    Read only the given columns, optionally only the rows of some intents.
+
+    Columns that are not requested are never decoded: Parquet skips their pages
+    (and whole row groups of other intents), Arrow files are memory-mapped.
+    """
+    require_pyarrow()
+    path = Path(path)
+    columns = list(columns)
+    intents = list(intents) if intents is not None else None
+
+    if path.suffix == ".arrow":
+        with pa.memory_map(str(path), "r") as source:
+            table = pa.ipc.open_file(source).read_all()
+        if intents is not None:
+            table = table.filter(pc.is_in(table["intent"].cast(pa.string()), pa.array(intents)))
+        return table.select(columns)
+
+    filters = [("intent", "in", intents)] if intents is not None else None
+    return pq.read_table(path, columns=columns, filters=filters)
+
+
+def load_records(path: Path, columns: Sequence[str] = COLUMNS,
+                 intents: Optional[Iterable[str]] = None) -> List[Dict[str, Any]]:
+    """Same as load_columns, as a list of dicts"""
+    return load_columns(path, columns, intents).to_pylist()
+
+
+def measure(func) -> Dict[str, float]:
+    """Wall time (ms) and peak memory (MB, Python heap + Arrow buffers) of one call"""
+    warm_up = func()  # imports and file cache; kept alive so freeing it does not skew the Arrow count
+    arrow_before = pa.total_allocated_bytes()
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    arrow_bytes = pa.total_allocated_bytes() - arrow_before
+    del result, warm_up
+    return {"ms": elapsed * 1000, "mb": (peak + arrow_bytes) / 1024 / 1024}
+
+
+def main():
+    """Export the final datasets and compare loading questions + intents with json.load"""
+    if not PYARROW_AVAILABLE:
+        print("❌ pyarrow is not installed. Run: pip install pyarrow")
+        return
+
+    sources = [Path(p) for p in sys.argv[1:]] or [Path(p) for p in DEFAULT_DATASETS]
+    for source in sources:
+        if not source.exists():
+            print(f"⚠️  {source} not found")
+            continue
+
+        parquet_file = export_dataset(source)
+        arrow_file = export_dataset(source, source.with_suffix(".arrow"))
+        rows = pq.ParquetFile(parquet_file).metadata.num_rows
+        print(f"\n📦 {source} ({rows} rows)")
+        print(f"   📄 JSON {source.stat().st_size / 1024:,.0f} KB → Parquet {parquet_file.stat().st_size / 1024:,.0f} KB, "
+              f"Arrow {arrow_file.stat().st_size / 1024:,.0f} KB")
+
+        def from_json():
+            with open(source, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            return [(qa.get("question"), qa.get("intent") or qa.get("category")) for qa in data.get("qa_pairs", [])]
+
+        for name, func in (("json.load", from_json),
+                           ("parquet", lambda: load_columns(parquet_file)),
+                           ("arrow", lambda: load_columns(arrow_file))):
+            stats = measure(func)
+            print(f"   ⏱️  questions + intents via {name:10s} {stats['ms']:7.2f} ms, peak {stats['mb']:6.2f} MB")
+
+
+if __name__ == "__main__":
+    main()
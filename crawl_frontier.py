@@ -0,0 +1,136 @@
+import json
+import sqlite3
+from datetime import datetime
+from pathlib import Path
+from typing import List, Dict, Optional, Iterator, Tuple
+
+
+class CrawlFrontier:
+    """
+    💾 Persistent crawl frontier + visited set (SQLite)
+
+    Every URL has one row with its state, level and content hash:
+    - queued:    waiting to be crawled at its level
+    - in_flight: crawl started but not finished (reset to queued on resume)
+    - done:      crawled and extracted, result stored for resume
+    - failed:    crawl or extraction failed
+    - skipped:   over the per-level limit, never crawled
+    """
+
+    QUEUED = 'queued'
+    IN_FLIGHT = 'in_flight'
+    DONE = 'done'
+    FAILED = 'failed'
+    SKIPPED = 'skipped'
+
+    def __init__(self, db_path: str = 'data/auto_recursive/frontier.db'):
+        self.db_path = db_path
+        Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(db_path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS frontier (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                url TEXT NOT NULL UNIQUE,
+                level INTEGER NOT NULL,
+                state TEXT NOT NULL,
+                content_hash TEXT,
+                result TEXT,
+                error TEXT,
+                updated_at TEXT NOT NULL
+            )
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_frontier_state_level ON frontier (state, level)")
+        self.conn.commit()
+
+    def _now(self) -> str:
+        return datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+
+    def reset(self):
+        """Forget everything (fresh run)"""
+        self.conn.execute("DELETE FROM frontier")
+        self.conn.commit()
+
+    def is_empty(self) -> bool:
+        return self.conn.execute("SELECT 1 FROM frontier LIMIT 1").fetchone() is None
+
+    def enqueue(self, urls: List[str], level: int) -> int:
+        """Queue URLs at a level; URLs already known are ignored. Returns number added"""
+        cursor = self.conn.executemany(
+            "INSERT OR IGNORE INTO frontier (url, level, state, updated_at) VALUES (?, ?, ?, ?)",
+            [(url, level, self.QUEUED, self._now()) for url in urls]
+        )
+        self.conn.commit()
+        return cursor.rowcount
+
+    def recover_in_flight(self) -> int:
+        """Put URLs interrupted mid-crawl back in the queue"""
+        cursor = self.conn.execute(
+            "UPDATE frontier SET state = ?, updated_at = ? WHERE state = ?",
+            (self.QUEUED, self._now(), self.IN_FLIGHT)
+        )
+        self.conn.commit()
+        return cursor.rowcount
+
+    def current_level(self) -> Optional[int]:
+        """Lowest level that still has queued URLs"""
+        row = self.conn.execute(
+            "SELECT MIN(level) FROM frontier WHERE state = ?", (self.QUEUED,)
+        ).fetchone()
+        return row[0]
+
+    def take_level(self, level: int, limit: int) -> List[str]:
+        """Queued URLs of a level up to limit, in discovery order; the rest are marked skipped"""
+        rows = self.conn.execute(
+            "SELECT url FROM frontier WHERE state = ? AND level = ? ORDER BY id",
+            (self.QUEUED, level)
+        ).fetchall()
+        urls = [row[0] for row in rows]
+        if len(urls) > limit:
+            self.conn.executemany(
+                "UPDATE frontier SET state = ?, updated_at = ? WHERE url = ?",
+                [(self.SKIPPED, self._now(), url) for url in urls[limit:]]
+            )
+            self.conn.commit()
+        return urls[:limit]
+
+    def mark_in_flight(self, urls: List[str]):
+        self.conn.executemany(
+            "UPDATE frontier SET state = ?, updated_at = ? WHERE url = ?",
+            [(self.IN_FLIGHT, self._now(), url) for url in urls]
+        )
+        self.conn.commit()
+
+    def mark_done(self, url: str, result: Dict, content_hash: Optional[str] = None):
+        self.conn.execute(
+            "UPDATE frontier SET state = ?, content_hash = ?, result = ?, error = NULL, updated_at = ? WHERE url = ?",
+            (self.DONE, content_hash, json.dumps(result, ensure_ascii=False), self._now(), url)
+        )
+        self.conn.commit()
+
+    def mark_failed(self, url: str, error: str = ''):
+        self.conn.execute(
+            "UPDATE frontier SET state = ?, error = ?, updated_at = ? WHERE url = ?",
+            (self.FAILED, error, self._now(), url)
+        )
+        self.conn.commit()
+
+    def done_results(self) -> Iterator[Tuple[str, int, Dict]]:
+        """(url, level, result) of every finished URL, in completion order"""
+        rows = self.conn.execute(
+            "SELECT url, level, result FROM frontier WHERE state = ? ORDER BY updated_at, id",
+            (self.DONE,)
+        )
+        for url, level, result in rows:
+            yield url, level, json.loads(result) if result else {}
+
+    def known_urls(self) -> List[str]:
+        """Every URL in the frontier, whatever its state"""
+        return [row[0] for row in self.conn.execute("SELECT url FROM frontier ORDER BY id")]
+
+    def stats(self) -> Dict[str, int]:
+        rows = self.conn.execute("SELECT state, COUNT(*) FROM frontier GROUP BY state").fetchall()
+        return {state: count for state, count in rows}
+
+    def close(self):
+        self.conn.close()
@@ -0,0 +1,330 @@
+import json
+import shutil
+import sys
+import time
+import zlib
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from intent_tfidf_classifier import char_ngrams
+from qa_store import load_qa_pairs
+
+# Local CPU sentence-embedding model if available (pip install -r requirements-embeddings.txt),
+# otherwise the hashing embedder below
+try:
+    from sentence_transformers import SentenceTransformer
+    SENTENCE_TRANSFORMERS_AVAILABLE = True
+except ImportError:
+    SentenceTransformer = None
+    SENTENCE_TRANSFORMERS_AVAILABLE = False
+
+DEFAULT_DATASET = "data/final/ctu_comprehensive_dataset.json"
+DEFAULT_INDEX_DIR = "data/embeddings"
+DEFAULT_MODEL = "sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2"
+FIELDS = ("question", "answer")
+NPROBE = 32
+
+
+class HashingEmbedder:
+    """
+    #️⃣ Deterministic fallback embedder (no model, no download): signed
+    feature hashing of character n-grams and words, L2-normalized
+
+    Same text -> same vector on every machine, which is what tests need.
+    It matches spelling variants (diacritics, word forms), not meaning.
+    """
+
+    def __init__(self, dim: int = 256):
+        self.dim = dim
+        self.name = f"hashing-{dim}"
+
+    def features(self, text: str) -> Dict[int, float]:
+        vector: Dict[int, float] = {}
+        grams = char_ngrams(text, (3, 4)) + [f"w:{word}" for word in text.lower().split()]
+        for gram in grams:
+            hashed = zlib.crc32(gram.encode('utf-8'))
+            # Low bits pick the dimension, one higher bit the sign (collisions cancel out on average)
+            index, sign = hashed % self.dim, 1.0 if hashed & 0x80000000 else -1.0
+            vector[index] = vector.get(index, 0.0) + sign
+        return vector
+
+    def __call__(self, texts: Sequence[str]) -> np.ndarray:
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for index, value in self.features(text).items():
+                vectors[row, index] = value
+        return normalize_rows(vectors)
+
+
+class SentenceEmbedder:
+    """🧠 Local CPU sentence-transformers model (multilingual, handles paraphrases)"""
+
+    def __init__(self, model_name: str = DEFAULT_MODEL, batch_size: int = 64):
+        self.model = SentenceTransformer(model_name, device="cpu")
+        self.batch_size = batch_size
+        self.name = model_name
+        self.dim = self.model.get_sentence_embedding_dimension()
+
+    def __call__(self, texts: Sequence[str]) -> np.ndarray:
+        vectors = self.model.encode(list(texts), batch_size=self.batch_size, convert_to_numpy=True,
+                                    normalize_embeddings=True, show_progress_bar=False)
+        return vectors.astype(np.float32)
+
+
+def get_embedder(name: Optional[str] = None) -> Callable[[Sequence[str]], np.ndarray]:
+    """The sentence model when installed (or a given model name), else the hashing embedder"""
+    if name and name.startswith("hashing-"):
+        return HashingEmbedder(int(name.split("-", 1)[1]))
+    if SENTENCE_TRANSFORMERS_AVAILABLE:
+        return SentenceEmbedder(name or DEFAULT_MODEL)
+    if name:
+        print(f"⚠️ sentence-transformers not installed, cannot load {name}: using the hashing embedder. "
+              f"Run: pip install -r requirements-embeddings.txt")
+    return HashingEmbedder()
+
+
+def normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+def spherical_kmeans(vectors: np.ndarray, clusters: int, iterations: int = 10, sample: int = 50_000,
+                     seed: int = 42, block: int = 8192) -> np.ndarray:
+    """Unit-norm centroids (cosine k-means), trained on a sample of the vectors"""
+    rng = np.random.default_rng(seed)
+    if len(vectors) > sample:
+        vectors = vectors[np.sort(rng.choice(len(vectors), sample, replace=False))]
+    vectors = np.asarray(vectors, dtype=np.float32)
+    centroids = vectors[rng.choice(len(vectors), clusters, replace=False)].copy()
+    for _ in range(iterations):
+        assignment = assign(vectors, centroids, block)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assignment, vectors)
+        empty = np.bincount(assignment, minlength=clusters) == 0
+        # An empty cluster restarts from a random vector
+        sums[empty] = vectors[rng.choice(len(vectors), int(empty.sum()))]
+        centroids = normalize_rows(sums)
+    return centroids
+
+
+def assign(vectors: np.ndarray, centroids: np.ndarray, block: int = 8192) -> np.ndarray:
+    """Nearest centroid of every vector (block of rows at a time, bounded memory)"""
+    return np.concatenate([np.argmax(np.asarray(vectors[start:start + block]) @ centroids.T, axis=1)
+                           for start in range(0, len(vectors), block)]) if len(vectors) else np.zeros(0, dtype=np.int64)
+
+
+class EmbeddingIndex:
+    """
+    🧭 IVF (inverted file) index over unit-norm embeddings, cosine similarity
+
+    The vectors live in a memory-mapped float32 .npy, stored list by list
+    (the vectors of one k-means cluster are contiguous), so a query reads
+    only the nprobe clusters whose centroids are closest to it: one matrix
+    product against the centroids, then one per probed cluster.
+
+    Files in the index directory: vectors.npy (N x dim, memory-mapped),
+    centroids.npy, lists.npz (cluster offsets, pair id and field of every
+    row) and index.json (embedder, dataset, fields).
+    """
+
+    def __init__(self, index_dir: str = DEFAULT_INDEX_DIR, embedder: Optional[Callable] = None):
+        self.index_dir = Path(index_dir)
+        with open(self.index_dir / "index.json", "r", encoding="utf-8") as f:
+            self.info = json.load(f)
+        self.embedder = embedder or get_embedder(self.info["embedder"])
+        if getattr(self.embedder, "name", None) != self.info["embedder"]:
+            raise ValueError(f"Index built with {self.info['embedder']}, "
+                             f"embedder is {getattr(self.embedder, 'name', self.embedder)}")
+
+        self.vectors = np.load(self.index_dir / "vectors.npy", mmap_mode="r")
+        self.centroids = np.load(self.index_dir / "centroids.npy")
+        with np.load(self.index_dir / "lists.npz") as lists:
+            self.offsets = lists["offsets"]
+            self.pair_ids = lists["pair_ids"]
+            self.fields = lists["fields"]
+        self.qa_pairs = load_qa_pairs(self.info["dataset"]) if self.info.get("dataset") else []
+
+    @classmethod
+    def build(cls, texts: Sequence[str], pair_ids: Sequence[int], fields: Sequence[int], embedder: Callable,
+              index_dir: str = DEFAULT_INDEX_DIR, dataset: Optional[str] = None, clusters: Optional[int] = None,
+              batch_size: int = 1024) -> 'EmbeddingIndex':
+        """Embed the texts batch by batch into a memory-mapped matrix, cluster it and store it list by list"""
+        index_dir = Path(index_dir)
+        index_dir.mkdir(parents=True, exist_ok=True)
+        count = len(texts)
+        dim = getattr(embedder, "dim", None) or embedder(["x"]).shape[1]
+
+        # Embeddings in input order first (memory-mapped), then rewritten grouped by cluster
+        staging_path = index_dir / "vectors.staging.npy"
+        staging = np.lib.format.open_memmap(staging_path, mode="w+", dtype=np.float32, shape=(count, dim))
+        for start in range(0, count, batch_size):
+            staging[start:start + batch_size] = embedder(texts[start:start + batch_size])
+        staging.flush()
+
+        clusters = clusters or max(1, min(count, int(4 * np.sqrt(count))))
+        centroids = spherical_kmeans(staging, clusters) if count else np.zeros((0, dim), dtype=np.float32)
+        assignment = assign(staging, centroids)
+        order = np.argsort(assignment, kind="stable")
+
+        vectors = np.lib.format.open_memmap(index_dir / "vectors.npy", mode="w+", dtype=np.float32, shape=(count, dim))
+        for start in range(0, count, batch_size * 8):
+            rows = order[start:start + batch_size * 8]
+            vectors[start:start + len(rows)] = staging[np.sort(rows)][np.argsort(np.argsort(rows))]
+        vectors.flush()
+        del staging, vectors
+        staging_path.unlink()
+
+        offsets = np.zeros(clusters + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum(np.bincount(assignment, minlength=clusters))
+        np.save(index_dir / "centroids.npy", centroids)
+        np.savez(index_dir / "lists.npz", offsets=offsets,
+                 pair_ids=np.asarray(pair_ids, dtype=np.int64)[order], fields=np.asarray(fields, dtype=np.int8)[order])
+        with open(index_dir / "index.json", "w", encoding="utf-8") as f:
+            json.dump({
+                "embedder": getattr(embedder, "name", type(embedder).__name__),
+                "dim": int(dim),
+                "vectors": int(count),
+                "clusters": int(clusters),
+                "dataset": dataset,
+                "fields": list(FIELDS),
+                "created_date": time.strftime("%Y-%m-%d %H:%M:%S")
+            }, f, indent=2, ensure_ascii=False)
+        return cls(str(index_dir), embedder)
+
+    @classmethod
+    def build_from_dataset(cls, dataset: str = DEFAULT_DATASET, embedder: Optional[Callable] = None,
+                           index_dir: str = DEFAULT_INDEX_DIR, fields: Sequence[str] = FIELDS) -> 'EmbeddingIndex':
+        """One vector per non-empty question and answer of the dataset's Q&A pairs"""
+        texts, pair_ids, field_ids = [], [], []
+        for pair_id, qa in enumerate(load_qa_pairs(dataset)):
+            for field in fields:
+                text = (qa.get(field) or "").strip()
+                if text:
+                    texts.append(text)
+                    pair_ids.append(pair_id)
+                    field_ids.append(FIELDS.index(field))
+        return cls.build(texts, pair_ids, field_ids, embedder or get_embedder(), index_dir, dataset)
+
+    def __len__(self) -> int:
+        return len(self.vectors)
+
+    def search_vector(self, query: np.ndarray, k: int = 10, nprobe: int = NPROBE):
+        """(row ids, cosine similarities) of the k nearest rows, best first"""
+        if not len(self.vectors) or k <= 0:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+        nprobe = min(nprobe, len(self.centroids))
+        probed = np.argpartition(-(self.centroids @ query), nprobe - 1)[:nprobe]
+        rows = np.concatenate([np.arange(self.offsets[cluster], self.offsets[cluster + 1]) for cluster in probed])
+        # Probed clusters are contiguous slices of the memory-mapped matrix
+        similarities = np.concatenate([self.vectors[self.offsets[cluster]:self.offsets[cluster + 1]] @ query
+                                       for cluster in probed])
+        if len(rows) > k:
+            top = np.argpartition(-similarities, k - 1)[:k]
+            rows, similarities = rows[top], similarities[top]
+        order = np.argsort(-similarities, kind="stable")
+        return rows[order], similarities[order]
+
+    def search(self, text: str, k: int = 5, nprobe: int = NPROBE) -> List[Dict[str, Any]]:
+        """
+        Top k Q&A pairs closest in meaning to the text (question or answer
+        vector, whichever is closer), each with its cosine "score"
+        """
+        query = self.embedder([text])[0]
+        rows, similarities = self.search_vector(query, k * len(FIELDS), nprobe)
+        results, seen = [], set()
+        for row, similarity in zip(rows.tolist(), similarities.tolist()):
+            pair_id = int(self.pair_ids[row])
+            if pair_id in seen:
+                continue
+            seen.add(pair_id)
+            qa = self.qa_pairs[pair_id] if pair_id < len(self.qa_pairs) else {}
+            results.append({**qa, "score": similarity, "matched_field": FIELDS[self.fields[row]]})
+            if len(results) == k:
+                break
+        return results
+
+
+def benchmark(count: int = 100_000, dim: int = 384, queries: int = 1000, k: int = 10,
+              index_dir: str = "data/embeddings_benchmark") -> Dict[str, float]:
+    """
+    Search latency and recall@k against exact search on count clustered
+    random unit vectors (latency does not depend on where vectors come from)
+    """
+    rng = np.random.default_rng(0)
+    topics = normalize_rows(rng.standard_normal((2000, dim)).astype(np.float32))
+    data = normalize_rows(topics[rng.integers(0, len(topics), count)] + 1.0 / np.sqrt(dim) *
+                          rng.standard_normal((count, dim)).astype(np.float32))
+
+    class Precomputed:
+        """Embedder of the texts "0", "1", ...: row i of data"""
+        name = f"precomputed-{dim}"
+
+        def __init__(self):
+            self.dim = dim
+
+        def __call__(self, texts):
+            return data[[int(text) for text in texts]]
+
+    embedder = Precomputed()
+    start = time.perf_counter()
+    index = EmbeddingIndex.build([str(i) for i in range(count)], range(count), [0] * count, embedder, index_dir)
+    build_seconds = time.perf_counter() - start
+
+    query_vectors = normalize_rows(data[rng.integers(0, count, queries)] +
+                                   0.3 / np.sqrt(dim) * rng.standard_normal((queries, dim)).astype(np.float32))
+    timings, recall = [], 0
+    for query in query_vectors:
+        begin = time.perf_counter()
+        rows, _ = index.search_vector(query, k)
+        timings.append(time.perf_counter() - begin)
+        exact = np.argpartition(-(data @ query), k - 1)[:k]
+        # Rows are stored by cluster: pair_ids maps them back to input order
+        recall += len(set(index.pair_ids[rows].tolist()) & set(exact.tolist()))
+    timings.sort()
+    shutil.rmtree(index_dir, ignore_errors=True)
+    return {
+        "build_s": build_seconds,
+        "p50_ms": timings[len(timings) // 2] * 1000,
+        "p99_ms": timings[int(len(timings) * 0.99)] * 1000,
+        "recall": recall / (queries * k)
+    }
+
+
+def main():
+    """
+    python embedding_index.py build [dataset.json] [--hashing]
+    python embedding_index.py search "câu hỏi" [k]
+    python embedding_index.py --benchmark [vectors]
+    """
+    args = sys.argv[1:]
+    command = args[0] if args else "build"
+
+    if command == "build":
+        dataset = next((arg for arg in args[1:] if not arg.startswith("--")), DEFAULT_DATASET)
+        embedder = HashingEmbedder() if "--hashing" in args else get_embedder()
+        start = time.perf_counter()
+        index = EmbeddingIndex.build_from_dataset(dataset, embedder)
+        print(f"🧭 {len(index)} vectors ({index.info['dim']}-d, {index.info['embedder']}), "
+              f"{index.info['clusters']} clusters, built in {time.perf_counter() - start:.1f} s → {index.index_dir}")
+
+    elif command == "search":
+        index = EmbeddingIndex()
+        k = int(args[2]) if len(args) > 2 else 5
+        for rank, qa in enumerate(index.search(args[1], k), 1):
+            print(f"{rank}. [{qa['score']:.3f} {qa['matched_field']}] {qa.get('question', '')}")
+            print(f"   → {qa.get('answer', '')[:120]}")
+
+    elif command == "--benchmark":
+        count = int(args[1]) if len(args) > 1 else 100_000
+        result = benchmark(count)
+        print(f"🧭 {count:,} vectors: built in {result['build_s']:.1f} s, search p50 {result['p50_ms']:.2f} ms, "
+              f"p99 {result['p99_ms']:.2f} ms, recall@10 {result['recall']:.1%} (nprobe {NPROBE})")
+
+    else:
+        print(main.__doc__)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,25 @@
 import asyncio
 import json
 import os
+import sys
 from pathlib import Path
 from typing import List, Dict, Any
 from dotenv import load_dotenv
-import openai
+
+from llm_client import get_async_client, chat_completion, report_llm_usage
+from boilerplate_filter import BoilerplateFilter
+from markdown_chunker import map_chunks, merge_qa_pairs
+from jsonl_dataset import append_records, compact, ensure_jsonl
+from qa_store import QAStore
+from intent_classifier import IntentClassifier
+
+# Token budget of one markdown chunk sent to the LLM
+CHUNK_TOKENS = 2000
 
 
 class CrawledFilesExtractor:
     def __init__(self, api_key: str):
-        self.client = openai.AsyncOpenAI(api_key=api_key)
+        self.client = get_async_client(api_key)
         self.intents = {
             "nganh_hoc": {
                 "folder": "data/processed/nganh_hoc",
@@ -72,6 +82,15 @@ class CrawledFilesExtractor:
                 "keywords": ["giới thiệu", "lịch sử", "cơ sở", "thông tin chung", "tầm nhìn", "sứ mệnh", "hoạt động", "campus", "history", "about"]
             }
         }
+        
+        # Điểm = số lần xuất hiện keyword (từ dài hơn 5 ký tự được x2),
+        # cộng 5 điểm mỗi keyword khác nhau nếu intent có từ 3 keyword trở lên
+        self.content_classifier = IntentClassifier(
+            {intent: info["keywords"] for intent, info in self.intents.items()},
+            keyword_weight=lambda keyword: 2 if len(keyword) > 5 else 1,
+            distinct_bonus=5, distinct_min=3,
+            fallback_intent="thong_tin"
+        )
     
     def classify_content_by_intent(self, content: str, filename: str) -> str:
         """Phân loại nội dung theo intent dựa trên keywords và filename"""
@@ -102,39 +121,23 @@ class CrawledFilesExtractor:
         elif any(keyword in filename_lower for keyword in ["publication", "xuat-ban", "journal", "book", "document"]):
             return "xuat_ban"
         
-        # Nếu không phân loại được từ filename, dùng content analysis
-        content_lower = content.lower()
-        best_intent = "thong_tin"  # Default intent
-        max_score = 0
-        
-        for intent_name, intent_info in self.intents.items():
-            score = 0
-            for keyword in intent_info["keywords"]:
-                # Tăng trọng số cho keywords xuất hiện nhiều lần
-                keyword_count = content_lower.count(keyword.lower())
-                score += keyword_count * (2 if len(keyword) > 5 else 1)  # Từ dài hơn có trọng số cao hơn
-            
-            # Bonus điểm nếu có nhiều keywords của cùng intent
-            keyword_matches = sum(1 for keyword in intent_info["keywords"] if keyword.lower() in content_lower)
-            if keyword_matches >= 3:
-                score += keyword_matches * 5
-            
-            if score > max_score:
-                max_score = score
-                best_intent = intent_name
-        
-        return best_intent
+        # Nếu không phân loại được từ filename, dùng content analysis (một lần quét cho mọi intent)
+        return self.content_classifier.classify(content)
     
     async def extract_qa_pairs_from_content(self, content: str, intent: str, filename: str) -> List[Dict[str, Any]]:
-        """Trích xuất Q&A pairs từ nội dung markdown"""
+        """Trích xuất Q&A pairs từ toàn bộ nội dung markdown (chia thành nhiều chunk nếu dài)"""
         if not content.strip() or len(content) < 200:
             return []
         
+        results = await map_chunks(
+            content, lambda chunk: self.extract_qa_pairs_from_chunk(chunk, intent, filename), CHUNK_TOKENS
+        )
+        return merge_qa_pairs(results)
+    
+    async def extract_qa_pairs_from_chunk(self, content_chunk: str, intent: str, filename: str) -> List[Dict[str, Any]]:
+        """Trích xuất Q&A pairs từ một chunk nội dung markdown"""
         intent_info = self.intents[intent]
         
-        # Giới hạn độ dài content để tránh vượt quá token limit
-        content_chunk = content[:6000] if len(content) > 6000 else content
-        
         prompt = f"""
         Bạn là chuyên gia trích xuất dữ liệu cho chatbot tư vấn tuyển sinh Đại học Cần Thơ.
         
@@ -183,7 +186,7 @@ class CrawledFilesExtractor:
         """
         
         try:
-            response = await self.client.chat.completions.create(
+            response = await chat_completion(
                 model="gpt-4o-mini",
                 messages=[
                     {"role": "system", "content": "Bạn là chuyên gia trích xuất dữ liệu cho chatbot tư vấn tuyển sinh. Luôn trả về JSON hợp lệ."},
@@ -193,7 +196,7 @@ class CrawledFilesExtractor:
                 max_tokens=3000
             )
             
-            result_text = response.choices[0].message.content.strip()
+            result_text = response.content.strip()
             
             # Làm sạch JSON response
             if result_text.startswith("```json"):
@@ -225,6 +228,9 @@ class CrawledFilesExtractor:
         
         print(f"🔍 Found {len(md_files)} markdown files to process")
         
+        # Học các khối lặp lại giữa các trang (menu, footer) để không gửi cho LLM
+        boilerplate = BoilerplateFilter.from_files(md_files)
+        
         # Tạo thư mục output
         for intent_name, intent_info in self.intents.items():
             folder_path = Path(intent_info["folder"])
@@ -240,7 +246,7 @@ class CrawledFilesExtractor:
             try:
                 # Đọc nội dung file
                 with open(md_file, "r", encoding="utf-8") as f:
-                    content = f.read()
+                    content = boilerplate.strip(f.read(), md_file.name)
                 
                 if len(content) < 200:
                     print(f"   ⚠️ File too short, skipping")
@@ -254,35 +260,9 @@ class CrawledFilesExtractor:
                 qa_pairs = await self.extract_qa_pairs_from_content(content, intent, md_file.name)
                 
                 if qa_pairs:
-                    # Lưu vào file JSON theo intent
-                    intent_folder = Path(self.intents[intent]["folder"])
-                    output_file = intent_folder / f"{intent}_qa.json"
-                    
-                    # Merge với dữ liệu cũ nếu có
-                    existing_qa_pairs = []
-                    if output_file.exists():
-                        try:
-                            with open(output_file, "r", encoding="utf-8") as f:
-                                existing_data = json.load(f)
-                            existing_qa_pairs = existing_data.get("qa_pairs", [])
-                        except Exception as e:
-                            print(f"   ⚠️ Error reading existing file: {e}")
-                    
-                    # Tạo dữ liệu mới
-                    all_qa_pairs = existing_qa_pairs + qa_pairs
-                    intent_data = {
-                        "intent": intent,
-                        "description": self.intents[intent]["description"],
-                        "count": len(all_qa_pairs),
-                        "qa_pairs": all_qa_pairs,
-                        "source": "crawled_markdown_files",
-                        "created_date": "2025-01-27",
-                        "last_updated": "2025-01-27"
-                    }
-                    
-                    # Lưu file
-                    with open(output_file, "w", encoding="utf-8") as f:
-                        json.dump(intent_data, f, indent=2, ensure_ascii=False)
+                    # Ghi nối (append) vào file JSONL theo intent, không đọc lại dữ liệu cũ
+                    output_file = ensure_jsonl(self.intent_file(intent))
+                    append_records(output_file, qa_pairs)
                     
                     print(f"   ✅ Extracted {len(qa_pairs)} Q&A pairs → {output_file}")
                     total_qa_pairs += len(qa_pairs)
@@ -293,16 +273,36 @@ class CrawledFilesExtractor:
             except Exception as e:
                 print(f"   ❌ Error processing {md_file.name}: {e}")
         
+        # Tạo file JSON đầy đủ (indent=2) một lần cho mỗi intent có dữ liệu mới
+        for intent, count in intent_counts.items():
+            if count > 0:
+                compact(ensure_jsonl(self.intent_file(intent)), self.intent_file(intent), self.intent_metadata(intent))
+        
         # Tạo dataset tổng hợp
         await self.create_combined_dataset(intent_counts, total_qa_pairs)
         
         print(f"\n🎉 Processing completed!")
         print(f"📊 Total Q&A pairs extracted: {total_qa_pairs}")
+        boilerplate.report()
+        report_llm_usage()
         print(f"📋 Distribution by intent:")
         for intent, count in intent_counts.items():
             if count > 0:
                 print(f"   - {intent}: {count} pairs")
     
+    def intent_file(self, intent: str) -> Path:
+        """File JSON (dạng đầy đủ) của một intent; dữ liệu gốc nằm trong file .jsonl cùng tên"""
+        return Path(self.intents[intent]["folder"]) / f"{intent}_qa.json"
+    
+    def intent_metadata(self, intent: str) -> Dict[str, Any]:
+        return {
+            "intent": intent,
+            "description": self.intents[intent]["description"],
+            "source": "crawled_markdown_files",
+            "created_date": "2025-01-27",
+            "last_updated": "2025-01-27"
+        }
+    
     async def create_combined_dataset(self, intent_counts: Dict[str, int], total_qa_pairs: int):
         """Tạo dataset tổng hợp từ tất cả các intent"""
         combined_data = {
@@ -316,34 +316,32 @@ class CrawledFilesExtractor:
                 "total_intents": len(self.intents),
                 "intent_list": list(self.intents.keys())
             },
-            "intents": intent_counts,
-            "qa_pairs": []
+            "intents": intent_counts
         }
         
-        # Đọc dữ liệu từ tất cả các intent
-        for intent, intent_info in self.intents.items():
-            intent_file = Path(intent_info["folder"]) / f"{intent}_qa.json"
-            
-            if intent_file.exists():
-                try:
-                    with open(intent_file, "r", encoding="utf-8") as f:
-                        intent_data = json.load(f)
-                    
-                    qa_pairs = intent_data.get("qa_pairs", [])
-                    combined_data["qa_pairs"].extend(qa_pairs)
-                    
-                    print(f"   ✅ Added {len(qa_pairs)} Q&A pairs from {intent}")
-                except Exception as e:
-                    print(f"   ❌ Error reading {intent_file}: {e}")
+        # Cập nhật kho Q&A (chỉ import lại file intent đã thay đổi), rồi truy vấn thay vì đọc lại từng file
+        store = QAStore()
+        intent_files = [path for path in (ensure_jsonl(self.intent_file(intent)) for intent in self.intents) if path.exists()]
+        for intent_file in intent_files:
+            store.import_file(intent_file)
+        for intent, count in store.intent_counts(intent_files).items():
+            print(f"   ✅ Added {count} Q&A pairs from {intent}")
         
-        # Lưu dataset tổng hợp
+        # Ghi dataset tổng hợp dạng JSONL (mỗi cặp Q&A một lần)
         output_file = Path("data/final/ctu_extended_dataset.json")
-        output_file.parent.mkdir(parents=True, exist_ok=True)
+        combined_jsonl = output_file.with_suffix(".jsonl.tmp")
+        combined_jsonl.parent.mkdir(parents=True, exist_ok=True)
+        combined_jsonl.unlink(missing_ok=True)
+        append_records(combined_jsonl, store.records(source_files=intent_files))
+        store.close()
+        
+        combined_jsonl.touch()
+        combined_jsonl.replace(output_file.with_suffix(".jsonl"))
         
-        with open(output_file, "w", encoding="utf-8") as f:
-            json.dump(combined_data, f, indent=2, ensure_ascii=False)
+        # File JSON đầy đủ được tạo lại từ file JSONL
+        compact(output_file.with_suffix(".jsonl"), output_file, combined_data)
         
-        print(f"\n✅ Combined dataset saved to: {output_file}")
+        print(f"\n✅ Combined dataset saved to: {output_file} (+ {output_file.with_suffix('.jsonl').name})")
 
 
 async def main():
@@ -360,8 +358,12 @@ async def main():
     # Tạo extractor
     extractor = CrawledFilesExtractor(api_key)
     
-    # Xử lý tất cả file đã cào
-    await extractor.process_crawled_files()
+    # Xử lý tất cả file đã cào (mặc định output/crawled_ctu_admission_pages,
+    # ví dụ: python extract_from_crawled_files.py output/auto_recursive/markdown)
+    if len(sys.argv) > 1:
+        await extractor.process_crawled_files(sys.argv[1])
+    else:
+        await extractor.process_crawled_files()
     
     print("\n🎉 Extraction from crawled files completed!")
 
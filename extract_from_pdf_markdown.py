@@ -4,12 +4,17 @@ import os
 from pathlib import Path
 from typing import List, Dict, Any
 from dotenv import load_dotenv
-import openai
+
+from llm_client import get_async_client, chat_completion, report_llm_usage
+from markdown_chunker import map_chunks, merge_qa_pairs
+
+# Token budget of one markdown chunk sent to the LLM
+CHUNK_TOKENS = 5000
 
 
 class PDFMarkdownExtractor:
     def __init__(self, api_key: str):
-        self.client = openai.AsyncOpenAI(api_key=api_key)
+        self.client = get_async_client(api_key)
         self.intents = {
             "thong_tin_nganh": {
                 "folder": "data/processed/thong_tin_nganh",
@@ -149,11 +154,15 @@ class PDFMarkdownExtractor:
         return best_intent
     
     async def extract_qa_pairs(self, content: str, intent: str, filename: str) -> List[Dict[str, Any]]:
-        """Trích xuất Q&A pairs từ nội dung"""
+        """Trích xuất Q&A pairs từ toàn bộ nội dung (chia thành nhiều chunk nếu dài)"""
+        results = await map_chunks(
+            content, lambda chunk: self.extract_qa_pairs_from_chunk(chunk, intent, filename), CHUNK_TOKENS
+        )
+        return merge_qa_pairs(results)
+    
+    async def extract_qa_pairs_from_chunk(self, content_chunk: str, intent: str, filename: str) -> List[Dict[str, Any]]:
+        """Trích xuất Q&A pairs từ một chunk nội dung"""
         intent_info = self.intents[intent]
-        
-        # Giới hạn độ dài content
-        content_chunk = content[:15000] if len(content) > 15000 else content
 
         # Tạo prompt tùy theo intent
         base_prompt = f"""
@@ -279,7 +288,7 @@ class PDFMarkdownExtractor:
         """ % (intent, filename, intent)
         
         try:
-            response = await self.client.chat.completions.create(
+            response = await chat_completion(
                 model="gpt-4o-mini",
                 messages=[
                     {"role": "system", "content": "Bạn là chuyên gia tư vấn tuyển sinh CTU, luôn tạo câu hỏi và trả lời THỰC TẾ, CỤ THỂ, và CHÍNH XÁC."},
@@ -289,7 +298,7 @@ class PDFMarkdownExtractor:
                 max_tokens=4000
             )
             
-            result_text = response.choices[0].message.content.strip()
+            result_text = response.content.strip()
             
             # Clean JSON
             if result_text.startswith("```json"):
@@ -329,6 +338,7 @@ async def main():
     
     print(f"\n🎉 Extraction completed!")
     print(f"📊 Total Q&A pairs extracted: {len(qa_pairs)}")
+    report_llm_usage()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,106 @@
+import hashlib
+import json
+import re
+import sqlite3
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Optional
+
+import aiohttp
+
+WHITESPACE_RE = re.compile(r'[ \t]+')
+BLANK_LINES_RE = re.compile(r'\n\s*\n+')
+
+
+def normalize_markdown(markdown: str) -> str:
+    """Normalize markdown so whitespace-only changes do not count as content changes"""
+    lines = [WHITESPACE_RE.sub(' ', line).strip() for line in (markdown or '').splitlines()]
+    return BLANK_LINES_RE.sub('\n', '\n'.join(lines)).strip()
+
+
+def content_hash(markdown: str) -> str:
+    """SHA-256 of the normalized markdown"""
+    return hashlib.sha256(normalize_markdown(markdown).encode('utf-8')).hexdigest()
+
+
+def response_validators(headers: Optional[Dict]) -> Dict[str, Optional[str]]:
+    """ETag / Last-Modified from response headers (case-insensitive)"""
+    lowered = {key.lower(): value for key, value in (headers or {}).items()}
+    return {
+        'etag': lowered.get('etag'),
+        'last_modified': lowered.get('last-modified')
+    }
+
+
+async def is_not_modified(url: str, etag: Optional[str], last_modified: Optional[str], timeout: float = 15.0) -> bool:
+    """
+    Send a conditional HEAD; True if the server answers 304 Not Modified
+
+    HEAD, not GET: a changed page is fetched by the browser crawl afterwards,
+    so its body is not downloaded here as well.
+    """
+    headers = {}
+    if etag:
+        headers['If-None-Match'] = etag
+    if last_modified:
+        headers['If-Modified-Since'] = last_modified
+    if not headers:
+        return False
+
+    try:
+        async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=timeout)) as session:
+            async with session.head(url, headers=headers, allow_redirects=True) as response:
+                return response.status == 304
+    except Exception:
+        return False
+
+
+class PageStateStore:
+    """
+    📄 Per-URL state kept across runs for incremental re-crawls
+
+    Stores the HTTP validators (ETag / Last-Modified), the normalized markdown
+    hash and the last extraction result, so unchanged pages skip LLM extraction.
+    """
+
+    def __init__(self, db_path: str = 'data/auto_recursive/page_state.db'):
+        self.db_path = db_path
+        Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(db_path)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS page_state (
+                url TEXT PRIMARY KEY,
+                etag TEXT,
+                last_modified TEXT,
+                content_hash TEXT NOT NULL,
+                result TEXT NOT NULL,
+                updated_at TEXT NOT NULL
+            )
+        """)
+        self.conn.commit()
+
+    def get(self, url: str) -> Optional[Dict]:
+        row = self.conn.execute(
+            "SELECT etag, last_modified, content_hash, result FROM page_state WHERE url = ?", (url,)
+        ).fetchone()
+        if row is None:
+            return None
+        return {
+            'etag': row[0],
+            'last_modified': row[1],
+            'content_hash': row[2],
+            'result': json.loads(row[3])
+        }
+
+    def save(self, url: str, content_hash: str, result: Dict,
+             etag: Optional[str] = None, last_modified: Optional[str] = None):
+        self.conn.execute(
+            "INSERT OR REPLACE INTO page_state (url, etag, last_modified, content_hash, result, updated_at) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (url, etag, last_modified, content_hash, json.dumps(result, ensure_ascii=False),
+             datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
+        )
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
@@ -0,0 +1,193 @@
+import json
+import sys
+import time
+from collections import deque
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+# C implementation of the automaton if available, otherwise the pure Python one below
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    ahocorasick = None
+    AHOCORASICK_AVAILABLE = False
+
+ENHANCED_INTENTS_CONFIG = "config/enhanced_intents.json"
+
+
+class KeywordAutomaton:
+    """
+    🔤 Aho-Corasick automaton counting many keywords in one pass over a text
+
+    count() returns, for every keyword, the same number as text.count(keyword):
+    occurrences of one keyword never overlap, while different keywords may
+    ("ngành" is also counted inside "chuyên ngành").
+    """
+
+    def __init__(self, keywords: Iterable[str]):
+        self.keywords: List[str] = list(dict.fromkeys(keywords))
+        self.lengths = [len(keyword) for keyword in self.keywords]
+        if AHOCORASICK_AVAILABLE:
+            self.automaton = ahocorasick.Automaton()
+            for keyword_id, keyword in enumerate(self.keywords):
+                if keyword:
+                    self.automaton.add_word(keyword, keyword_id)
+            if self.keywords:
+                self.automaton.make_automaton()
+        else:
+            self.build()
+
+    def build(self):
+        """Trie (goto), failure links and outputs merged along the failure chain"""
+        self.goto: List[Dict[str, int]] = [{}]
+        self.outputs: List[List[int]] = [[]]
+        for keyword_id, keyword in enumerate(self.keywords):
+            state = 0
+            for char in keyword:
+                next_state = self.goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self.goto)
+                    self.goto[state][char] = next_state
+                    self.goto.append({})
+                    self.outputs.append([])
+                state = next_state
+            if keyword:
+                self.outputs[state].append(keyword_id)
+
+        self.fail = [0] * len(self.goto)
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self.goto[state].items():
+                queue.append(next_state)
+                fallback = self.fail[state]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[next_state] = self.goto[fallback].get(char, 0)
+                if self.fail[next_state] == next_state:
+                    self.fail[next_state] = 0
+                self.outputs[next_state] = self.outputs[next_state] + self.outputs[self.fail[next_state]]
+
+    def matches(self, text: str) -> Iterable[Tuple[int, int]]:
+        """(end index, keyword id) of every occurrence, overlapping ones included"""
+        if AHOCORASICK_AVAILABLE:
+            return self.automaton.iter(text) if self.keywords else ()
+        return self._matches(text)
+
+    def _matches(self, text: str) -> Iterable[Tuple[int, int]]:
+        goto, fail, outputs = self.goto, self.fail, self.outputs
+        state = 0
+        for end, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for keyword_id in outputs[state]:
+                yield end, keyword_id
+
+    def count(self, text: str) -> List[int]:
+        counts = [0] * len(self.keywords)
+        next_start = [0] * len(self.keywords)
+        lengths = self.lengths
+        for end, keyword_id in self.matches(text):
+            start = end - lengths[keyword_id] + 1
+            # Like str.count: skip an occurrence overlapping the previous one of the same keyword
+            if start >= next_start[keyword_id]:
+                counts[keyword_id] += 1
+                next_start[keyword_id] = end + 1
+        return counts
+
+
+class IntentClassifier:
+    """
+    🏷️ Keyword intent classifier: all intents scored in one scan of the text
+
+    score(intent) = sum of keyword_weight(keyword) * occurrences, plus
+    distinct_bonus per distinct keyword found when at least distinct_min of the
+    intent's keywords occur. The best score wins; ties go to the intent listed
+    first in priority_order (declaration order by default); without any match
+    the fallback intent is returned.
+    """
+
+    def __init__(self, intent_keywords: Dict[str, List[str]],
+                 keyword_weight: Optional[Callable[[str], float]] = None,
+                 distinct_bonus: float = 0, distinct_min: int = 0,
+                 priority_order: Optional[List[str]] = None,
+                 fallback_intent: Optional[str] = None):
+        self.intents = list(intent_keywords)
+        self.distinct_bonus = distinct_bonus
+        self.distinct_min = distinct_min
+        self.fallback_intent = fallback_intent or (self.intents[-1] if self.intents else None)
+
+        order = [intent for intent in (priority_order or []) if intent in intent_keywords]
+        order += [intent for intent in self.intents if intent not in order]
+        self.rank = {intent: position for position, intent in enumerate(order)}
+
+        # keyword id -> [(intent, weight)], a keyword listed twice counts twice (as before)
+        self.automaton = KeywordAutomaton(
+            keyword.lower() for keywords in intent_keywords.values() for keyword in keywords
+        )
+        keyword_ids = {keyword: keyword_id for keyword_id, keyword in enumerate(self.automaton.keywords)}
+        self.keyword_intents: List[List[Tuple[str, float]]] = [[] for _ in self.automaton.keywords]
+        for intent, keywords in intent_keywords.items():
+            for keyword in keywords:
+                weight = keyword_weight(keyword) if keyword_weight else 1
+                self.keyword_intents[keyword_ids[keyword.lower()]].append((intent, weight))
+
+    @classmethod
+    def from_config(cls, config_path: str = ENHANCED_INTENTS_CONFIG, **kwargs) -> 'IntentClassifier':
+        """Keywords, priority order and fallback intent of a config/*intents.json file"""
+        with open(config_path, "r", encoding="utf-8") as f:
+            config = json.load(f)
+        rules = config.get("mapping_rules", {})
+        kwargs.setdefault("priority_order", rules.get("priority_order"))
+        kwargs.setdefault("fallback_intent", rules.get("fallback_intent"))
+        intent_keywords = {intent: info.get("keywords", []) for intent, info in config["intents"].items()}
+        return cls(intent_keywords, **kwargs)
+
+    def scores(self, text: str) -> Dict[str, float]:
+        scores = dict.fromkeys(self.intents, 0)
+        distinct = dict.fromkeys(self.intents, 0)
+        for keyword_id, count in enumerate(self.automaton.count(text.lower())):
+            if not count:
+                continue
+            for intent, weight in self.keyword_intents[keyword_id]:
+                scores[intent] += count * weight
+                distinct[intent] += 1
+        if self.distinct_bonus:
+            for intent, matches in distinct.items():
+                if matches >= self.distinct_min:
+                    scores[intent] += matches * self.distinct_bonus
+        return scores
+
+    def classify(self, text: str) -> str:
+        scores = self.scores(text)
+        best = min(self.intents, key=lambda intent: (-scores[intent], self.rank[intent]), default=None)
+        if best is None or scores[best] <= 0:
+            return self.fallback_intent
+        return best
+
+
+def main():
+    """Classify the questions of a dataset and time it: python intent_classifier.py [dataset.json] [config.json]"""
+    dataset = Path(sys.argv[1] if len(sys.argv) > 1 else "data/final/ctu_comprehensive_dataset.json")
+    config = sys.argv[2] if len(sys.argv) > 2 else ENHANCED_INTENTS_CONFIG
+    classifier = IntentClassifier.from_config(config)
+    print(f"🏷️ {len(classifier.intents)} intents, {len(classifier.automaton.keywords)} keywords from {config} "
+          f"({'pyahocorasick' if AHOCORASICK_AVAILABLE else 'pure Python'} automaton)")
+
+    with open(dataset, "r", encoding="utf-8") as f:
+        texts = [qa.get("question", "") + " " + qa.get("answer", "") for qa in json.load(f).get("qa_pairs", [])]
+
+    start = time.perf_counter()
+    labels = [classifier.classify(text) for text in texts]
+    elapsed = time.perf_counter() - start
+    print(f"⏱️ {len(texts)} Q&A pairs in {elapsed * 1000:.1f} ms ({elapsed / max(1, len(texts)) * 1e6:.1f} µs each)")
+    for intent in classifier.intents:
+        count = labels.count(intent)
+        if count:
+            print(f"   📁 {intent}: {count}")
+
+
+if __name__ == "__main__":
+    main()
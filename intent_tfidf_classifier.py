@@ -0,0 +1,311 @@
+import json
+import sys
+import time
+import unicodedata
+import zlib
+from functools import lru_cache
+from pathlib import Path
+from typing import List, Sequence, Tuple
+
+import numpy as np
+
+from text_normalizer import strip_diacritics
+
+DEFAULT_DATASET = "output/intent_dataset/ctu_intent_questions.json"
+DEFAULT_MODEL = "output/intent_dataset/intent_tfidf_model.npz"
+FEATURE_DIM = 1 << 16  # hashed character n-gram buckets
+NGRAM_RANGE = (2, 4)
+
+
+@lru_cache(maxsize=1 << 20)
+def bucket(gram: str) -> int:
+    return zlib.crc32(gram.encode('utf-8')) % FEATURE_DIM
+
+
+def char_ngrams(text: str, ngram_range: Tuple[int, int] = NGRAM_RANGE) -> List[str]:
+    """
+    Character n-grams inside word boundaries (' word ' padded), of the text and
+    of its diacritic-free form: "hoc phi" shares most features with "học phí"
+    """
+    text = unicodedata.normalize('NFC', text).lower()
+    low, high = ngram_range
+    grams = []
+    for variant in (text, strip_diacritics(text)):
+        for word in variant.split():
+            padded = f" {word} "
+            for n in range(low, high + 1):
+                grams.extend(padded[i:i + n] for i in range(len(padded) - n + 1))
+    return grams
+
+
+def term_frequencies(text: str, ngram_range: Tuple[int, int] = NGRAM_RANGE) -> Tuple[np.ndarray, np.ndarray]:
+    """Hashed feature indices and sublinear term frequencies (1 + log tf) of one text"""
+    indices = np.fromiter((bucket(gram) for gram in char_ngrams(text, ngram_range)), dtype=np.int64)
+    if not len(indices):
+        return indices, np.zeros(0, dtype=np.float32)
+    unique, counts = np.unique(indices, return_counts=True)
+    return unique, (1 + np.log(counts)).astype(np.float32)
+
+
+def softmax(scores: np.ndarray) -> np.ndarray:
+    scores = scores - scores.max(axis=1, keepdims=True)
+    exp = np.exp(scores)
+    return exp / exp.sum(axis=1, keepdims=True)
+
+
+class TfidfIntentModel:
+    """
+    🧠 Intent classifier: multinomial logistic regression over hashed
+    character n-gram TF-IDF features (numpy only)
+
+    Texts become sparse rows (CSR arrays); scores are one gather + segment sum
+    per batch, so predict() on many questions costs one vectorized pass.
+    Saved as a compressed .npz (float16 weights), loading takes milliseconds.
+    """
+
+    def __init__(self, intents: List[str], weights: np.ndarray, bias: np.ndarray, idf: np.ndarray,
+                 ngram_range: Tuple[int, int] = NGRAM_RANGE):
+        self.intents = intents
+        self.weights = weights.astype(np.float32)
+        self.bias = bias.astype(np.float32)
+        self.idf = idf.astype(np.float32)
+        self.ngram_range = tuple(ngram_range)
+
+    def vectorize(self, texts: Sequence[str]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """CSR (indptr, indices, values) of L2-normalized TF-IDF rows"""
+        return vectorize(texts, self.idf, self.ngram_range)
+
+    def decision_function(self, texts: Sequence[str]) -> np.ndarray:
+        return sparse_dot(self.vectorize(texts), self.weights) + self.bias
+
+    def predict_proba(self, texts: Sequence[str]) -> np.ndarray:
+        return softmax(self.decision_function(texts))
+
+    def predict(self, texts: Sequence[str]) -> List[str]:
+        if not texts:
+            return []
+        return [self.intents[i] for i in self.decision_function(texts).argmax(axis=1).tolist()]
+
+    def predict_one(self, text: str) -> Tuple[str, float]:
+        """(intent, probability) of a single question"""
+        proba = self.predict_proba([text])[0]
+        best = int(proba.argmax())
+        return self.intents[best], float(proba[best])
+
+    def save(self, path: str = DEFAULT_MODEL) -> Path:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        np.savez_compressed(
+            path,
+            weights=self.weights.astype(np.float16),
+            bias=self.bias,
+            idf=self.idf.astype(np.float16),
+            intents=np.array(self.intents),
+            ngram_range=np.array(self.ngram_range)
+        )
+        return path
+
+    @classmethod
+    def load(cls, path: str = DEFAULT_MODEL) -> 'TfidfIntentModel':
+        with np.load(path) as data:
+            return cls([str(intent) for intent in data['intents']], data['weights'], data['bias'], data['idf'],
+                       tuple(int(n) for n in data['ngram_range']))
+
+    @classmethod
+    def train(cls, texts: Sequence[str], labels: Sequence[str], epochs: int = 15, batch_size: int = 256,
+              learning_rate: float = 0.05, l2: float = 1e-5, augment: bool = True, seed: int = 42,
+              ngram_range: Tuple[int, int] = NGRAM_RANGE) -> 'TfidfIntentModel':
+        """
+        Mini-batch Adam on the softmax loss. augment=True also trains on the
+        diacritic-free copy of every question (the "typo" style)
+        """
+        texts, labels = list(texts), list(labels)
+        if augment:
+            stripped = [strip_diacritics(text) for text in texts]
+            extra = [i for i, text in enumerate(stripped) if text != texts[i]]
+            texts += [stripped[i] for i in extra]
+            labels += [labels[i] for i in extra]
+
+        intents = sorted(set(labels))
+        y = np.array([intents.index(label) for label in labels])
+
+        # Document frequency over the training questions -> smoothed idf
+        rows = [term_frequencies(text, ngram_range) for text in texts]
+        df = np.zeros(FEATURE_DIM, dtype=np.float64)
+        for indices, _ in rows:
+            df[indices] += 1
+        idf = (np.log((1 + len(texts)) / (1 + df)) + 1).astype(np.float32)
+        indptr, indices, values = to_csr(rows, idf)
+
+        rng = np.random.default_rng(seed)
+        weights = np.zeros((FEATURE_DIM, len(intents)), dtype=np.float32)
+        bias = np.zeros(len(intents), dtype=np.float32)
+        m_w, v_w = np.zeros_like(weights), np.zeros_like(weights)
+        m_b, v_b = np.zeros_like(bias), np.zeros_like(bias)
+        beta1, beta2, eps = 0.9, 0.999, 1e-8
+        step = 0
+
+        for epoch in range(epochs):
+            order = rng.permutation(len(texts))
+            for start in range(0, len(order), batch_size):
+                batch = order[start:start + batch_size]
+                batch_csr = slice_rows((indptr, indices, values), batch)
+                proba = softmax(sparse_dot(batch_csr, weights) + bias)
+                proba[np.arange(len(batch)), y[batch]] -= 1
+                proba /= len(batch)
+
+                grad_w = sparse_transpose_dot(batch_csr, proba, FEATURE_DIM) + l2 * weights
+                grad_b = proba.sum(axis=0)
+
+                step += 1
+                for param, grad, m, v in ((weights, grad_w, m_w, v_w), (bias, grad_b, m_b, v_b)):
+                    m *= beta1
+                    m += (1 - beta1) * grad
+                    v *= beta2
+                    v += (1 - beta2) * grad * grad
+                    m_hat = m / (1 - beta1 ** step)
+                    v_hat = v / (1 - beta2 ** step)
+                    param -= learning_rate * m_hat / (np.sqrt(v_hat) + eps)
+
+        return cls(intents, weights, bias, idf, ngram_range)
+
+
+def to_csr(rows: List[Tuple[np.ndarray, np.ndarray]], idf: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Stack (indices, tf) rows into L2-normalized TF-IDF CSR arrays"""
+    indptr = np.zeros(len(rows) + 1, dtype=np.int64)
+    indptr[1:] = np.cumsum([len(indices) for indices, _ in rows])
+    if not indptr[-1]:
+        return indptr, np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+    indices = np.concatenate([indices for indices, _ in rows])
+    values = np.concatenate([tf for _, tf in rows]) * idf[indices]
+    row_of = np.repeat(np.arange(len(rows)), np.diff(indptr))
+    norms = np.sqrt(np.bincount(row_of, weights=values * values, minlength=len(rows)))
+    values = (values / np.maximum(norms, 1e-12)[row_of]).astype(np.float32)
+    return indptr, indices, values
+
+
+def vectorize(texts: Sequence[str], idf: np.ndarray, ngram_range: Tuple[int, int] = NGRAM_RANGE):
+    return to_csr([term_frequencies(text, ngram_range) for text in texts], idf)
+
+
+def sparse_dot(csr: Tuple[np.ndarray, np.ndarray, np.ndarray], dense: np.ndarray) -> np.ndarray:
+    """CSR (N x D) @ dense (D x I)"""
+    indptr, indices, values = csr
+    rows = len(indptr) - 1
+    result = np.zeros((rows, dense.shape[1]), dtype=np.float32)
+    if not len(indices):
+        return result
+    products = dense[indices] * values[:, None]
+    nonempty = np.diff(indptr) > 0
+    result[nonempty] = np.add.reduceat(products, indptr[:-1][nonempty], axis=0)
+    return result
+
+
+def sparse_transpose_dot(csr: Tuple[np.ndarray, np.ndarray, np.ndarray], dense: np.ndarray, dim: int) -> np.ndarray:
+    """CSR.T (D x N) @ dense (N x I), one bincount per output column"""
+    indptr, indices, values = csr
+    row_of = np.repeat(np.arange(len(indptr) - 1), np.diff(indptr))
+    return np.stack([np.bincount(indices, weights=values * dense[row_of, j], minlength=dim)
+                     for j in range(dense.shape[1])], axis=1).astype(np.float32)
+
+
+def slice_rows(csr: Tuple[np.ndarray, np.ndarray, np.ndarray], rows: np.ndarray):
+    indptr, indices, values = csr
+    starts, ends = indptr[rows], indptr[rows + 1]
+    lengths = ends - starts
+    new_indptr = np.zeros(len(rows) + 1, dtype=np.int64)
+    new_indptr[1:] = np.cumsum(lengths)
+    positions = np.repeat(starts - new_indptr[:-1], lengths) + np.arange(new_indptr[-1])
+    return new_indptr, indices[positions], values[positions]
+
+
+def load_training_data(path: str = DEFAULT_DATASET) -> Tuple[List[str], List[str]]:
+    """
+    (questions, intents) of the generated intent dataset
+    ({"intent_categories": [{"intent_id", "questions": [{"text"}]}]}), or of a
+    Q&A dataset with an intent/category per pair
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    texts, labels = [], []
+    for category in data.get("intent_categories", []):
+        for question in category.get("questions", []):
+            text = question["text"] if isinstance(question, dict) else question
+            texts.append(text)
+            labels.append(category["intent_id"])
+    for qa in data.get("qa_pairs", []):
+        label = qa.get("intent") or qa.get("category")
+        if qa.get("question") and label:
+            texts.append(qa["question"])
+            labels.append(label)
+    return texts, labels
+
+
+def evaluate(texts: List[str], labels: List[str], test_ratio: float = 0.2, seed: int = 42, **train_kwargs):
+    """Held-out accuracy on the questions as written and without diacritics"""
+    order = np.random.default_rng(seed).permutation(len(texts))
+    split = int(len(texts) * (1 - test_ratio))
+    train_idx, test_idx = order[:split], order[split:]
+
+    start = time.perf_counter()
+    model = TfidfIntentModel.train([texts[i] for i in train_idx], [labels[i] for i in train_idx], **train_kwargs)
+    print(f"🏋️ Trained on {len(train_idx)} questions in {time.perf_counter() - start:.1f} s")
+
+    test_texts = [texts[i] for i in test_idx]
+    test_labels = [labels[i] for i in test_idx]
+    for name, variant in (("as written", test_texts), ("no diacritics", [strip_diacritics(t) for t in test_texts])):
+        predicted = model.predict(variant)
+        accuracy = sum(p == t for p, t in zip(predicted, test_labels)) / max(1, len(test_labels))
+        print(f"   🎯 Accuracy ({name}): {accuracy:.1%} on {len(test_labels)} held-out questions")
+    return model
+
+
+def main():
+    """
+    python intent_tfidf_classifier.py train [dataset.json] [model.npz]
+    python intent_tfidf_classifier.py predict "câu hỏi" ... [--model model.npz]
+    """
+    args = sys.argv[1:]
+    command = args[0] if args else "train"
+
+    if command == "train":
+        dataset = args[1] if len(args) > 1 else DEFAULT_DATASET
+        model_path = args[2] if len(args) > 2 else DEFAULT_MODEL
+        texts, labels = load_training_data(dataset)
+        if not texts:
+            print(f"❌ No labeled questions in {dataset}")
+            return
+        print(f"📚 {len(texts)} questions, {len(set(labels))} intents from {dataset}")
+        evaluate(texts, labels)
+
+        model = TfidfIntentModel.train(texts, labels)
+        path = model.save(model_path)
+        print(f"💾 Model saved: {path} ({path.stat().st_size / 1024:.0f} KB)")
+
+        start = time.perf_counter()
+        model = TfidfIntentModel.load(path)
+        print(f"⚡ Loaded in {(time.perf_counter() - start) * 1000:.1f} ms")
+        batch = texts[:1000]
+        start = time.perf_counter()
+        model.predict(batch)
+        elapsed = time.perf_counter() - start
+        print(f"⚡ Batch predict: {len(batch)} questions in {elapsed * 1000:.1f} ms "
+              f"({len(batch) / elapsed:,.0f} questions/s)")
+
+    elif command == "predict":
+        model_path = DEFAULT_MODEL
+        if "--model" in args:
+            position = args.index("--model")
+            model_path = args[position + 1]
+            args = args[:position] + args[position + 2:]
+        model = TfidfIntentModel.load(model_path)
+        for text in args[1:]:
+            intent, probability = model.predict_one(text)
+            print(f"🏷️ {intent} ({probability:.2f}): {text}")
+
+    else:
+        print(main.__doc__)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+import json
+import sys
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+
+def jsonl_path_for(json_path: Path) -> Path:
+    """data/processed/hoc_phi/hoc_phi_qa.json -> data/processed/hoc_phi/hoc_phi_qa.jsonl"""
+    return Path(json_path).with_suffix('.jsonl')
+
+
+def append_records(path: Path, records: Iterable[Dict[str, Any]]) -> int:
+    """
+    Append records as JSON lines; costs O(batch) whatever the size of the file.
+    Returns the number of records written.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    lines = [json.dumps(record, ensure_ascii=False) + "\n" for record in records]
+    if lines and path.exists() and path.stat().st_size:
+        # A write cut off mid-line must not swallow the first new record
+        with open(path, "rb") as f:
+            f.seek(-1, 2)
+            if f.read(1) != b"\n":
+                lines[0] = "\n" + lines[0]
+    if lines:
+        with open(path, "a", encoding="utf-8") as f:
+            f.writelines(lines)
+    return len(lines)
+
+
+def iter_records(path: Path) -> Iterator[Dict[str, Any]]:
+    """
+    Stream the records of a JSONL file one line at a time.
+    A line that does not parse (e.g. a write cut off by a crash) is skipped.
+    """
+    path = Path(path)
+    if not path.exists():
+        return
+    with open(path, "r", encoding="utf-8") as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                print(f"⚠️  Skipping malformed line {line_number} of {path}")
+
+
+def count_records(path: Path) -> int:
+    return sum(1 for _ in iter_records(path))
+
+
+def read_json_metadata(json_path: Path) -> Dict[str, Any]:
+    """Top-level fields of a pretty JSON dataset, without its qa_pairs"""
+    json_path = Path(json_path)
+    if not json_path.exists():
+        return {}
+    try:
+        with open(json_path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (json.JSONDecodeError, OSError) as e:
+        print(f"⚠️  Error reading {json_path}: {e}")
+        return {}
+    if not isinstance(data, dict):
+        return {}
+    return {key: value for key, value in data.items() if key not in ("qa_pairs", "count")}
+
+
+def ensure_jsonl(json_path: Path) -> Path:
+    """
+    JSONL file of a dataset, created once from its existing pretty JSON.
+    From then on the JSONL file is the source of truth and the JSON is
+    regenerated by compact().
+    """
+    json_path = Path(json_path)
+    jsonl_path = jsonl_path_for(json_path)
+    if jsonl_path.exists() or not json_path.exists():
+        return jsonl_path
+
+    try:
+        with open(json_path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (json.JSONDecodeError, OSError) as e:
+        print(f"⚠️  Error reading existing file {json_path}: {e}")
+        return jsonl_path
+    qa_pairs = data.get("qa_pairs", []) if isinstance(data, dict) else data
+    # Write to a temporary file first so a crash never leaves a half-converted dataset
+    tmp_path = jsonl_path.with_suffix(".jsonl.tmp")
+    tmp_path.unlink(missing_ok=True)
+    written = append_records(tmp_path, qa_pairs)
+    if written:
+        tmp_path.replace(jsonl_path)
+    else:
+        jsonl_path.touch()
+    print(f"📄 Converted {json_path} to {jsonl_path.name} ({written} records)")
+    return jsonl_path
+
+
+def compact(jsonl_path: Path, json_path: Optional[Path] = None,
+            metadata: Optional[Dict[str, Any]] = None) -> Path:
+    """
+    Write the pretty JSON view of a JSONL dataset ({**metadata, "count", "qa_pairs"}).
+    Without metadata, the top-level fields of the existing JSON file are kept.
+    """
+    jsonl_path = Path(jsonl_path)
+    json_path = Path(json_path) if json_path else jsonl_path.with_suffix('.json')
+    if metadata is None:
+        metadata = read_json_metadata(json_path)
+
+    qa_pairs: List[Dict[str, Any]] = list(iter_records(jsonl_path))
+    data = {**metadata, "count": len(qa_pairs), "qa_pairs": qa_pairs}
+    tmp_path = json_path.with_suffix(".json.tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+    tmp_path.replace(json_path)
+    return json_path
+
+
+def main():
+    """
+    Convert datasets between the two formats:
+      python jsonl_dataset.py data/processed/*/*_qa.jsonl   (compact to pretty JSON)
+      python jsonl_dataset.py data/final/*.json             (convert to JSONL)
+    """
+    paths = [Path(p) for p in sys.argv[1:]]
+    if not paths:
+        print(main.__doc__)
+        return
+
+    for path in paths:
+        if path.suffix == ".jsonl":
+            json_path = compact(path)
+            print(f"✅ {path} → {json_path} ({count_records(path)} records)")
+        elif path.suffix == ".json":
+            jsonl_path = ensure_jsonl(path)
+            print(f"✅ {path} → {jsonl_path} ({count_records(jsonl_path)} records)")
+        else:
+            print(f"⚠️  Skipping {path}: not a .json or .jsonl file")
+
+
+if __name__ == "__main__":
+    main()
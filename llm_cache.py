@@ -0,0 +1,132 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, NamedTuple, Tuple
+
+
+class LLMResponse(NamedTuple):
+    content: str
+    total_tokens: int
+    cached: bool
+    finish_reason: Optional[str] = None
+
+
+def sha256_text(text: str) -> str:
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def split_messages(messages: List[Dict]) -> Tuple[str, str]:
+    """System prompt and user content of a chat request"""
+    system_prompt = "\n".join(m['content'] for m in messages if m['role'] == 'system')
+    user_content = "\n".join(f"{m['role']}:{m['content']}" for m in messages if m['role'] != 'system')
+    return system_prompt, user_content
+
+
+class LLMResponseCache:
+    """
+    💾 On-disk cache of chat completion responses (SQLite)
+
+    Key: (model, temperature, max_tokens, system prompt hash, user content hash).
+    When the stored responses exceed max_size_mb, the least recently used
+    entries are evicted. hits/misses count the current run only. One connection
+    shared by all threads, behind a lock.
+    """
+
+    def __init__(self, db_path: str = 'data/cache/llm_cache.db', max_size_mb: float = 200):
+        self.db_path = db_path
+        self.max_size_bytes = int(max_size_mb * 1024 * 1024)
+        self.hits = 0
+        self.misses = 0
+        self.tokens_saved = 0
+
+        Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        self.lock = threading.RLock()
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS llm_cache (
+                key TEXT PRIMARY KEY,
+                model TEXT NOT NULL,
+                content TEXT NOT NULL,
+                total_tokens INTEGER NOT NULL,
+                size INTEGER NOT NULL,
+                last_access REAL NOT NULL
+            )
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_llm_cache_last_access ON llm_cache (last_access)")
+        self.conn.commit()
+        self.total_size = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM llm_cache").fetchone()[0]
+
+    @staticmethod
+    def make_key(model: str, temperature: float, max_tokens: Optional[int], messages: List[Dict]) -> str:
+        system_prompt, user_content = split_messages(messages)
+        return sha256_text(json.dumps({
+            'model': model,
+            'temperature': temperature,
+            'max_tokens': max_tokens,
+            'system': sha256_text(system_prompt),
+            'user': sha256_text(user_content)
+        }, sort_keys=True))
+
+    def get(self, key: str, accept: Optional[Callable[[str], bool]] = None) -> Optional[LLMResponse]:
+        """Cached response, None (a miss) if there is none or accept rejects its content"""
+        with self.lock:
+            row = self.conn.execute("SELECT content, total_tokens FROM llm_cache WHERE key = ?", (key,)).fetchone()
+            if row is None or (accept is not None and not accept(row[0])):
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            self.tokens_saved += row[1]
+            self.conn.execute("UPDATE llm_cache SET last_access = ? WHERE key = ?", (time.time(), key))
+            self.conn.commit()
+            return LLMResponse(content=row[0], total_tokens=row[1], cached=True)
+
+    def put(self, key: str, model: str, content: str, total_tokens: int):
+        with self.lock:
+            size = len(content.encode('utf-8'))
+            old = self.conn.execute("SELECT size FROM llm_cache WHERE key = ?", (key,)).fetchone()
+            self.conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, model, content, total_tokens, size, last_access) VALUES (?, ?, ?, ?, ?, ?)",
+                (key, model, content, total_tokens, size, time.time())
+            )
+            self.total_size += size - (old[0] if old else 0)
+            self.conn.commit()
+            if self.total_size > self.max_size_bytes:
+                self.evict()
+
+    def evict(self):
+        """Drop least recently used entries until the cache is under 90% of its size limit"""
+        target = int(self.max_size_bytes * 0.9)
+        rows = self.conn.execute("SELECT key, size FROM llm_cache ORDER BY last_access").fetchall()
+        evicted = []
+        for key, size in rows:
+            if self.total_size <= target:
+                break
+            evicted.append((key,))
+            self.total_size -= size
+        self.conn.executemany("DELETE FROM llm_cache WHERE key = ?", evicted)
+        self.conn.commit()
+
+    def report(self):
+        total = self.hits + self.misses
+        hit_rate = self.hits / total * 100 if total else 0
+        print(f"💾 LLM cache: {self.hits} hits, {self.misses} misses ({hit_rate:.0f}% hit rate), "
+              f"~{self.tokens_saved:,} tokens saved, {self.total_size / 1024 / 1024:.1f} MB on disk")
+
+
+_shared_cache: Optional[LLMResponseCache] = None
+_shared_cache_lock = threading.Lock()
+
+
+def get_llm_cache() -> LLMResponseCache:
+    """Process-wide cache instance, so counters cover the whole run"""
+    global _shared_cache
+    with _shared_cache_lock:
+        if _shared_cache is None:
+            _shared_cache = LLMResponseCache()
+    return _shared_cache
+
@@ -0,0 +1,294 @@
+import asyncio
+import os
+import random
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+import openai
+
+from llm_cache import LLMResponse, get_llm_cache
+
+
+def estimate_tokens(messages: List[Dict], max_tokens: Optional[int]) -> int:
+    """Rough token estimate used for TPM budgeting (Vietnamese is ~3 chars/token)"""
+    prompt_chars = sum(len(m.get('content') or '') for m in messages)
+    return prompt_chars // 3 + (max_tokens or 1000)
+
+
+class TokenBucket:
+    """
+    Token bucket refilled continuously at rate_per_minute.
+
+    reserve() takes the tokens immediately (the bucket may go negative) and
+    returns how long the caller has to wait, so concurrent callers queue up
+    behind each other instead of all retrying at once.
+    """
+
+    def __init__(self, rate_per_minute: float):
+        self.capacity = rate_per_minute
+        self.tokens = rate_per_minute
+        self.rate = rate_per_minute / 60.0
+        self.updated = time.monotonic()
+
+    def reserve(self, amount: float, rate_factor: float = 1.0) -> float:
+        now = time.monotonic()
+        rate = self.rate * rate_factor
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * rate)
+        self.updated = now
+
+        self.tokens -= min(amount, self.capacity)
+        if self.tokens >= 0:
+            return 0.0
+        return -self.tokens / rate
+
+    def refund(self, amount: float):
+        self.tokens = min(self.capacity, self.tokens + amount)
+
+
+class RateLimitScheduler:
+    """
+    🚦 Global scheduler for OpenAI calls
+
+    - Requests/min and tokens/min token buckets (estimated tokens, corrected with real usage)
+    - Bounded number of in-flight requests
+    - On 429: exponential backoff (honouring Retry-After), the whole scheduler
+      pauses and its rate is halved, then recovers gradually on success
+    """
+
+    def __init__(self, requests_per_minute: int = 500, tokens_per_minute: int = 200_000,
+                 max_concurrency: int = 8, max_retries: int = 6):
+        self.request_bucket = TokenBucket(requests_per_minute)
+        self.token_bucket = TokenBucket(tokens_per_minute)
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+
+        self.lock = threading.Lock()
+        self.rate_factor = 1.0
+        self.paused_until = 0.0
+        self.thread_semaphore = threading.BoundedSemaphore(max_concurrency)
+        self.async_semaphores: Dict[int, asyncio.Semaphore] = {}
+
+        self.stats = {'requests': 0, 'rate_limited': 0, 'retries': 0, 'tokens': 0}
+
+    def async_semaphore(self) -> asyncio.Semaphore:
+        # One semaphore per event loop (scripts may call asyncio.run more than once)
+        loop_id = id(asyncio.get_running_loop())
+        if loop_id not in self.async_semaphores:
+            self.async_semaphores[loop_id] = asyncio.Semaphore(self.max_concurrency)
+        return self.async_semaphores[loop_id]
+
+    def reserve(self, estimated_tokens: int) -> float:
+        """Seconds to wait before sending a request of estimated_tokens"""
+        with self.lock:
+            now = time.monotonic()
+            return max(
+                self.request_bucket.reserve(1, self.rate_factor),
+                self.token_bucket.reserve(estimated_tokens, self.rate_factor),
+                self.paused_until - now
+            )
+
+    def record_success(self, estimated_tokens: int, response):
+        actual = response.usage.total_tokens if getattr(response, 'usage', None) else estimated_tokens
+        with self.lock:
+            if actual < estimated_tokens:
+                self.token_bucket.refund(estimated_tokens - actual)
+            self.rate_factor = min(1.0, self.rate_factor * 1.05)
+            self.stats['requests'] += 1
+            self.stats['tokens'] += actual
+
+    def record_failure(self, error: Exception, attempt: int) -> float:
+        """Backoff delay after a failed attempt; 429s also slow the whole scheduler down"""
+        retry_after = None
+        response = getattr(error, 'response', None)
+        if response is not None:
+            try:
+                retry_after = float(response.headers.get('retry-after'))
+            except (TypeError, ValueError):
+                retry_after = None
+
+        delay = max(retry_after or 0.0, min(60.0, 2.0 ** attempt)) * (1 + random.random() * 0.25)
+        with self.lock:
+            self.stats['retries'] += 1
+            if isinstance(error, openai.RateLimitError):
+                self.stats['rate_limited'] += 1
+                self.rate_factor = max(0.1, self.rate_factor * 0.5)
+                self.paused_until = max(self.paused_until, time.monotonic() + delay)
+        return delay
+
+    def should_retry(self, error: Exception, attempt: int) -> bool:
+        if attempt >= self.max_retries:
+            return False
+        if isinstance(error, openai.RateLimitError):
+            # Out of quota is not going to fix itself
+            return getattr(error, 'code', None) != 'insufficient_quota'
+        return isinstance(error, (openai.APIConnectionError, openai.APITimeoutError, openai.InternalServerError))
+
+    async def run(self, call: Callable, estimated_tokens: int):
+        """Run an async OpenAI call under the rate limits, retrying 429/5xx/timeouts"""
+        attempt = 0
+        while True:
+            wait = self.reserve(estimated_tokens)
+            if wait > 0:
+                await asyncio.sleep(wait)
+            try:
+                async with self.async_semaphore():
+                    response = await call()
+            except Exception as e:
+                if not self.should_retry(e, attempt):
+                    raise
+                await asyncio.sleep(self.record_failure(e, attempt))
+                attempt += 1
+                continue
+            self.record_success(estimated_tokens, response)
+            return response
+
+    def run_sync(self, call: Callable, estimated_tokens: int):
+        """Blocking version of run() for synchronous OpenAI clients"""
+        attempt = 0
+        while True:
+            wait = self.reserve(estimated_tokens)
+            if wait > 0:
+                time.sleep(wait)
+            try:
+                with self.thread_semaphore:
+                    response = call()
+            except Exception as e:
+                if not self.should_retry(e, attempt):
+                    raise
+                time.sleep(self.record_failure(e, attempt))
+                attempt += 1
+                continue
+            self.record_success(estimated_tokens, response)
+            return response
+
+    def report(self):
+        print(f"🚦 OpenAI scheduler: {self.stats['requests']} requests, {self.stats['tokens']:,} tokens, "
+              f"{self.stats['rate_limited']} rate-limited (429), {self.stats['retries']} retries")
+
+
+_async_client: Optional[openai.AsyncOpenAI] = None
+_sync_client: Optional[openai.OpenAI] = None
+_scheduler: Optional[RateLimitScheduler] = None
+# Sync callers may create the shared objects from several threads at once
+_shared_lock = threading.Lock()
+
+
+def get_async_client(api_key: Optional[str] = None) -> openai.AsyncOpenAI:
+    """Shared AsyncOpenAI client (one connection pool per process)"""
+    global _async_client
+    if _async_client is None:
+        # Retries are handled by the scheduler
+        _async_client = openai.AsyncOpenAI(api_key=api_key or os.getenv('OPENAI_API_KEY'), max_retries=0, timeout=60.0)
+    return _async_client
+
+
+def get_sync_client(api_key: Optional[str] = None) -> openai.OpenAI:
+    """Shared synchronous OpenAI client"""
+    global _sync_client
+    with _shared_lock:
+        if _sync_client is None:
+            _sync_client = openai.OpenAI(api_key=api_key or os.getenv('OPENAI_API_KEY'), max_retries=0, timeout=60.0)
+    return _sync_client
+
+
+def get_scheduler() -> RateLimitScheduler:
+    """Process-wide scheduler, limits read from OPENAI_RPM / OPENAI_TPM / OPENAI_MAX_CONCURRENCY"""
+    global _scheduler
+    with _shared_lock:
+        if _scheduler is None:
+            _scheduler = RateLimitScheduler(
+                requests_per_minute=int(os.getenv('OPENAI_RPM', '500')),
+                tokens_per_minute=int(os.getenv('OPENAI_TPM', '200000')),
+                max_concurrency=int(os.getenv('OPENAI_MAX_CONCURRENCY', '8'))
+            )
+    return _scheduler
+
+
+def response_content(response) -> LLMResponse:
+    content = response.choices[0].message.content or ""
+    total_tokens = response.usage.total_tokens if response.usage else 0
+    return LLMResponse(content=content, total_tokens=total_tokens, cached=False,
+                       finish_reason=response.choices[0].finish_reason)
+
+
+def is_usable(content: str, validate: Optional[Callable[[str], Any]]) -> bool:
+    """True if validate (e.g. the caller's JSON parser) accepts the content without raising"""
+    if validate is None:
+        return True
+    try:
+        validate(content)
+    except Exception:
+        return False
+    return True
+
+
+def cached_response(cache, key: str, validate: Optional[Callable[[str], Any]]) -> Optional[LLMResponse]:
+    # Entries the caller cannot parse (stored before validation existed) count as misses and are fetched again
+    return cache.get(key, lambda content: is_usable(content, validate))
+
+
+def store_response(cache, key: str, model: str, result: LLMResponse, validate: Optional[Callable[[str], Any]]):
+    """Cache only complete responses the caller can use, a bad one would be replayed on every run"""
+    if result.finish_reason == "length" or not is_usable(result.content, validate):
+        return
+    cache.put(key, model, result.content, result.total_tokens)
+
+
+async def chat_completion(messages: List[Dict], model: str = "gpt-4o-mini", temperature: float = 0.0,
+                          max_tokens: Optional[int] = None, use_cache: bool = True,
+                          validate: Optional[Callable[[str], Any]] = None) -> LLMResponse:
+    """
+    Chat completion through the shared client, scheduler and response cache
+
+    validate: parser of the content (raises on bad output), only responses it
+    accepts are cached. Truncated responses (finish_reason "length") never are.
+    """
+    cache = get_llm_cache()
+    key = cache.make_key(model, temperature, max_tokens, messages)
+    if use_cache:
+        cached = cached_response(cache, key, validate)
+        if cached is not None:
+            return cached
+
+    client = get_async_client()
+    response = await get_scheduler().run(
+        lambda: client.chat.completions.create(
+            model=model, messages=messages, temperature=temperature, max_tokens=max_tokens
+        ),
+        estimate_tokens(messages, max_tokens)
+    )
+    result = response_content(response)
+    if use_cache:
+        store_response(cache, key, model, result, validate)
+    return result
+
+
+def chat_completion_sync(messages: List[Dict], model: str = "gpt-4o-mini", temperature: float = 0.0,
+                         max_tokens: Optional[int] = None, use_cache: bool = True,
+                         validate: Optional[Callable[[str], Any]] = None) -> LLMResponse:
+    """Blocking version of chat_completion"""
+    cache = get_llm_cache()
+    key = cache.make_key(model, temperature, max_tokens, messages)
+    if use_cache:
+        cached = cached_response(cache, key, validate)
+        if cached is not None:
+            return cached
+
+    client = get_sync_client()
+    response = get_scheduler().run_sync(
+        lambda: client.chat.completions.create(
+            model=model, messages=messages, temperature=temperature, max_tokens=max_tokens
+        ),
+        estimate_tokens(messages, max_tokens)
+    )
+    result = response_content(response)
+    if use_cache:
+        store_response(cache, key, model, result, validate)
+    return result
+
+
+def report_llm_usage():
+    """Print cache and scheduler counters for this run"""
+    get_llm_cache().report()
+    get_scheduler().report()
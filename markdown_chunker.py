@@ -0,0 +1,175 @@
+import asyncio
+import re
+from typing import Awaitable, Callable, Dict, List, Tuple, TypeVar
+
+# Real tokenizer if available, otherwise a rough estimate
+try:
+    import tiktoken
+    try:
+        _ENCODING = tiktoken.get_encoding("o200k_base")  # gpt-4o / gpt-4o-mini
+    except ValueError:
+        _ENCODING = tiktoken.get_encoding("cl100k_base")
+    TIKTOKEN_AVAILABLE = True
+except ImportError:
+    _ENCODING = None
+    TIKTOKEN_AVAILABLE = False
+
+HEADING_RE = re.compile(r'^#{1,6}\s')
+TABLE_SEPARATOR_RE = re.compile(r'^\|?\s*:?-{3,}')
+
+T = TypeVar('T')
+
+_estimate_warned = False
+
+
+def count_tokens(text: str) -> int:
+    """Number of tokens in text for the gpt-4o family"""
+    global _estimate_warned
+    if _ENCODING is not None:
+        return len(_ENCODING.encode(text, disallowed_special=()))
+    if not _estimate_warned:
+        _estimate_warned = True
+        print("⚠️  tiktoken not installed, token counts are estimated. Run: pip install tiktoken")
+    return len(text) // 3 + 1  # Vietnamese is ~3 chars/token
+
+
+def split_blocks(markdown: str) -> List[Tuple[str, str]]:
+    """Split markdown into (kind, text) blocks: 'heading', 'table' or 'text'"""
+    blocks = []
+    kind, lines = None, []
+
+    def flush():
+        nonlocal kind, lines
+        if lines:
+            blocks.append((kind, "\n".join(lines)))
+        kind, lines = None, []
+
+    for line in markdown.splitlines():
+        if HEADING_RE.match(line):
+            flush()
+            blocks.append(('heading', line))
+        elif line.strip().startswith('|'):
+            if kind != 'table':
+                flush()
+                kind = 'table'
+            lines.append(line)
+        elif not line.strip():
+            flush()
+        else:
+            if kind != 'text':
+                flush()
+                kind = 'text'
+            lines.append(line)
+    flush()
+    return blocks
+
+
+def split_oversized(kind: str, text: str, max_tokens: int) -> List[str]:
+    """Split a single block larger than max_tokens (tables keep their header on every piece)"""
+    lines = text.splitlines()
+    header = []
+    if kind == 'table' and len(lines) > 2 and TABLE_SEPARATOR_RE.match(lines[1].strip()):
+        header, lines = lines[:2], lines[2:]
+
+    pieces, current = [], list(header)
+    current_tokens = count_tokens("\n".join(header)) if header else 0
+    for line in lines:
+        line_tokens = count_tokens(line) + 1
+        if line_tokens > max_tokens:
+            # A single huge line: cut by characters
+            if len(current) > len(header):
+                pieces.append("\n".join(current))
+                current, current_tokens = list(header), count_tokens("\n".join(header)) if header else 0
+            step = max(1, len(line) * max_tokens // line_tokens)
+            pieces.extend(line[i:i + step] for i in range(0, len(line), step))
+            continue
+        if current_tokens + line_tokens > max_tokens and len(current) > len(header):
+            pieces.append("\n".join(current))
+            current, current_tokens = list(header), count_tokens("\n".join(header)) if header else 0
+        current.append(line)
+        current_tokens += line_tokens
+    if len(current) > len(header):
+        pieces.append("\n".join(current))
+    return pieces
+
+
+def chunk_markdown(markdown: str, max_tokens: int = 1500) -> List[str]:
+    """
+    Split markdown into chunks of at most ~max_tokens tokens.
+
+    Chunks break at headings where possible and never inside a table row;
+    oversized tables are split by rows with the header repeated. A chunk
+    that starts in the middle of a section is prefixed with the section heading,
+    which counts against max_tokens.
+    """
+    if not markdown or not markdown.strip():
+        return []
+    if count_tokens(markdown) <= max_tokens:
+        return [markdown]
+
+    chunks, current = [], []
+    current_tokens = 0
+    last_heading = None
+
+    def flush():
+        nonlocal current, current_tokens
+        if current and any(kind != 'heading' for kind, _ in current):
+            chunks.append("\n\n".join(text for _, text in current))
+        current, current_tokens = [], 0
+
+    for kind, text in split_blocks(markdown):
+        if kind == 'heading' and count_tokens(text) + 2 > max_tokens // 2:
+            kind = 'text'  # Too long to repeat on every chunk of its section
+        if kind == 'heading':
+            heading_tokens = count_tokens(text) + 2
+            # Prefer to start a new chunk at a heading once the current one is half full
+            if current_tokens >= max_tokens // 2 or current_tokens + heading_tokens > max_tokens:
+                flush()
+            last_heading = text
+            current.append((kind, text))
+            current_tokens += heading_tokens
+            continue
+
+        # The section heading repeated on top of a new chunk counts against its budget
+        prefix_tokens = count_tokens(last_heading) + 2 if last_heading else 0
+        budget = max_tokens - prefix_tokens
+        pieces = [text] if count_tokens(text) <= budget else split_oversized(kind, text, budget)
+
+        for piece in pieces:
+            piece_tokens = count_tokens(piece) + 2
+            if current and current_tokens + piece_tokens > max_tokens:
+                flush()
+                if last_heading:
+                    current.append(('heading', last_heading))
+                    current_tokens = prefix_tokens
+            current.append((kind, piece))
+            current_tokens += piece_tokens
+    flush()
+    return chunks
+
+
+def normalize_question(question: str) -> str:
+    return " ".join(question.lower().split()).rstrip(" ?")
+
+
+def merge_qa_pairs(chunk_results: List[List[Dict]]) -> List[Dict]:
+    """Concatenate per-chunk Q&A pairs of one document, dropping repeated questions"""
+    merged, seen = [], set()
+    for qa_pairs in chunk_results:
+        for qa in qa_pairs or []:
+            if not isinstance(qa, dict) or not qa.get('question'):
+                continue
+            key = normalize_question(qa['question'])
+            if key in seen:
+                continue
+            seen.add(key)
+            merged.append(qa)
+    return merged
+
+
+async def map_chunks(markdown: str, extract_chunk: Callable[[str], Awaitable[T]], max_tokens: int = 1500) -> List[T]:
+    """Chunk a document and run extract_chunk on every chunk concurrently (results in chunk order)"""
+    chunks = chunk_markdown(markdown, max_tokens)
+    if len(chunks) > 1:
+        print(f"   ✂️  Split into {len(chunks)} chunks of ≤{max_tokens} tokens")
+    return await asyncio.gather(*(extract_chunk(chunk) for chunk in chunks))
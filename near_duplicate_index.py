@@ -0,0 +1,139 @@
+import zlib
+from collections import Counter, defaultdict
+from difflib import SequenceMatcher
+from itertools import repeat
+from typing import Dict, Iterable, List, Optional, Tuple
+
+MAX_HASH = (1 << 64) - 1
+HASH_MULTIPLIER = 0x9E3779B97F4A7C15  # spreads crc32 over 64 bits
+DENSIFY_OFFSET = 1 << 58
+
+
+class NearDuplicateIndex:
+    """
+    🔎 MinHash/LSH index of normalized questions for near-duplicate checks
+
+    Same semantics as is_similar(): two texts are duplicates when
+    SequenceMatcher(None, new, existing).ratio() > threshold. Instead of comparing
+    a new text with every indexed text, only texts sharing an LSH band with it
+    (MinHash over character n-grams) are compared, after cheap length and
+    quick_ratio upper bounds. With 32 bands of 2 rows, pairs with n-gram Jaccard
+    around 0.3 (typical for ratio > 0.85 on short questions) are candidates with
+    ~95% probability.
+
+    Texts must already be normalized (normalize_text) by the caller.
+    """
+
+    def __init__(self, texts: Iterable[str] = (), threshold: float = 0.85,
+                 num_perm: int = 64, band_rows: int = 2, ngram: int = 3, seed: int = 42):
+        self.threshold = threshold
+        self.ngram = ngram
+        self.band_rows = band_rows
+        self.num_perm = num_perm
+        self.seed = seed
+        self.buckets: List[Dict[Tuple[int, ...], List[int]]] = [defaultdict(list) for _ in range(num_perm // band_rows)]
+        self.texts: List[str] = []
+        self.exact = set()
+        self.matchers: Dict[int, SequenceMatcher] = {}
+        self.char_counts: Dict[int, Dict[str, int]] = {}
+        self.stats = {'queries': 0, 'candidates': 0, 'comparisons': 0}
+        for text in texts:
+            self.add(text)
+
+    def __len__(self) -> int:
+        return len(self.texts)
+
+    def __contains__(self, text: str) -> bool:
+        return self.find_similar(text) is not None
+
+    def band_keys(self, text: str) -> List[Tuple[int, ...]]:
+        """
+        MinHash signature of the text's character n-grams, cut into LSH bands.
+
+        One-permutation hashing: each n-gram hash goes to one of num_perm bins
+        and each bin keeps its minimum, so the signature costs one pass over the
+        n-grams instead of num_perm passes. Empty bins borrow the next non-empty
+        bin's value (rotation densification), which keeps P(bin equal) = Jaccard.
+        """
+        n = self.ngram
+        k = self.num_perm
+        mins = [None] * k
+        for gram in {text[i:i + n] for i in range(len(text) - n + 1)} or {text}:
+            h = zlib.crc32(gram.encode('utf-8'), self.seed) * HASH_MULTIPLIER & MAX_HASH
+            b = h % k
+            value = h // k
+            if mins[b] is None or value < mins[b]:
+                mins[b] = value
+
+        signature = list(mins)
+        for i in range(k):
+            if signature[i] is None:
+                j, offset = (i + 1) % k, 1
+                while mins[j] is None:
+                    j, offset = (j + 1) % k, offset + 1
+                signature[i] = mins[j] + offset * DENSIFY_OFFSET
+        r = self.band_rows
+        return [tuple(signature[i:i + r]) for i in range(0, k, r)]
+
+    def is_match(self, text: str, text_counts: Tuple[Tuple[str, ...], Tuple[int, ...]], idx: int) -> bool:
+        other = self.texts[idx]
+        total = len(text) + len(other)
+        if not total:
+            return True
+        # Upper bounds of ratio() = 2*matches/total, cheapest first (same as
+        # real_quick_ratio / quick_ratio, with the character counts cached)
+        if 2 * min(len(text), len(other)) / total <= self.threshold:
+            return False
+        other_counts = self.char_counts.get(idx)
+        if other_counts is None:
+            other_counts = self.char_counts[idx] = dict(Counter(other))
+        chars, counts = text_counts
+        common = sum(map(min, counts, map(other_counts.get, chars, repeat(0))))
+        if 2 * common / total <= self.threshold:
+            return False
+
+        self.stats['comparisons'] += 1
+        # SequenceMatcher caches its analysis of the second sequence, so keep
+        # one matcher per indexed text and only swap the new text in
+        matcher = self.matchers.get(idx)
+        if matcher is None:
+            matcher = self.matchers[idx] = SequenceMatcher(None, b=other)
+        matcher.set_seq1(text)
+        return matcher.ratio() > self.threshold
+
+    def find_similar(self, text: str, band_keys: Optional[List[Tuple[int, ...]]] = None) -> Optional[str]:
+        """An indexed text similar to text, or None"""
+        self.stats['queries'] += 1
+        if text in self.exact:
+            return text
+
+        counter = Counter(text)
+        text_counts = (tuple(counter.keys()), tuple(counter.values()))
+        seen = set()
+        for band, key in enumerate(band_keys or self.band_keys(text)):
+            for idx in self.buckets[band].get(key, ()):
+                if idx in seen:
+                    continue
+                seen.add(idx)
+                self.stats['candidates'] += 1
+                if self.is_match(text, text_counts, idx):
+                    return self.texts[idx]
+        return None
+
+    def add(self, text: str, band_keys: Optional[List[Tuple[int, ...]]] = None):
+        idx = len(self.texts)
+        self.texts.append(text)
+        self.exact.add(text)
+        for band, key in enumerate(band_keys or self.band_keys(text)):
+            self.buckets[band][key].append(idx)
+
+    def add_if_new(self, text: str) -> bool:
+        """Index text unless a near-duplicate is already indexed; True if it was added"""
+        if text in self.exact:
+            self.stats['queries'] += 1
+            return False
+        keys = self.band_keys(text)
+        if self.find_similar(text, keys) is not None:
+            return False
+        self.add(text, keys)
+        return True
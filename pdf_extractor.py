@@ -3,9 +3,11 @@ import json
 import os
 import requests
 from pathlib import Path
-import openai
 from dotenv import load_dotenv
 
+from llm_client import chat_completion, report_llm_usage
+from markdown_chunker import map_chunks, merge_qa_pairs
+
 # PDF processing libraries
 try:
     import PyPDF2
@@ -16,6 +18,9 @@ except ImportError:
     PDF_LIBS_AVAILABLE = False
     print("⚠️  PDF libraries not installed. Run: pip install PyPDF2 PyMuPDF pdfplumber")
 
+# Token budget of one markdown chunk sent to the LLM
+CHUNK_TOKENS = 5000
+
 def extract_with_pypdf2(pdf_path):
     """Extract text using PyPDF2 (basic)"""
     try:
@@ -195,12 +200,40 @@ def convert_pdf_to_markdown(pdf_content):
     
     return markdown
 
-async def extract_qa_from_pdf_content(markdown_content, api_key, pdf_name):
-    """Extract Q&A from PDF content using LLM"""
+def parse_qa_json(qa_content):
+    """Parse the Q&A JSON of an LLM response (raises on invalid JSON)"""
+    # Clean JSON response
+    content = qa_content.strip()
+    if content.startswith('```json'):
+        content = content[7:]
+    if content.endswith('```'):
+        content = content[:-3]
+    return json.loads(content.strip())
+
+async def extract_qa_from_pdf_content(markdown_content, pdf_name):
+    """Extract Q&A from the whole PDF content using LLM, one call per chunk"""
     print("🤖 Extracting Q&A from PDF content...")
     
-    client = openai.AsyncOpenAI(api_key=api_key)
+    results = await map_chunks(
+        markdown_content, lambda chunk: extract_qa_from_pdf_chunk(chunk, pdf_name), CHUNK_TOKENS
+    )
+    qa_pairs = merge_qa_pairs([result.get("qa_pairs", []) for result in results])
+    if not qa_pairs:
+        return None
     
+    # Chunks number their pairs from qa_001 each
+    for i, qa in enumerate(qa_pairs, 1):
+        qa["id"] = f"qa_{i:03d}"
+    
+    return {
+        "intent": "tuyen_sinh_ctu_pdf",
+        "description": f"Q&A từ file PDF CTU: {pdf_name}",
+        "count": len(qa_pairs),
+        "qa_pairs": qa_pairs
+    }
+
+async def extract_qa_from_pdf_chunk(markdown_content, pdf_name):
+    """Extract Q&A from one chunk of PDF content using LLM"""
     prompt = f"""
     Bạn là chuyên gia tạo chatbot tư vấn tuyển sinh CTU.
     Từ nội dung file PDF "{pdf_name}" được cung cấp, hãy tạo các câu hỏi-trả lời CỤ THỂ.
@@ -232,26 +265,30 @@ async def extract_qa_from_pdf_content(markdown_content, api_key, pdf_name):
     """
     
     try:
-        # Split content if too long
-        max_content_length = 15000
-        if len(markdown_content) > max_content_length:
-            markdown_content = markdown_content[:max_content_length] + "\n\n[Content truncated for processing]"
-        
-        response = await client.chat.completions.create(
+        response = await chat_completion(
             model="gpt-4o-mini",
             messages=[
                 {"role": "system", "content": prompt},
                 {"role": "user", "content": f"Nội dung file PDF:\n\n{markdown_content}"}
             ],
             temperature=0.0,
-            max_tokens=8000
+            max_tokens=8000,
+            validate=parse_qa_json
         )
         
-        return response.choices[0].message.content
+        return parse_qa_json(response.content)
         
+    except json.JSONDecodeError as e:
+        print(f"❌ JSON parse error: {e}")
+        os.makedirs("output", exist_ok=True)
+        raw_file = "output/pdf_qa_raw.txt"
+        with open(raw_file, "a", encoding="utf-8") as f:
+            f.write(response.content + "\n\n")
+        print(f"💾 Raw response saved: {raw_file}")
+        return {"qa_pairs": []}
     except Exception as e:
         print(f"❌ Error in LLM extraction: {e}")
-        return None
+        return {"qa_pairs": []}
 
 async def process_pdf_file(pdf_path):
     """Complete pipeline: PDF → Text → Markdown → Q&A"""
@@ -279,38 +316,21 @@ async def process_pdf_file(pdf_path):
         return
     
     pdf_name = Path(pdf_path).name
-    qa_content = await extract_qa_from_pdf_content(markdown_content, api_key, pdf_name)
+    qa_data = await extract_qa_from_pdf_content(markdown_content, pdf_name)
     
-    if qa_content:
+    if qa_data:
         # Save Q&A JSON
-        try:
-            # Clean JSON response
-            content = qa_content.strip()
-            if content.startswith('```json'):
-                content = content[7:]
-            if content.endswith('```'):
-                content = content[:-3]
-            content = content.strip()
-            
-            qa_data = json.loads(content)
-            
-            qa_file = "output/pdf_qa_extracted.json"
-            with open(qa_file, "w", encoding="utf-8") as f:
-                json.dump(qa_data, f, indent=2, ensure_ascii=False)
-            
-            print(f"\n✅ SUCCESS!")
-            print(f"📄 PDF processed: {pdf_path}")
-            print(f"📝 Markdown: {markdown_file}")
-            print(f"🤖 Q&A JSON: {qa_file}")
-            print(f"❓ Generated {qa_data.get('count', 0)} Q&A pairs")
-            print(f"📊 Tables found: {len(pdf_content.get('tables', []))}")
-            
-        except json.JSONDecodeError as e:
-            print(f"❌ JSON parse error: {e}")
-            raw_file = "output/pdf_qa_raw.txt"
-            with open(raw_file, "w", encoding="utf-8") as f:
-                f.write(qa_content)
-            print(f"💾 Raw response saved: {raw_file}")
+        qa_file = "output/pdf_qa_extracted.json"
+        with open(qa_file, "w", encoding="utf-8") as f:
+            json.dump(qa_data, f, indent=2, ensure_ascii=False)
+        
+        print(f"\n✅ SUCCESS!")
+        print(f"📄 PDF processed: {pdf_path}")
+        print(f"📝 Markdown: {markdown_file}")
+        print(f"🤖 Q&A JSON: {qa_file}")
+        print(f"❓ Generated {qa_data.get('count', 0)} Q&A pairs")
+        print(f"📊 Tables found: {len(pdf_content.get('tables', []))}")
+        report_llm_usage()
 
 async def process_pdf_from_url(url):
     """Download and process PDF from URL"""
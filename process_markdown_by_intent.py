@@ -5,12 +5,20 @@ import re
 from pathlib import Path
 from typing import Dict, List, Any
 from dotenv import load_dotenv
-import openai
+
+from llm_client import get_async_client, chat_completion, report_llm_usage
+from markdown_chunker import map_chunks, merge_qa_pairs
+from jsonl_dataset import append_records, compact, ensure_jsonl
+from qa_store import QAStore
+from intent_classifier import IntentClassifier
+
+# Token budget of one content chunk sent to the LLM
+CHUNK_TOKENS = 1500
 
 
 class IntentBasedExtractor:
     def __init__(self, api_key: str):
-        self.client = openai.AsyncOpenAI(api_key=api_key)
+        self.client = get_async_client(api_key)
         self.intents = {
             "nganh_hoc": {
                 "folder": "data/processed/nganh_hoc",
@@ -38,6 +46,12 @@ class IntentBasedExtractor:
                 "keywords": ["giới thiệu", "lịch sử", "cơ sở", "thông tin chung", "tầm nhìn", "sứ mệnh"]
             }
         }
+        
+        # Điểm của một đoạn = tổng số lần xuất hiện các keyword của intent
+        self.paragraph_classifier = IntentClassifier(
+            {intent: info["keywords"] for intent, info in self.intents.items()},
+            fallback_intent="thong_tin"
+        )
     
     def create_intent_folders(self):
         """Tạo các thư mục theo intent"""
@@ -57,28 +71,22 @@ class IntentBasedExtractor:
             if len(paragraph.strip()) < 50:  # Bỏ qua đoạn quá ngắn
                 continue
                 
-            # Tìm intent phù hợp nhất
-            best_intent = "thong_tin"  # Default intent
-            max_score = 0
-            
-            for intent_name, intent_info in self.intents.items():
-                score = 0
-                for keyword in intent_info["keywords"]:
-                    score += paragraph.lower().count(keyword.lower())
-                
-                if score > max_score:
-                    max_score = score
-                    best_intent = intent_name
-            
+            # Tìm intent phù hợp nhất (một lần quét cho mọi intent)
+            best_intent = self.paragraph_classifier.classify(paragraph)
             intent_contents[best_intent] += paragraph + "\n\n"
         
         return intent_contents
     
     async def extract_qa_pairs_for_intent(self, content: str, intent: str) -> List[Dict[str, Any]]:
-        """Trích xuất Q&A pairs cho một intent cụ thể"""
+        """Trích xuất Q&A pairs cho một intent cụ thể (chia nội dung dài thành nhiều chunk)"""
         if not content.strip():
             return []
         
+        results = await map_chunks(content, lambda chunk: self.extract_qa_pairs_for_chunk(chunk, intent), CHUNK_TOKENS)
+        return merge_qa_pairs(results)
+    
+    async def extract_qa_pairs_for_chunk(self, content: str, intent: str) -> List[Dict[str, Any]]:
+        """Trích xuất Q&A pairs từ một chunk nội dung của intent"""
         intent_info = self.intents[intent]
         
         prompt = f"""
@@ -87,7 +95,7 @@ class IntentBasedExtractor:
         Từ nội dung sau về "{intent_info['description']}", hãy tạo các cặp câu hỏi-trả lời (Q&A) bằng tiếng Việt:
         
         NỘI DUNG:
-        {content[:4000]}  # Giới hạn độ dài để tránh vượt quá token limit
+        {content}
         
         YÊU CẦU:
         1. Tạo 5-10 cặp câu hỏi-trả lời tự nhiên
@@ -110,7 +118,7 @@ class IntentBasedExtractor:
         """
         
         try:
-            response = await self.client.chat.completions.create(
+            response = await chat_completion(
                 model="gpt-4o-mini",
                 messages=[
                     {"role": "system", "content": "Bạn là chuyên gia trích xuất dữ liệu cho chatbot tư vấn tuyển sinh. Luôn trả về JSON hợp lệ."},
@@ -120,7 +128,7 @@ class IntentBasedExtractor:
                 max_tokens=2000
             )
             
-            result_text = response.choices[0].message.content.strip()
+            result_text = response.content.strip()
             
             # Làm sạch JSON response
             if result_text.startswith("```json"):
@@ -168,41 +176,21 @@ class IntentBasedExtractor:
             qa_pairs = await self.extract_qa_pairs_for_intent(intent_content, intent)
             
             if qa_pairs:
-                # Tạo dữ liệu JSON cho intent
                 intent_data = {
                     "intent": intent,
                     "description": self.intents[intent]["description"],
-                    "count": len(qa_pairs),
-                    "qa_pairs": qa_pairs,
                     "source": "crawl_result.md",
                     "created_date": "2025-01-27"
                 }
                 
-                # Lưu vào file JSON
+                # Ghi nối vào file JSONL (dữ liệu cũ được giữ nguyên, không đọc lại),
+                # sau đó tạo lại file JSON đầy đủ
                 output_file = Path(self.intents[intent]["folder"]) / f"{intent}_qa.json"
+                jsonl_file = ensure_jsonl(output_file)
+                append_records(jsonl_file, qa_pairs)
+                compact(jsonl_file, output_file, intent_data)
                 
-                # Nếu file đã tồn tại, merge dữ liệu
-                if output_file.exists():
-                    try:
-                        with open(output_file, "r", encoding="utf-8") as f:
-                            existing_data = json.load(f)
-                        
-                        # Merge Q&A pairs
-                        existing_qa_pairs = existing_data.get("qa_pairs", [])
-                        all_qa_pairs = existing_qa_pairs + qa_pairs
-                        
-                        intent_data["qa_pairs"] = all_qa_pairs
-                        intent_data["count"] = len(all_qa_pairs)
-                        
-                        print(f"Merged with existing data. Total Q&A pairs: {len(all_qa_pairs)}")
-                    except Exception as e:
-                        print(f"Error reading existing file: {e}")
-                
-                # Lưu file
-                with open(output_file, "w", encoding="utf-8") as f:
-                    json.dump(intent_data, f, indent=2, ensure_ascii=False)
-                
-                print(f"Saved {len(qa_pairs)} Q&A pairs to: {output_file}")
+                print(f"Saved {len(qa_pairs)} Q&A pairs to: {jsonl_file} → {output_file}")
             else:
                 print(f"No Q&A pairs extracted for intent: {intent}")
     
@@ -220,25 +208,22 @@ class IntentBasedExtractor:
             "qa_pairs": []
         }
         
-        total_qa_pairs = 0
-        
-        # Đọc dữ liệu từ tất cả các intent
+        # Cập nhật kho Q&A từ các file intent (file không đổi được bỏ qua) rồi truy vấn
+        store = QAStore()
+        intent_files = []
         for intent, intent_info in self.intents.items():
-            intent_file = Path(intent_info["folder"]) / f"{intent}_qa.json"
-            
-            if intent_file.exists():
-                try:
-                    with open(intent_file, "r", encoding="utf-8") as f:
-                        intent_data = json.load(f)
-                    
-                    qa_pairs = intent_data.get("qa_pairs", [])
-                    combined_data["intents"][intent] = len(qa_pairs)
-                    combined_data["qa_pairs"].extend(qa_pairs)
-                    total_qa_pairs += len(qa_pairs)
-                    
-                    print(f"Added {len(qa_pairs)} Q&A pairs from {intent}")
-                except Exception as e:
-                    print(f"Error reading {intent_file}: {e}")
+            intent_jsonl = ensure_jsonl(Path(intent_info["folder"]) / f"{intent}_qa.json")
+            if intent_jsonl.exists():
+                store.import_file(intent_jsonl)
+                intent_files.append(intent_jsonl)
+        
+        combined_data["intents"] = store.intent_counts(intent_files)
+        combined_data["qa_pairs"] = list(store.records(source_files=intent_files))
+        total_qa_pairs = len(combined_data["qa_pairs"])
+        store.close()
+        
+        for intent, count in combined_data["intents"].items():
+            print(f"Added {count} Q&A pairs from {intent}")
         
         combined_data["dataset_info"]["total_pairs"] = total_qa_pairs
         
@@ -280,6 +265,7 @@ async def main():
     # Tạo dataset tổng hợp
     await extractor.create_combined_dataset()
     
+    report_llm_usage()
     print("\n🎉 Extraction completed!")
 
 
@@ -0,0 +1,267 @@
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+from qa_store import load_qa_pairs
+from text_normalizer import normalize_text, strip_diacritics
+
+DEFAULT_DATASETS = "data/final/*.json"
+BM25_K1 = 1.5
+BM25_B = 0.75
+PROBE = 64
+SHORT_LIST = 4096
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Normalized syllables plus adjacent syllable pairs: Vietnamese words are
+    mostly two syllables ("học phí", "ký túc"), the pairs keep them together
+    """
+    words = normalize_text(text).split()
+    return words + [f"{first} {second}" for first, second in zip(words, words[1:])]
+
+
+class PostingLists:
+    """
+    📇 BM25 posting lists of a tokenized corpus, precomputed
+
+    All lists are stored back to back in two arrays (document ids and the
+    BM25 weight of the term in that document), term -> slice through offsets,
+    so a query only touches the lists of its own terms.
+    """
+
+    def __init__(self, documents: List[List[str]], k1: float = BM25_K1, b: float = BM25_B):
+        lengths = np.array([len(tokens) for tokens in documents], dtype=np.float32)
+        average_length = float(lengths.mean()) if len(documents) and lengths.sum() else 1.0
+
+        postings: Dict[str, Dict[int, int]] = {}
+        for doc, tokens in enumerate(documents):
+            for token in tokens:
+                frequencies = postings.setdefault(token, {})
+                frequencies[doc] = frequencies.get(doc, 0) + 1
+
+        self.term_ids = {term: term_id for term_id, term in enumerate(postings)}
+        self.offsets = np.zeros(len(postings) + 1, dtype=np.int64)
+        self.offsets[1:] = np.cumsum([len(frequencies) for frequencies in postings.values()])
+        self.docs = np.fromiter((doc for frequencies in postings.values() for doc in frequencies),
+                                dtype=np.int32, count=int(self.offsets[-1]))
+        tf = np.fromiter((tf for frequencies in postings.values() for tf in frequencies.values()),
+                         dtype=np.float32, count=int(self.offsets[-1]))
+
+        df = np.diff(self.offsets).astype(np.float32)
+        idf = np.log1p((len(documents) - df + 0.5) / (df + 0.5))
+        norm = k1 * (1 - b + b * lengths[self.docs] / average_length)
+        self.weights = (np.repeat(idf, np.diff(self.offsets)) * tf * (k1 + 1) / (tf + norm)).astype(np.float32)
+        # Best weight of every list: the most a document can gain from the term
+        self.max_weights = (np.maximum.reduceat(self.weights, self.offsets[:-1]) if len(self.weights)
+                            else np.zeros(0, dtype=np.float32))
+
+        # The same weights document by document (forward index), to score given documents directly
+        order = np.argsort(self.docs, kind="stable")
+        self.doc_terms = np.repeat(np.arange(len(postings), dtype=np.int32), np.diff(self.offsets))[order]
+        self.doc_weights = self.weights[order]
+        self.doc_lengths = np.bincount(self.docs, minlength=len(documents))
+        self.doc_offsets = np.zeros(len(documents) + 1, dtype=np.int64)
+        self.doc_offsets[1:] = np.cumsum(self.doc_lengths)
+
+    def postings(self, term: str):
+        """(term id, document ids ascending, weights, best weight) of a term, None if no document has it"""
+        term_id = self.term_ids.get(term)
+        if term_id is None:
+            return None
+        start, end = self.offsets[term_id], self.offsets[term_id + 1]
+        return term_id, self.docs[start:end], self.weights[start:end], float(self.max_weights[term_id])
+
+    def term_mask(self, term_ids: List[int]) -> np.ndarray:
+        """Query terms as a lookup table for score()"""
+        mask = np.zeros(len(self.term_ids), dtype=bool)
+        mask[term_ids] = True
+        return mask
+
+    def score(self, docs: np.ndarray, query_mask: np.ndarray) -> np.ndarray:
+        """BM25 scores of these documents for the query terms of term_mask() (forward index rows)"""
+        lengths = self.doc_lengths[docs]
+        row_of = np.repeat(np.arange(len(docs)), lengths)
+        # The rows of the documents, gathered back to back: entry j of row i is doc_offsets[docs[i]] + j
+        row_starts = np.cumsum(lengths) - lengths
+        positions = np.arange(len(row_of)) + np.repeat(self.doc_offsets[docs] - row_starts, lengths)
+        hits = query_mask[self.doc_terms[positions]]
+        return np.bincount(row_of[hits], weights=self.doc_weights[positions[hits]],
+                           minlength=len(docs)).astype(np.float32)
+
+
+def kth_largest(values: np.ndarray, k: int) -> float:
+    """k-th largest value, 0 if there are fewer than k"""
+    if len(values) < k:
+        return 0.0
+    return float(np.partition(values, len(values) - k)[len(values) - k])
+
+
+class QARetriever:
+    """
+    🔎 In-memory BM25 search over the questions of the Q&A datasets
+
+    search() returns the best matching pairs with their score. Questions typed
+    without diacritics ("hoc phi nganh cntt") are matched against a second
+    index of the diacritic-free questions.
+    """
+
+    def __init__(self, qa_pairs: Iterable[Dict[str, Any]], k1: float = BM25_K1, b: float = BM25_B):
+        # One entry per normalized question (the data/final datasets overlap)
+        self.qa_pairs: List[Dict[str, Any]] = []
+        seen = set()
+        for qa in qa_pairs:
+            question = (qa.get("question") or "").strip()
+            key = normalize_text(question)
+            if not key or key in seen:
+                continue
+            seen.add(key)
+            self.qa_pairs.append(qa)
+
+        documents = [tokenize(qa["question"]) for qa in self.qa_pairs]
+        self.index = PostingLists(documents, k1, b)
+        self.ascii_index = PostingLists([[strip_diacritics(token) for token in tokens] for tokens in documents], k1, b)
+
+    @classmethod
+    def from_files(cls, paths: Optional[Sequence[str]] = None, **kwargs) -> 'QARetriever':
+        """Index the pairs of dataset files (JSON or JSONL), data/final/*.json by default"""
+        if not paths:
+            paths = sorted(str(path) for path in Path().glob(DEFAULT_DATASETS))
+        return cls((qa for path in paths for qa in load_qa_pairs(path)), **kwargs)
+
+    def __len__(self) -> int:
+        return len(self.qa_pairs)
+
+    def search(self, question: str, k: int = 5, min_score: float = 0.0) -> List[Dict[str, Any]]:
+        """Top k pairs for the question (best first), each with its BM25 "score" """
+        tokens = tokenize(question)
+        index = self.index
+        if tokens and all(token.isascii() for token in tokens):
+            index = self.ascii_index
+
+        lists = [postings for postings in map(index.postings, dict.fromkeys(tokens)) if postings is not None]
+        if not lists or k <= 0:
+            return []
+        query_mask = index.term_mask([postings[0] for postings in lists])
+
+        # MaxScore: lists in decreasing best weight (rare terms first). Once the
+        # k-th best score reaches the sum of the best weights of the remaining
+        # lists, a document found in none of the lists read so far cannot enter
+        # the top k: the remaining (long, common-term) lists are then only
+        # searched for the candidates, which are dropped as soon as they cannot
+        # reach the k-th best score even with every term left.
+        lists.sort(key=lambda postings: -postings[3])
+        remaining = np.append(np.cumsum([postings[3] for postings in reversed(lists)])[::-1], 0)
+        partial = np.zeros(len(self.qa_pairs), dtype=np.float32)
+        found = []
+        threshold = 0.0
+        essential = 0
+        while essential < len(lists):
+            _, docs, weights, _ = lists[essential]
+            found.append(docs[partial[docs] == 0])
+            # Documents appear at most once per list, so plain fancy-index addition is exact
+            partial[docs] += weights
+            essential += 1
+            candidates = np.concatenate(found) if len(found) > 1 else found[0]
+            # Reading a short list costs less than checking whether it can be skipped
+            if len(candidates) >= k and essential < len(lists) and len(lists[essential][1]) >= SHORT_LIST:
+                # Full scores of the k best partial candidates: their k-th is a lower bound of the final k-th
+                best = candidates[np.argpartition(-partial[candidates], k - 1)[:k]]
+                threshold = max(threshold, kth_largest(index.score(best, query_mask), k))
+                if threshold >= remaining[essential]:
+                    break
+
+        if essential < len(lists) and len(candidates) > PROBE:
+            # A closer bound before searching the long lists: full scores of more of the best partial candidates
+            best = candidates[np.argpartition(-partial[candidates], PROBE - 1)[:PROBE]]
+            threshold = max(threshold, kth_largest(index.score(best, query_mask), k))
+        candidate_scores = partial[candidates]
+        for position in range(essential, len(lists)):
+            # Scores only grow, so the k-th best partial score is a lower bound too
+            threshold = max(threshold, kth_largest(candidate_scores, k))
+            keep = candidate_scores + remaining[position] >= threshold
+            candidates, candidate_scores = candidates[keep], candidate_scores[keep]
+            _, docs, weights, _ = lists[position]
+            found_at = np.minimum(np.searchsorted(docs, candidates), len(docs) - 1)
+            hits = docs[found_at] == candidates
+            candidate_scores[hits] += weights[found_at[hits]]
+
+        top = np.arange(len(candidates))
+        if len(candidates) > k:
+            top = np.argpartition(-candidate_scores, k - 1)[:k]
+        top = top[np.lexsort((candidates[top], -candidate_scores[top]))]
+
+        return [{**self.qa_pairs[int(candidates[i])], "score": float(candidate_scores[i])}
+                for i in top.tolist() if candidate_scores[i] > min_score]
+
+
+def synthetic_pairs(qa_pairs: List[Dict[str, Any]], count: int, seed: int = 42) -> List[Dict[str, Any]]:
+    """count pairs made of real questions with some words swapped for words of other questions"""
+    rng = random.Random(seed)
+    vocabulary = [word for qa in qa_pairs for word in qa.get("question", "").split()]
+    pairs = []
+    for i in range(count):
+        words = rng.choice(qa_pairs).get("question", "").split()
+        for _ in range(max(1, len(words) // 3)):
+            words[rng.randrange(len(words))] = rng.choice(vocabulary)
+        pairs.append({"question": " ".join(words) + f" {i}", "answer": ""})
+    return pairs
+
+
+def benchmark(retriever: QARetriever, queries: List[str], k: int = 5) -> Dict[str, float]:
+    timings = []
+    for query in queries:
+        start = time.perf_counter()
+        retriever.search(query, k)
+        timings.append(time.perf_counter() - start)
+    timings.sort()
+    return {
+        "mean_ms": sum(timings) / len(timings) * 1000,
+        "p50_ms": timings[len(timings) // 2] * 1000,
+        "p99_ms": timings[int(len(timings) * 0.99)] * 1000
+    }
+
+
+def main():
+    """
+    python qa_retriever.py "câu hỏi" [k]
+    python qa_retriever.py --benchmark [pairs]
+    """
+    args = sys.argv[1:]
+    if not args:
+        print(main.__doc__)
+        return
+
+    start = time.perf_counter()
+    retriever = QARetriever.from_files()
+    print(f"📇 Indexed {len(retriever)} unique questions in {(time.perf_counter() - start) * 1000:.0f} ms")
+    if not len(retriever):
+        return
+
+    if args[0] == "--benchmark":
+        size = int(args[1]) if len(args) > 1 else 100_000
+        queries = [qa["question"] for qa in retriever.qa_pairs]
+        queries += [strip_diacritics(query) for query in queries]
+
+        start = time.perf_counter()
+        large = QARetriever(retriever.qa_pairs + synthetic_pairs(retriever.qa_pairs, size - len(retriever)))
+        print(f"📇 Synthetic index: {len(large):,} questions, {len(large.index.term_ids):,} terms, "
+              f"built in {time.perf_counter() - start:.1f} s")
+        for name, index in (("real", retriever), ("synthetic", large)):
+            timing = benchmark(index, queries)
+            print(f"⚡ {name} ({len(index):,} pairs): mean {timing['mean_ms']:.3f} ms, "
+                  f"p50 {timing['p50_ms']:.3f} ms, p99 {timing['p99_ms']:.3f} ms per query")
+        return
+
+    k = int(args[1]) if len(args) > 1 else 5
+    for rank, qa in enumerate(retriever.search(args[0], k), 1):
+        print(f"{rank}. [{qa['score']:.2f}] {qa['question']}")
+        print(f"   → {qa.get('answer', '')[:120]}")
+
+
+if __name__ == "__main__":
+    main()
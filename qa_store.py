@@ -0,0 +1,337 @@
+import hashlib
+import json
+import sqlite3
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from columnar_dataset import to_row
+from jsonl_dataset import iter_records, jsonl_path_for
+from text_normalizer import normalize_text
+
+# Every place the pipeline writes Q&A pairs today
+DEFAULT_SOURCES = [
+    "data/final/*.json",
+    "data/processed/**/*_qa*.json",
+    "data/processed/**/*_qa*.jsonl",
+    "output/auto_recursive/by_intent/*.json",
+    "output/*_extracted.json",
+    "output/**/*_extracted.json",
+]
+
+
+def content_hash(question: str, answer: str) -> str:
+    """Identity of a Q&A pair across files (normalized, so punctuation/case variants collide)"""
+    key = normalize_text(question or '') + "\n" + normalize_text(answer or '')
+    return hashlib.sha256(key.encode('utf-8')).hexdigest()
+
+
+def fts_query(text: str) -> str:
+    """Keywords as an FTS5 query: every word quoted, so user input is never parsed as FTS syntax"""
+    return " ".join('"' + word.replace('"', '""') + '"' for word in text.split())
+
+
+def load_qa_pairs(path: Path) -> List[Dict[str, Any]]:
+    """Q&A pairs of any dataset file: {"qa_pairs": [...]}, a list of chunks with qa_pairs, a list of pairs or JSONL"""
+    path = Path(path)
+    if path.suffix == ".jsonl":
+        return list(iter_records(path))
+
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    if isinstance(data, dict):
+        qa_pairs = data.get("qa_pairs", [])
+        default_date = data.get("dataset_info", {}).get("created_date") or data.get("created_date")
+        if default_date:
+            qa_pairs = [{"created_date": default_date, **qa} for qa in qa_pairs]
+        return qa_pairs
+    qa_pairs = []
+    for item in data:
+        if isinstance(item, dict) and "qa_pairs" in item:
+            qa_pairs.extend(item["qa_pairs"])
+        elif isinstance(item, dict) and "question" in item:
+            qa_pairs.append(item)
+    return qa_pairs
+
+
+class QAStore:
+    """
+    🗄️ Indexed local store of every Q&A pair (SQLite + FTS5)
+
+    One row per unique pair (content hash), the first file that contained it
+    provides its fields; qa_sources links pairs to every file they appear in,
+    so importing a file again replaces exactly its links. Indexed on intent,
+    source URL and content hash; question/answer are full-text searchable.
+    Files are only re-imported when their size or mtime changed.
+    """
+
+    def __init__(self, db_path: str = 'data/qa_store.db'):
+        self.db_path = db_path
+        Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(db_path)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS qa_pairs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                question TEXT NOT NULL,
+                answer TEXT NOT NULL,
+                intent TEXT NOT NULL,
+                source_url TEXT,
+                level TEXT,
+                confidence REAL,
+                created_date TEXT,
+                content_hash TEXT NOT NULL UNIQUE,
+                record TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_qa_pairs_intent ON qa_pairs (intent);
+            CREATE INDEX IF NOT EXISTS idx_qa_pairs_source_url ON qa_pairs (source_url);
+
+            CREATE TABLE IF NOT EXISTS qa_sources (
+                source_file TEXT NOT NULL,
+                qa_id INTEGER NOT NULL,
+                PRIMARY KEY (source_file, qa_id)
+            );
+            CREATE INDEX IF NOT EXISTS idx_qa_sources_qa_id ON qa_sources (qa_id);
+
+            -- remove_diacritics 2: "hoc phi" also finds "học phí" (users often type without accents)
+            CREATE VIRTUAL TABLE IF NOT EXISTS qa_fts USING fts5(
+                question, answer, content='qa_pairs', content_rowid='id',
+                tokenize='unicode61 remove_diacritics 2'
+            );
+            CREATE TRIGGER IF NOT EXISTS qa_pairs_ai AFTER INSERT ON qa_pairs BEGIN
+                INSERT INTO qa_fts (rowid, question, answer) VALUES (new.id, new.question, new.answer);
+            END;
+            CREATE TRIGGER IF NOT EXISTS qa_pairs_ad AFTER DELETE ON qa_pairs BEGIN
+                INSERT INTO qa_fts (qa_fts, rowid, question, answer) VALUES ('delete', old.id, old.question, old.answer);
+            END;
+
+            CREATE TABLE IF NOT EXISTS imported_files (
+                source_file TEXT PRIMARY KEY,
+                size INTEGER NOT NULL,
+                mtime REAL NOT NULL,
+                records INTEGER NOT NULL,
+                imported_at TEXT NOT NULL
+            );
+        """)
+        self.conn.commit()
+
+    def _now(self) -> str:
+        return datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+
+    def is_current(self, path: Path) -> bool:
+        """True if the file was imported and has not changed since"""
+        row = self.conn.execute(
+            "SELECT size, mtime FROM imported_files WHERE source_file = ?", (str(path),)
+        ).fetchone()
+        stat = path.stat()
+        return row is not None and row['size'] == stat.st_size and row['mtime'] == stat.st_mtime
+
+    def import_file(self, path: Path, force: bool = False) -> Optional[int]:
+        """(Re-)import one dataset file; None if it was unchanged and skipped"""
+        path = Path(path)
+        if not force and self.is_current(path):
+            return None
+
+        rows = []
+        for qa in load_qa_pairs(path):
+            if not isinstance(qa, dict) or not qa.get("question") or not qa.get("answer"):
+                continue
+            row = to_row(qa)
+            rows.append((
+                row["question"], row["answer"], row["intent"], row["source_url"], row["level"],
+                row["confidence"], row["created_date"], content_hash(row["question"], row["answer"]),
+                json.dumps(qa, ensure_ascii=False)
+            ))
+
+        source_file = str(path)
+        stat = path.stat()
+        with self.conn:
+            old_ids = [r[0] for r in self.conn.execute("SELECT qa_id FROM qa_sources WHERE source_file = ?", (source_file,))]
+            self.conn.execute("DELETE FROM qa_sources WHERE source_file = ?", (source_file,))
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO qa_pairs (question, answer, intent, source_url, level, confidence, created_date, "
+                "content_hash, record) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                rows
+            )
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO qa_sources (source_file, qa_id) "
+                "SELECT ?, id FROM qa_pairs WHERE content_hash = ?",
+                [(source_file, row[7]) for row in rows]
+            )
+            # Pairs that were only in the previous version of this file
+            self.conn.executemany(
+                "DELETE FROM qa_pairs WHERE id = ? AND NOT EXISTS (SELECT 1 FROM qa_sources WHERE qa_id = ?)",
+                [(qa_id, qa_id) for qa_id in old_ids]
+            )
+            self.conn.execute(
+                "INSERT OR REPLACE INTO imported_files (source_file, size, mtime, records, imported_at) VALUES (?, ?, ?, ?, ?)",
+                (source_file, stat.st_size, stat.st_mtime, len(rows), self._now())
+            )
+        return len(rows)
+
+    def import_paths(self, patterns: Iterable[str] = DEFAULT_SOURCES, force: bool = False) -> Dict[str, int]:
+        """
+        Import every file matching the glob patterns (unchanged files are skipped).
+        A *.json whose *.jsonl exists is skipped: the JSONL file is the source of truth.
+        """
+        paths = []
+        for pattern in patterns:
+            for path in sorted(Path().glob(pattern)):
+                if path.suffix == ".json" and jsonl_path_for(path).exists():
+                    continue
+                if path.is_file() and path not in paths:
+                    paths.append(path)
+
+        imported = {}
+        for path in paths:
+            try:
+                count = self.import_file(path, force)
+            except (json.JSONDecodeError, OSError) as e:
+                print(f"   ⚠️ Error importing {path}: {e}")
+                continue
+            if count is not None:
+                imported[str(path)] = count
+                print(f"   ✅ {path}: {count} Q&A pairs")
+        return imported
+
+    def _select(self, where: str = "", params: tuple = (), limit: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        sql = "SELECT * FROM qa_pairs"
+        if where:
+            sql += " WHERE " + where
+        sql += " ORDER BY id"
+        if limit is not None:
+            sql += f" LIMIT {int(limit)}"
+        for row in self.conn.execute(sql, params):
+            yield dict(row)
+
+    def by_intent(self, intent: str) -> List[Dict[str, Any]]:
+        return list(self._select("intent = ?", (intent,)))
+
+    def by_source_url(self, source_url: str) -> List[Dict[str, Any]]:
+        return list(self._select("source_url = ?", (source_url,)))
+
+    def by_hash(self, hash_value: str) -> Optional[Dict[str, Any]]:
+        return next(self._select("content_hash = ?", (hash_value,)), None)
+
+    def source_files(self, qa_id: int) -> List[str]:
+        return [r[0] for r in self.conn.execute("SELECT source_file FROM qa_sources WHERE qa_id = ? ORDER BY source_file", (qa_id,))]
+
+    def contains(self, question: str, answer: str) -> bool:
+        return self.conn.execute(
+            "SELECT 1 FROM qa_pairs WHERE content_hash = ? LIMIT 1", (content_hash(question, answer),)
+        ).fetchone() is not None
+
+    def search(self, text: str, intent: Optional[str] = None, limit: int = 10) -> List[Dict[str, Any]]:
+        """Full-text search over question and answer, best BM25 match first"""
+        query = fts_query(text)
+        if not query:
+            return []
+        sql = ("SELECT qa_pairs.*, bm25(qa_fts) AS score FROM qa_fts JOIN qa_pairs ON qa_pairs.id = qa_fts.rowid "
+               "WHERE qa_fts MATCH ?")
+        params: tuple = (query,)
+        if intent is not None:
+            sql += " AND qa_pairs.intent = ?"
+            params += (intent,)
+        sql += " ORDER BY score LIMIT ?"
+        return [dict(row) for row in self.conn.execute(sql, params + (limit,))]
+
+    def records(self, source_files: Optional[Iterable[str]] = None,
+                intents: Optional[Iterable[str]] = None) -> Iterator[Dict[str, Any]]:
+        """Original Q&A dicts (once per unique pair), optionally of some source files / intents"""
+        clauses, params = [], []
+        if source_files is not None:
+            files = [str(path) for path in source_files]
+            clauses.append(f"id IN (SELECT qa_id FROM qa_sources WHERE source_file IN ({', '.join('?' * len(files))}))"
+                           if files else "0")
+            params.extend(files)
+        if intents is not None:
+            intents = list(intents)
+            clauses.append(f"intent IN ({', '.join('?' * len(intents))})" if intents else "0")
+            params.extend(intents)
+        for row in self._select(" AND ".join(clauses), tuple(params)):
+            yield json.loads(row['record'])
+
+    def intent_counts(self, source_files: Optional[Iterable[str]] = None) -> Dict[str, int]:
+        sql = "SELECT intent, COUNT(*) FROM qa_pairs"
+        params: List[str] = []
+        if source_files is not None:
+            params = [str(path) for path in source_files]
+            sql += f" WHERE id IN (SELECT qa_id FROM qa_sources WHERE source_file IN ({', '.join('?' * len(params))}))"
+        rows = self.conn.execute(sql + " GROUP BY intent ORDER BY intent", params)
+        return {intent: count for intent, count in rows}
+
+    def stats(self) -> Dict[str, int]:
+        pairs, intents = self.conn.execute("SELECT COUNT(*), COUNT(DISTINCT intent) FROM qa_pairs").fetchone()
+        links, files = self.conn.execute("SELECT COUNT(*), COUNT(DISTINCT source_file) FROM qa_sources").fetchone()
+        return {'unique_pairs': pairs, 'file_pairs': links, 'files': files, 'intents': intents}
+
+    def close(self):
+        self.conn.close()
+
+
+def benchmark(store: QAStore, rounds: int = 200):
+    """Average lookup latency by intent, keyword and content hash"""
+    intents = list(store.intent_counts())
+    sample = next(store._select(limit=1), None)
+    if not intents or sample is None:
+        return
+    lookups = {
+        'intent': lambda: store.by_intent(intents[0]),
+        'keyword': lambda: store.search("học phí", limit=10),
+        'keyword+intent': lambda: store.search("ngành", intent=intents[0], limit=10),
+        'content_hash': lambda: [store.by_hash(sample['content_hash'])],
+    }
+    for name, lookup in lookups.items():
+        lookup()
+        start = time.perf_counter()
+        for _ in range(rounds):
+            results = lookup()
+        elapsed = (time.perf_counter() - start) / rounds * 1000
+        print(f"   ⏱️  {name:15s} {elapsed:.3f} ms ({len(results)} results)")
+
+
+def main():
+    """
+    python qa_store.py import [--force] [glob ...]    import datasets (default: every known location)
+    python qa_store.py search <keywords> [--intent X] full-text search
+    python qa_store.py stats                          counts per intent + lookup timings
+    """
+    args = sys.argv[1:]
+    command = args[0] if args else "stats"
+    store = QAStore()
+
+    if command == "import":
+        force = "--force" in args
+        patterns = [a for a in args[1:] if a != "--force"] or DEFAULT_SOURCES
+        print(f"📥 Importing Q&A datasets into {store.db_path}")
+        imported = store.import_paths(patterns, force)
+        print(f"✅ {len(imported)} files (re)imported, {sum(imported.values())} Q&A pairs")
+        command = "stats"
+
+    if command == "search":
+        intent = None
+        if "--intent" in args:
+            position = args.index("--intent")
+            intent = args[position + 1] if position + 1 < len(args) else None
+            args = args[:position] + args[position + 2:]
+        for row in store.search(" ".join(args[1:]), intent):
+            print(f"[{row['intent']}] ({row['score']:.2f}) Q: {row['question']}")
+            print(f"      A: {row['answer'][:120]}")
+    elif command == "stats":
+        stats = store.stats()
+        print(f"🗄️ {stats['unique_pairs']} unique Q&A pairs ({stats['file_pairs']} across {stats['files']} files), "
+              f"{stats['intents']} intents")
+        for intent, count in store.intent_counts().items():
+            print(f"   📁 {intent}: {count}")
+        benchmark(store)
+    elif command != "import":
+        print(main.__doc__)
+
+    store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+import json
+import re
+import sys
+import time
+import unicodedata
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Optional
+
+CTU_NAME = 'đại học cần thơ'
+
+
+class PunctuationTable(dict):
+    """
+    str.translate() table deleting every character that re's [^\\w\\s] matches.
+
+    Filled lazily: a character is classified the first time it is seen, after
+    that translate() finds it with a plain dict lookup.
+    """
+
+    def __missing__(self, char_code: int) -> Optional[int]:
+        char = chr(char_code)
+        keep = char.isalnum() or char == '_' or char.isspace()
+        self[char_code] = char_code if keep else None
+        return self[char_code]
+
+
+PUNCTUATION_TABLE = PunctuationTable()
+
+
+@lru_cache(maxsize=200_000)
+def normalize_text(text: str, nfc: bool = True) -> str:
+    """
+    Normalize text for comparison to avoid duplicates (memoized)
+
+    nfc=True first composes Vietnamese diacritics (NFC), so "học" typed with a
+    combining dot below compares equal to the precomposed form.
+    """
+    if nfc:
+        text = unicodedata.normalize('NFC', text)
+    # Lowercase, remove punctuation, collapse spaces
+    text = ' '.join(text.lower().translate(PUNCTUATION_TABLE).split())
+    # Remove common variations of the university name
+    return text.replace('ctu', CTU_NAME).replace('đhct', CTU_NAME).replace(CTU_NAME, '')
+
+
+def strip_diacritics(text: str) -> str:
+    """'học phí' -> 'hoc phi' (how many users type, see the typo style patterns)"""
+    decomposed = unicodedata.normalize('NFD', text.replace('đ', 'd').replace('Đ', 'D'))
+    return ''.join(char for char in decomposed if unicodedata.category(char) != 'Mn')
+
+
+def normalize_text_reference(text: str) -> str:
+    """Previous uncached implementation, kept for the benchmark below"""
+    text = text.lower()
+    text = re.sub(r'[^\w\s]', '', text)
+    text = ' '.join(text.split())
+    text = text.replace('ctu', 'đại học cần thơ')
+    text = text.replace('đhct', 'đại học cần thơ')
+    text = text.replace('đại học cần thơ', '')
+    return text
+
+
+def load_corpus(paths: List[Path]) -> List[str]:
+    """Questions and answers of the data/final datasets"""
+    texts = []
+    for path in paths:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        for qa in data.get('qa_pairs', []):
+            texts.extend(value for value in (qa.get('question'), qa.get('answer')) if value)
+    return texts
+
+
+def benchmark(texts: List[str], rounds: int = 20) -> Dict[str, float]:
+    """
+    Time both normalizers over the corpus `rounds` times (dedup normalizes the
+    same strings over and over, which is what the cache is for)
+    """
+    normalize_text.cache_clear()
+    results = {}
+    for name, func in (('reference', normalize_text_reference), ('normalize_text', normalize_text)):
+        start = time.perf_counter()
+        for text in texts:
+            func(text)
+        first = time.perf_counter() - start
+        start = time.perf_counter()
+        for _ in range(rounds - 1):
+            for text in texts:
+                func(text)
+        results[name] = {'first_pass': first, 'total': first + time.perf_counter() - start}
+    return results
+
+
+def main():
+    paths = [Path(p) for p in sys.argv[1:]] or sorted(Path('data/final').glob('*.json'))
+    texts = load_corpus(paths)
+    if not texts:
+        print("❌ No texts found")
+        return
+
+    rounds = 20
+    print(f"📚 {len(texts):,} texts from {len(paths)} files, {rounds} rounds")
+    results = benchmark(texts, rounds)
+    for name, timing in results.items():
+        per_call = timing['total'] / (len(texts) * rounds) * 1e6
+        print(f"   {name:15s} first pass {timing['first_pass'] * 1000:7.1f} ms, "
+              f"total {timing['total'] * 1000:8.1f} ms ({per_call:.2f} µs/call)")
+    speedup = results['reference']['total'] / results['normalize_text']['total']
+    print(f"⚡ Speedup: {speedup:.1f}x")
+
+    # Outputs only differ where NFC changes the input
+    different = sum(1 for text in texts if normalize_text(text) != normalize_text_reference(text))
+    not_nfc = sum(1 for text in texts if unicodedata.normalize('NFC', text) != text)
+    print(f"🔤 {not_nfc} texts not in NFC, {different} normalized differently from the reference")
+    print(f"💾 Cache: {normalize_text.cache_info()}")
+
+
+if __name__ == "__main__":
+    main()
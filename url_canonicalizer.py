@@ -0,0 +1,96 @@
+from typing import Dict, Iterable, List
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+# Query parameters that never change the page content we extract
+IGNORED_QUERY_PARAMS = {'lang', 'language', 'fbclid', 'gclid', 'ref'}
+IGNORED_QUERY_PREFIXES = ('utm_',)
+
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+
+def canonicalize_url(url: str) -> str:
+    """
+    Canonical form of a URL, a dedup key only (fetch the URL as linked):
+    - http/https treated the same (canonical scheme is https)
+    - host lowercased, default port dropped
+    - fragment dropped, trailing slash dropped (except the root path)
+    - tracking/language query params dropped, remaining params sorted
+    """
+    if not url or not isinstance(url, str):
+        return url
+
+    url = url.strip()
+    try:
+        parts = urlsplit(url)
+    except ValueError:
+        return url
+
+    scheme = parts.scheme.lower()
+    if scheme not in ('http', 'https'):
+        return url
+
+    host = (parts.hostname or '').lower()
+    port = parts.port if parts.port and parts.port != DEFAULT_PORTS.get(scheme) else None
+    netloc = f"{host}:{port}" if port else host
+
+    path = parts.path or '/'
+    while '//' in path:
+        path = path.replace('//', '/')
+    if len(path) > 1 and path.endswith('/'):
+        path = path.rstrip('/') or '/'
+
+    query_params = [
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if key.lower() not in IGNORED_QUERY_PARAMS and not key.lower().startswith(IGNORED_QUERY_PREFIXES)
+    ]
+    query = urlencode(sorted(query_params))
+
+    return urlunsplit(('https', netloc, path, query, ''))
+
+
+class SeenURLIndex:
+    """
+    🔗 Seen-set keyed by canonical URL
+
+    Counts every URL it rejects as already seen, and how many of those only
+    match after canonicalization (a raw string comparison would have fetched them again).
+    """
+
+    def __init__(self, urls: Iterable[str] = ()):
+        self._seen: Dict[str, str] = {}  # canonical URL -> first raw URL seen
+        self.duplicates = 0
+        self.canonical_duplicates = 0
+        for url in urls:
+            self._seen.setdefault(canonicalize_url(url), url)
+
+    def add(self, url: str) -> bool:
+        """Add a URL; returns False (and counts an avoided fetch) if it was already seen"""
+        canonical = canonicalize_url(url)
+        first_seen = self._seen.get(canonical)
+        if first_seen is None:
+            self._seen[canonical] = url
+            return True
+
+        self.duplicates += 1
+        if first_seen != url:
+            self.canonical_duplicates += 1
+        return False
+
+    def filter_new(self, urls: Iterable[str]) -> List[str]:
+        """
+        URLs not seen before, in order, as they were linked: the canonical
+        form is only the dedup key, it may not be a URL the server answers
+        (http-only hosts, ?lang=..., significant trailing slash)
+        """
+        return [url for url in urls if self.add(url)]
+
+    def __contains__(self, url: str) -> bool:
+        return canonicalize_url(url) in self._seen
+
+    def __len__(self) -> int:
+        return len(self._seen)
+
+    def report(self):
+        print(f"🔗 URL dedup: {len(self._seen)} unique URLs, "
+              f"{self.duplicates} duplicate fetches avoided "
+              f"({self.canonical_duplicates} only caught by canonicalization)")